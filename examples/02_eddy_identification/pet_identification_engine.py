@@ -0,0 +1,93 @@
+"""
+Identification engines : contour vs raster
+==========================================
+
+Eddies could be searched in iso lines (engine `contour`) or in connected regions of pixels above or below
+each level (engine `raster`). With raster engine, pixels of each region are known without any polygon test,
+and iso lines are computed only for regions which respect pixel limits.
+
+Both engines are timed on the Mediterranean grid and on the global grid.
+"""
+from datetime import datetime
+from time import perf_counter
+
+from matplotlib import pyplot as plt
+from numpy import arange
+
+from py_eddy_tracker import data
+from py_eddy_tracker.dataset.grid import RegularGridDataset
+
+ENGINES = ("contour", "raster")
+
+
+# %%
+def identify(g, **kwargs):
+    """Run identification with each engine, return eddies and timings"""
+    results, timings = dict(), dict()
+    for engine in ENGINES:
+        g.stats.reset()
+        t0 = perf_counter()
+        results[engine] = g.eddy_identification(
+            "adt", "u", "v", datetime(2019, 2, 23), engine=engine, **kwargs
+        )
+        timings[engine] = perf_counter() - t0
+        print(f"Engine {engine} : {timings[engine]:.2f} s")
+        print(g.stats)
+    return results, timings
+
+
+def display(results, title, **kwargs):
+    fig = plt.figure(figsize=(15, 5))
+    for i, engine in enumerate(ENGINES):
+        ax = fig.add_axes((0.03 + i * 0.49, 0.05, 0.46, 0.85))
+        ax.set_aspect("equal")
+        ax.set_title(f"{title} : engine {engine}", weight="bold")
+        a, c = results[engine]
+        a.display(ax, color="r", lw=0.5, label="Anticyclonic ({nb_obs} eddies)")
+        c.display(ax, color="b", lw=0.5, label="Cyclonic ({nb_obs} eddies)")
+        ax.set(**kwargs)
+        ax.legend(loc="upper right")
+        ax.grid()
+
+
+# %%
+# Mediterranean sea
+# -----------------
+# A first call is done to compile numba functions, only the second one is timed
+g = RegularGridDataset(
+    data.get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
+)
+g.bessel_high_filter("adt", 500, order=3)
+g.add_uv("adt")
+identify(g, pixel_limit=(5, 2000))
+med, med_timings = identify(g, pixel_limit=(5, 2000))
+display(med, "Med", xlim=(-6, 36.5), ylim=(30, 46))
+
+# %%
+# Global ocean
+# ------------
+g = RegularGridDataset(
+    data.get_path("nrt_global_allsat_phy_l4_20190223_20190226.nc"),
+    "longitude",
+    "latitude",
+)
+g.bessel_high_filter("adt", 700, order=1)
+g.add_uv("adt")
+world, world_timings = identify(g, pixel_limit=(5, 2000))
+display(world, "Global", xlim=(0, 360), ylim=(-80, 80))
+
+# %%
+# Wall time of each engine
+# ------------------------
+fig = plt.figure(figsize=(8, 4))
+ax = fig.add_axes((0.1, 0.12, 0.85, 0.78))
+ax.set_title("Identification wall time", weight="bold")
+x = arange(len(ENGINES))
+for offset, (label, timings) in zip(
+    (-0.2, 0.2), (("Med", med_timings), ("Global", world_timings))
+):
+    ax.bar(x + offset, [timings[engine] for engine in ENGINES], 0.4, label=label)
+ax.set_xticks(x), ax.set_xticklabels(ENGINES)
+ax.set_ylabel("s")
+ax.legend()
+ax.grid(axis="y")
@@ -0,0 +1,78 @@
+"""
+Identification in float32
+=========================
+
+With `dtype="f4"`, grids are loaded in float32 and filtering, geostrophic speed, contours and speed
+interpolation are computed in float32. Memory used by grids is halved. Only floating data fields are
+cast, coordinates stay in float64 and integer fields keep their type.
+
+Identifications in float64 and float32 are compared on the Mediterranean grid and on the global grid,
+eddies are matched with their contours and differences of amplitude, speed and position are reported.
+
+Float32 has an accuracy cost: on the global grid, amplitudes differ by less than 1e-6 m but
+`speed_average` moves by up to 1.15e-2 m/s (anticyclonic eddies). On the Mediterranean grid, speed
+differences stay below 1e-7 m/s.
+"""
+from datetime import datetime
+
+from matplotlib import pyplot as plt
+from numpy import abs as np_abs
+
+from py_eddy_tracker import data
+from py_eddy_tracker.dataset.grid import RegularGridDataset
+
+
+# %%
+def identify(filename, wave_length, order, dtype):
+    g = RegularGridDataset(
+        data.get_path(filename), "longitude", "latitude", dtype=dtype
+    )
+    g.bessel_high_filter("adt", wave_length, order=order)
+    g.add_uv("adt")
+    a, c = g.eddy_identification(
+        "adt", "u", "v", datetime(2019, 1, 1), 0.002, pixel_limit=(5, 2000)
+    )
+    nbytes = sum(g.grid(name).nbytes for name in ("adt", "u", "v"))
+    return (a, c), nbytes
+
+
+def report(title, filename, wave_length, order):
+    (ref, ref_bytes), (f4, f4_bytes) = [
+        identify(filename, wave_length, order, dtype) for dtype in (None, "f4")
+    ]
+    print(
+        f"{title} : grids use {ref_bytes / 2**20:.1f} Mo in float64 and {f4_bytes / 2**20:.1f} Mo in float32"
+    )
+    fig = plt.figure(figsize=(12, 4))
+    for i, (label, e_ref, e_f4) in enumerate(
+        zip(("Anticyclonic", "Cyclonic"), ref, f4)
+    ):
+        i_ref, i_f4, _ = e_ref.match(e_f4, intern=False, cmin=0.99)
+        d_amplitude = np_abs(e_ref.amplitude[i_ref] - e_f4.amplitude[i_f4])
+        d_speed = np_abs(e_ref.speed_average[i_ref] - e_f4.speed_average[i_f4])
+        d_lon = np_abs(e_ref.lon[i_ref] - e_f4.lon[i_f4])
+        d_lat = np_abs(e_ref.lat[i_ref] - e_f4.lat[i_f4])
+        print(
+            f"    {label:<13} : {len(e_ref)} eddies in float64, {len(e_f4)} in float32, "
+            f"{i_ref.size} matched\n"
+            f"        amplitude delta max {d_amplitude.max():.2e} m, "
+            f"speed delta max {d_speed.max():.2e} m/s, "
+            f"center delta max {max(d_lon.max(), d_lat.max()):.2e} degrees"
+        )
+        ax = fig.add_subplot(1, 2, i + 1)
+        ax.set_title(f"{title} : {label}", weight="bold")
+        ax.hist(d_amplitude * 1000, bins=50)
+        ax.set_xlabel("Amplitude delta (mm)")
+        ax.set_ylabel("Number of eddies")
+        ax.grid()
+
+
+# %%
+# Mediterranean sea
+# -----------------
+report("Med", "dt_med_allsat_phy_l4_20160515_20190101.nc", 500, 3)
+
+# %%
+# Global ocean
+# ------------
+report("Global", "nrt_global_allsat_phy_l4_20190223_20190226.nc", 700, 1)
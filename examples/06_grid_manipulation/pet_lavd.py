@@ -82,9 +82,7 @@ g = RegularGridDataset(
     get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
 )
 g.add_uv("adt")
-u_y = g.compute_stencil(g.grid("u"), vertical=True)
-v_x = g.compute_stencil(g.grid("v"))
-g.vars["vort"] = v_x - u_y
+g.add_derived("vorticity", varname="vort")
 
 # %%
 # Display vorticity field
@@ -108,7 +106,8 @@ step_by_day = 3
 nb_step = 2
 kw_p = dict(nb_step=nb_step, time_step=86400 / step_by_day / nb_step)
 # Start a generator which at each iteration return new position at next time step
-particule = g.advect(x, y, "u", "v", **kw_p, rk4=True)
+# Particles are split across numba threads
+particule = g.advect(x, y, "u", "v", **kw_p, rk4=True, parallel=True)
 
 # %%
 # LAVD
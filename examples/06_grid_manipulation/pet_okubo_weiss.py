@@ -56,12 +56,9 @@ m = g.display(ax, "adt", vmin=-120, vmax=120, factor=100)
 update_axes(ax, m)
 
 # %%
-# Get parameter for ow
-u_x = g.compute_stencil(g.grid("ugos"))
-u_y = g.compute_stencil(g.grid("ugos"), vertical=True)
-v_x = g.compute_stencil(g.grid("vgos"))
-v_y = g.compute_stencil(g.grid("vgos"), vertical=True)
-ow = g.vars["ow"] = (u_x - v_y) ** 2 + (v_x + u_y) ** 2 - (v_x - u_y) ** 2
+# Okubo-Weiss is a derived field, it's computed at first access from gradients of geostrophic velocities
+g.add_derived("ow", uname="ugos", vname="vgos")
+ow = g.grid("ow")
 
 ax = start_axes("Okubo weis")
 m = g.display(ax, "ow", vmin=-1e-10, vmax=1e-10, cmap="bwr")
@@ -37,6 +37,8 @@ setup(
             # grid
             "GridFiltering = py_eddy_tracker.appli.grid:grid_filtering",
             "EddyId = py_eddy_tracker.appli.grid:eddy_id",
+            "EddyIdBatch = py_eddy_tracker.appli.grid:eddy_id_batch",
+            "EddyIdCube = py_eddy_tracker.appli.grid:eddy_id_cube",
             # eddies
             "MergeEddies = py_eddy_tracker.appli.eddies:merge_eddies",
             "EddyFrequency = py_eddy_tracker.appli.eddies:get_frequency_grid",
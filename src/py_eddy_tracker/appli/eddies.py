@@ -228,6 +228,7 @@ def browse_dataset_in(
     end_date=None,
     sub_sampling_step=1,
     files=None,
+    check_steps=True,
 ):
     pattern_regexp = re_compile(".*/" + date_regexp)
     if files is not None:
@@ -273,7 +274,7 @@ def browse_dataset_in(
     dataset_list.sort(order=["date", "filename"])
 
     steps = unique(dataset_list["date"][1:] - dataset_list["date"][:-1])
-    if len(steps) > 1:
+    if check_steps and len(steps) > 1:
         raise Exception("Several days steps in grid dataset %s" % steps)
 
     if sub_sampling_step != 1:
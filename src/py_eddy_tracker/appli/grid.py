@@ -2,11 +2,30 @@
 """
 All entry point to manipulate grid
 """
+import logging
+import sys
 from argparse import Action
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
+from glob import has_magic
+from os import cpu_count, makedirs
+from os.path import abspath, basename, dirname, exists
+from traceback import format_exc
 
-from .. import EddyParser
-from ..dataset.grid import RegularGridDataset, UnRegularGridDataset
+from yaml import safe_load
+
+from .. import EddyParser, start_logger
+from ..dataset.grid import (
+    RegularGridDataset,
+    UnRegularGridDataset,
+    eddies_as_arrays,
+    eddies_from_arrays,
+    process_pool_context,
+)
+from .eddies import browse_dataset_in
+
+logger = logging.getLogger("pet")
 
 
 def filtering_parser():
@@ -30,21 +49,36 @@ def filtering_parser():
         type=float,
         help="Keep pixel compute by filtering on mask",
     )
+    parser.add_argument(
+        "--nb_workers",
+        default=1,
+        type=int,
+        help="Number of workers used to filter latitude rows, 0 to use number of cpu",
+    )
+    parser.add_argument(
+        "--pool",
+        default="thread",
+        choices=("thread", "process"),
+        help="Type of workers used to filter latitude rows",
+    )
     return parser
 
 
-def grid_filtering():
-    args = filtering_parser().parse_args()
+def grid_filtering(args=None):
+    parser = filtering_parser()
+    args = parser.parse_args(args) if args else parser.parse_args()
 
     h = RegularGridDataset(args.filename, args.longitude, args.latitude)
+    kwargs = dict(
+        order=args.filter_order,
+        extend=args.extend,
+        nb_workers=args.nb_workers if args.nb_workers != 0 else None,
+        pool=args.pool,
+    )
     if args.low:
-        h.bessel_low_filter(
-            args.grid, args.cut_wavelength, order=args.filter_order, extend=args.extend
-        )
+        h.bessel_low_filter(args.grid, args.cut_wavelength, **kwargs)
     else:
-        h.bessel_high_filter(
-            args.grid, args.cut_wavelength, order=args.filter_order, extend=args.extend
-        )
+        h.bessel_high_filter(args.grid, args.cut_wavelength, **kwargs)
     h.write(args.filename_out)
 
 
@@ -59,10 +93,11 @@ class DictAction(Action):
         setattr(namespace, self.dest, indexs)
 
 
-def eddy_id(args=None):
-    parser = EddyParser("Eddy Identification")
-    parser.add_argument("filename")
-    parser.add_argument("datetime")
+def identification_arguments(parser):
+    """Add arguments shared by all identification entry points
+
+    :param EddyParser parser: parser to complete
+    """
     parser.add_argument("h")
     parser.add_argument("u", help="If it s None, it will be deduce from h")
     parser.add_argument("v", help="If it s None, it will be deduce from h")
@@ -102,6 +137,25 @@ def eddy_id(args=None):
     )
     help = "Output will be wrote in zarr"
     parser.add_argument("--zarr", action="store_true", help=help)
+    help = "Anticyclonic and cyclonic searches will be run in two processes"
+    parser.add_argument("--concurrent_search", action="store_true", help=help)
+    help = (
+        "Identification engine, 'contour' searches eddies in iso lines, "
+        "'raster' searches eddies in connected regions of pixels of each level"
+    )
+    parser.add_argument(
+        "--engine", default="contour", choices=("contour", "raster"), help=help
+    )
+    help = "Compute filtering, speed and identification in float32 to reduce memory"
+    parser.add_argument("--float32", action="store_true", help=help)
+    help = (
+        "Number of tiles along x and y, tiles will be identified in several processes"
+    )
+    parser.add_argument("--tiles", nargs=2, type=int, default=None, help=help)
+    help = "Number of pixels added around each tile"
+    parser.add_argument("--halo", default=100, type=int, help=help)
+    help = "Number of process used to identify tiles, by default number of cpu"
+    parser.add_argument("--tile_workers", default=None, type=int, help=help)
     help = "Indexs to select grid : --indexs time=2, will select third step along time dimensions"
     parser.add_argument(
         "--indexs",
@@ -109,8 +163,15 @@ def eddy_id(args=None):
         help=help,
         action=DictAction,
     )
-    args = parser.parse_args(args) if args else parser.parse_args()
 
+
+def identification_kwargs(args):
+    """Translate parsed arguments in keywords for :py:func:`identification`
+
+    :param argparse.Namespace args: arguments parsed with :py:func:`identification_arguments`
+    :return: keywords to give to :py:func:`identification`, except filename and date
+    :rtype: dict
+    """
     cut_wavelength = args.cut_wavelength
     nb_cw = len(cut_wavelength)
     if nb_cw > 2 or nb_cw == 0:
@@ -118,25 +179,12 @@ def eddy_id(args=None):
     elif nb_cw == 1:
         cut_wavelength = [0, *cut_wavelength]
     inf_bnds, upper_bnds = cut_wavelength
-
-    date = datetime.strptime(args.datetime, "%Y%m%d")
-    kwargs = dict(
-        step=args.isoline_step,
-        shape_error=args.fit_errmax,
-        pixel_limit=(5, 2000),
-        force_height_unit=args.height_unit,
-        force_speed_unit=args.speed_unit,
-        nb_step_to_be_mle=0,
-    )
-
-    a, c = identification(
-        args.filename,
-        args.longitude,
-        args.latitude,
-        date,
-        args.h,
-        args.u,
-        args.v,
+    return dict(
+        lon=args.longitude,
+        lat=args.latitude,
+        h=args.h,
+        u=args.u,
+        v=args.v,
         unregular=args.unregular,
         cut_wavelength=upper_bnds,
         cut_highwavelength=inf_bnds,
@@ -145,11 +193,177 @@ def eddy_id(args=None):
         indexs=args.indexs,
         sampling=args.sampling,
         sampling_method=args.sampling_method,
-        **kwargs,
+        step=args.isoline_step,
+        shape_error=args.fit_errmax,
+        pixel_limit=(5, 2000),
+        force_height_unit=args.height_unit,
+        force_speed_unit=args.speed_unit,
+        nb_step_to_be_mle=0,
+        concurrent_search=args.concurrent_search,
+        engine=args.engine,
+        dtype="f4" if args.float32 else None,
+        tiles=args.tiles,
+        halo=args.halo,
+        tile_workers=args.tile_workers,
+    )
+
+
+def identification_filenames(path_out, date, zarr=False):
+    """Give filenames which will be written by an identification
+
+    :param str path_out: output directory
+    :param datetime.datetime date: date of identification
+    :param bool zarr: True if outputs are stored in zarr
+    :return: anticyclonic and cyclonic filenames
+    :rtype: list(str)
+    """
+    filenames = list()
+    for sign_type in ("Anticyclonic", "Cyclonic"):
+        # Path is set after strftime like in write_file, it could contain %
+        filename = date.strftime(f"%(path)s/{sign_type}_%Y%m%d.nc") % dict(
+            path=path_out
+        )
+        filenames.append(filename.replace(".nc", ".zarr") if zarr else filename)
+    return filenames
+
+
+def eddy_id(args=None):
+    parser = EddyParser("Eddy Identification")
+    parser.add_argument("filename")
+    parser.add_argument("datetime")
+    identification_arguments(parser)
+    help = (
+        "Yaml file with several sets of identification settings (shape_error, pixel_limit, "
+        "sampling, sampling_method, amplitude keywords) stored by name, contours are computed "
+        "once and outputs of each set are written in a sub directory of path_out named like the set"
     )
+    parser.add_argument("--sweep", default=None, help=help)
+    args = parser.parse_args(args) if args else parser.parse_args()
+
+    date = datetime.strptime(args.datetime, "%Y%m%d")
     out_name = date.strftime("%(path)s/%(sign_type)s_%Y%m%d.nc")
-    a.write_file(path=args.path_out, filename=out_name, zarr_flag=args.zarr)
-    c.write_file(path=args.path_out, filename=out_name, zarr_flag=args.zarr)
+    kwargs = identification_kwargs(args)
+    if args.sweep is None:
+        a, c = identification(args.filename, date=date, **kwargs)
+        a.write_file(path=args.path_out, filename=out_name, zarr_flag=args.zarr)
+        c.write_file(path=args.path_out, filename=out_name, zarr_flag=args.zarr)
+        return
+    with open(args.sweep) as stream:
+        sweep = safe_load(stream)
+    for parameters in sweep.values():
+        if parameters.get("pixel_limit") is not None:
+            parameters["pixel_limit"] = tuple(parameters["pixel_limit"])
+    results = identification(
+        args.filename, date=date, parameters=list(sweep.values()), **kwargs
+    )
+    for name, (a, c) in zip(sweep.keys(), results):
+        path = f"{args.path_out}/{name}"
+        makedirs(path, exist_ok=True)
+        a.write_file(path=path, filename=out_name, zarr_flag=args.zarr)
+        c.write_file(path=path, filename=out_name, zarr_flag=args.zarr)
+
+
+def init_identification_worker(logging_level):
+    """Set logger of a batch worker, worker will keep imports and numba caches
+    loaded for all dates which it will process
+    """
+    start_logger().setLevel(getattr(logging, logging_level.upper()))
+
+
+def identification_worker(filename, date, path_out, zarr, kwargs):
+    """Run one identification and write its outputs
+
+    :return: date and error message if identification failed, else None
+    :rtype: (datetime.datetime, str)
+    """
+    try:
+        a, c = identification(filename, date=date, **kwargs)
+        out_name = date.strftime("%(path)s/%(sign_type)s_%Y%m%d.nc")
+        a.write_file(path=path_out, filename=out_name, zarr_flag=zarr)
+        c.write_file(path=path_out, filename=out_name, zarr_flag=zarr)
+    except Exception:
+        return date, format_exc()
+    return date, None
+
+
+def eddy_id_batch(args=None):
+    parser = EddyParser("Eddy Identification on a list of grids")
+    parser.add_argument(
+        "filenames",
+        nargs="+",
+        help="Grid files, or a pattern which will be used with glob",
+    )
+    identification_arguments(parser)
+    parser.add_argument(
+        "--date_regexp",
+        default=".*_([0-9]*?)_.*",
+        help="Regular expression to extract date from filename",
+    )
+    parser.add_argument(
+        "--date_model", default="%Y%m%d", help="Model to read date extracted"
+    )
+    parser.add_argument(
+        "--nb_workers",
+        default=None,
+        type=int,
+        help="Number of process used, by default number of cpu",
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Identify again dates which have already outputs",
+    )
+    args = parser.parse_args(args) if args else parser.parse_args()
+
+    kw = dict(date_regexp=args.date_regexp, date_model=args.date_model)
+    if len(args.filenames) == 1 and has_magic(args.filenames[0]):
+        pattern = abspath(args.filenames[0])
+        kw.update(dict(data_dir=dirname(pattern), files_model=basename(pattern)))
+    else:
+        files = [abspath(filename) for filename in args.filenames]
+        kw.update(dict(data_dir=None, files_model=None, files=files))
+    datasets = browse_dataset_in(check_steps=False, **kw)
+
+    kwargs = identification_kwargs(args)
+    jobs = list()
+    for item in datasets:
+        date = item["date"].astype("datetime64[s]").astype(datetime)
+        outputs = identification_filenames(args.path_out, date, args.zarr)
+        if not args.overwrite and all(exists(output) for output in outputs):
+            logger.info("Outputs already exist for %s, skip it", date)
+            continue
+        jobs.append((item["filename"].decode("utf-8"), date))
+    logger.info("%d identifications to do", len(jobs))
+
+    failed = list()
+    with ProcessPoolExecutor(
+        max_workers=args.nb_workers,
+        mp_context=process_pool_context(),
+        initializer=init_identification_worker,
+        initargs=(args.logging_level,),
+    ) as executor:
+        futures = [
+            executor.submit(
+                identification_worker, filename, date, args.path_out, args.zarr, kwargs
+            )
+            for filename, date in jobs
+        ]
+        for future in as_completed(futures):
+            date, error = future.result()
+            if error is None:
+                logger.info("Identification done for %s", date)
+            else:
+                logger.error("Identification failed for %s :\n%s", date, error)
+                failed.append(date)
+    if failed:
+        logger.error(
+            "%d/%d identifications failed : %s",
+            len(failed),
+            len(jobs),
+            ", ".join(date.strftime("%Y%m%d") for date in sorted(failed)),
+        )
+        # Exit status let scripts detect a partial run
+        sys.exit(1)
 
 
 def identification(
@@ -166,10 +380,70 @@ def identification(
     lat_max=85,
     filter_order=1,
     indexs=None,
-    **kwargs
+    tiles=None,
+    halo=100,
+    tile_workers=None,
+    parameters=None,
+    dtype=None,
+    **kwargs,
 ):
+    """Identify eddies on one grid, grid could be filtered before
+
+    :param list(dict),None parameters:
+        If given, several identifications are done with
+        :py:meth:`~py_eddy_tracker.dataset.grid.GridDataset.eddy_identification_sweep`
+        and a list of results is returned
+    :param str,None dtype: Type used for filtering and identification, float64 by default
+    :return: Anticyclones and Cyclones, or a list of them if parameters is given
+    :rtype: list
+    """
+    if tiles is not None and unregular:
+        raise Exception("Tiled identification is only available on regular grid")
+    if tiles is not None and parameters is not None:
+        raise Exception("Tiled identification couldn't be used with several settings")
     grid_class = UnRegularGridDataset if unregular else RegularGridDataset
-    grid = grid_class(filename, lon, lat, indexs=indexs)
+    grid = grid_class(filename, lon, lat, indexs=indexs, dtype=dtype)
+    return grid_identification(
+        grid,
+        date,
+        h,
+        u,
+        v,
+        cut_wavelength=cut_wavelength,
+        cut_highwavelength=cut_highwavelength,
+        lat_max=lat_max,
+        filter_order=filter_order,
+        tiles=tiles,
+        halo=halo,
+        tile_workers=tile_workers,
+        parameters=parameters,
+        **kwargs,
+    )
+
+
+def grid_identification(
+    grid,
+    date,
+    h,
+    u="None",
+    v="None",
+    cut_wavelength=500,
+    cut_highwavelength=0,
+    lat_max=85,
+    filter_order=1,
+    tiles=None,
+    halo=100,
+    tile_workers=None,
+    parameters=None,
+    **kwargs,
+):
+    """Identify eddies on a grid already loaded, grid could be filtered before,
+    look at :py:func:`identification` for arguments
+
+    :param GridDataset grid: grid to use, it will be modified by filtering
+    :return: Anticyclones and Cyclones, or a list of them if parameters is given
+    :rtype: list
+    """
     if u == "None" and v == "None":
         grid.add_uv(h)
         u, v = "u", "v"
@@ -178,4 +452,140 @@ def identification(
         grid.bessel_low_filter(h, cut_highwavelength, **kw_filter)
     if cut_wavelength != 0:
         grid.bessel_high_filter(h, cut_wavelength, **kw_filter)
-    return grid.eddy_identification(h, u, v, date, **kwargs)
+    if parameters is not None:
+        return grid.eddy_identification_sweep(h, u, v, date, parameters, **kwargs)
+    if tiles is None:
+        return grid.eddy_identification(h, u, v, date, **kwargs)
+    return grid.tiled_eddy_identification(
+        h, u, v, date, tiles=tiles, halo=halo, nb_workers=tile_workers, **kwargs
+    )
+
+
+def identification_cube_worker(grid, date, kwargs):
+    """Identify eddies on one step of a cube
+
+    :return: for anticyclones and cyclones, observations and keywords, look at
+        :py:func:`~py_eddy_tracker.dataset.grid.eddies_as_arrays`
+    :rtype: list
+    """
+    return eddies_as_arrays(grid_identification(grid, date, **kwargs))
+
+
+def identification_over_cube(
+    filename,
+    lon,
+    lat,
+    time,
+    h,
+    u="None",
+    v="None",
+    unregular=False,
+    indexs=None,
+    dtype=None,
+    steps=None,
+    nb_workers=None,
+    nb_in_flight=None,
+    logging_level="WARNING",
+    **kwargs,
+):
+    """Identify eddies on each time step of a NetCDF cube.
+
+    File is opened once and coordinates are set up once
+    (look at :py:meth:`~py_eddy_tracker.dataset.grid.GridDataset.iter_time_cube`),
+    slices are read in the main process and identified in a pool of processes.
+    Results are given in order of steps.
+
+    :param str filename: NetCDF file with a time dimension
+    :param str time: Name of time variable
+    :param list(int),None steps: Indices of steps to identify, by default all steps
+    :param int,None nb_workers: Number of processes, by default number of cpu, if 1 no process are created
+    :param int,None nb_in_flight: Maximal number of slices read and not yet identified,
+        by default twice the number of processes
+    :param str logging_level: Logging level of workers
+    :param dict kwargs: look at :py:func:`identification`
+    :return: for each step, date, anticyclones and cyclones
+    :rtype: (datetime.datetime, EddiesObservations, EddiesObservations)
+    """
+    if kwargs.get("tiles") is not None or kwargs.get("parameters") is not None:
+        raise Exception(
+            "Tiled identification or several settings couldn't be used on a cube"
+        )
+    grid_class = UnRegularGridDataset if unregular else RegularGridDataset
+    varnames = [h] if u == "None" and v == "None" else [h, u, v]
+    kwargs.update(h=h, u=u, v=v)
+    cube = grid_class.iter_time_cube(
+        filename, lon, lat, time, varnames, steps=steps, indexs=indexs, dtype=dtype
+    )
+    if nb_workers == 1:
+        for _, date, grid in cube:
+            a, c = grid_identification(grid, date, **kwargs)
+            yield date, a, c
+        return
+    if nb_workers is None:
+        nb_workers = cpu_count()
+    if nb_in_flight is None:
+        nb_in_flight = 2 * nb_workers
+    with ProcessPoolExecutor(
+        max_workers=nb_workers,
+        mp_context=process_pool_context(),
+        initializer=init_identification_worker,
+        initargs=(logging_level,),
+    ) as executor:
+        in_flight = deque()
+        for _, date, grid in cube:
+            if len(in_flight) >= nb_in_flight:
+                date_, future = in_flight.popleft()
+                yield (date_, *eddies_from_arrays(future.result()))
+            future = executor.submit(identification_cube_worker, grid, date, kwargs)
+            in_flight.append((date, future))
+        while in_flight:
+            date_, future = in_flight.popleft()
+            yield (date_, *eddies_from_arrays(future.result()))
+
+
+def eddy_id_cube(args=None):
+    parser = EddyParser("Eddy Identification on each time step of a NetCDF cube")
+    parser.add_argument("filename")
+    identification_arguments(parser)
+    parser.add_argument("--time", default="time", help="Name of time variable")
+    parser.add_argument(
+        "--nb_workers",
+        default=None,
+        type=int,
+        help="Number of process used, by default number of cpu",
+    )
+    help = "Maximal number of slices read and not yet identified, by default twice the number of process"
+    parser.add_argument("--nb_in_flight", default=None, type=int, help=help)
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Identify again dates which have already outputs",
+    )
+    args = parser.parse_args(args) if args else parser.parse_args()
+
+    kwargs = identification_kwargs(args)
+    grid_class = RegularGridDataset if not args.unregular else UnRegularGridDataset
+    _, dates = grid_class.time_cube_dates(args.filename, args.time)
+    steps = list()
+    for i, date in enumerate(dates):
+        outputs = identification_filenames(args.path_out, date, args.zarr)
+        if not args.overwrite and all(exists(output) for output in outputs):
+            logger.info("Outputs already exist for %s, skip it", date)
+            continue
+        steps.append(i)
+    logger.info("%d identifications to do", len(steps))
+
+    results = identification_over_cube(
+        args.filename,
+        time=args.time,
+        steps=steps,
+        nb_workers=args.nb_workers,
+        nb_in_flight=args.nb_in_flight,
+        logging_level=args.logging_level,
+        **kwargs,
+    )
+    for date, a, c in results:
+        out_name = date.strftime("%(path)s/%(sign_type)s_%Y%m%d.nc")
+        a.write_file(path=args.path_out, filename=out_name, zarr_flag=args.zarr)
+        c.write_file(path=args.path_out, filename=out_name, zarr_flag=args.zarr)
+        logger.info("Identification done for %s", date)
@@ -3,57 +3,93 @@
 Class to load and manipulate RegularGrid and UnRegularGrid
 """
 import logging
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from functools import partial
+from hashlib import sha1
+from multiprocessing import current_process, get_all_start_methods, get_context
+from os import cpu_count
+from os.path import abspath, dirname, exists, join
+from threading import Lock
+from time import perf_counter
+from traceback import format_exc
 
-from cv2 import filter2D
 from matplotlib.path import Path as BasePath
-from netCDF4 import Dataset
-from numba import njit, prange
+from netCDF4 import Dataset, num2date
+from numba import njit, prange, threading_layer
 from numba import types as numba_types
 from numpy import (
     arange,
     array,
+    array_split,
+    ascontiguousarray,
+    bincount,
     ceil,
     concatenate,
     cos,
     deg2rad,
+)
+from numpy import dtype as dtype_
+from numpy import (
     empty,
     errstate,
     exp,
     float_,
     floor,
+    full,
     histogram2d,
     int8,
     int_,
     interp,
+    isfinite,
     isnan,
+    isscalar,
+    lexsort,
     linspace,
-    ma,
 )
-from numpy import mean as np_mean
+from numpy import load as np_load
 from numpy import (
+    ma,
     meshgrid,
     nan,
     nanmean,
+    ndarray,
     ones,
     percentile,
     pi,
     radians,
+    repeat,
+    result_type,
     round_,
+    savez,
+    shape,
     sin,
     sinc,
+    sqrt,
+    stack,
     where,
     zeros,
 )
 from pint import UnitRegistry
-from scipy.interpolate import RectBivariateSpline, interp1d
+from scipy.fft import irfft, next_fast_len, rfft
+from scipy.interpolate import RectBivariateSpline
 from scipy.ndimage import convolve, gaussian_filter
 from scipy.signal import welch
 from scipy.spatial import cKDTree
 from scipy.special import j1
 
 from .. import VAR_DESCR
-from ..eddy_feature import Amplitude, Contours
+from ..eddy_feature import (
+    Amplitude,
+    ContourPath,
+    Contours,
+    LevelSets,
+    local_extrema_,
+    update_local_extrema_,
+)
 from ..generic import (
     bbox_indice_regular,
     coordinates_to_local,
@@ -63,13 +99,12 @@ from ..generic import (
     nearest_grd_indice,
     uniform_resample,
 )
-from ..observations.observation import EddiesObservations
+from ..observations.observation import EddiesObservations, ObservationsBuffer
 from ..poly import (
     create_vertice,
     fit_circle,
     get_pixel_in_regular,
     poly_area,
-    poly_contain_poly,
     visvalingam,
     winding_number_poly,
 )
@@ -102,9 +137,10 @@ def lat(self):
     return self.vertices[:, 1]
 
 
-BasePath.mean_coordinates = mean_coordinates
-BasePath.lon = lon
-BasePath.lat = lat
+for cls in (BasePath, ContourPath):
+    cls.mean_coordinates = mean_coordinates
+    cls.lon = lon
+    cls.lat = lat
 
 
 @njit(cache=True)
@@ -165,9 +201,55 @@ def _circle_from_equal_area(vertice):
     return lon0, lat0, (poly_area(c_x, c_y) / pi) ** 0.5, nan
 
 
-@njit(cache=True, fastmath=True)
 def _fit_circle_path(vertice):
-    lons, lats = vertice[:, 0], vertice[:, 1]
+    """Fit circle on one contour, with the kernel used for several contours"""
+    params = fit_circle_paths(vertice[:, 0], vertice[:, 1], [0], [vertice.shape[0]])
+    return tuple(params[0])
+
+
+def fit_circle_paths(x_value, y_value, i_first, nb_pt):
+    """Fit circle on several contours stored in flat arrays.
+
+    Arrays are cast to always call the same compilation of :py:func:`_fit_circle_paths`,
+    so a contour gets the same fit alone or with other contours.
+
+    :param array x_value: x coordinates of all contours
+    :param array y_value: y coordinates of all contours
+    :param array i_first: index of first vertex of each contour
+    :param array nb_pt: number of vertices of each contour
+    :return: center x, center y, radius and error of each contour
+    :rtype: array
+    """
+    return _fit_circle_paths(
+        ascontiguousarray(x_value, dtype="f8"),
+        ascontiguousarray(y_value, dtype="f8"),
+        ascontiguousarray(i_first, dtype="i8"),
+        ascontiguousarray(nb_pt, dtype="i8"),
+    )
+
+
+@njit(cache=True)
+def _fit_circle_paths(x_value, y_value, i_first, nb_pt):
+    """Fit circle on several contours stored in flat arrays
+
+    :param array x_value: x coordinates of all contours
+    :param array y_value: y coordinates of all contours
+    :param array i_first: index of first vertex of each contour
+    :param array nb_pt: number of vertices of each contour
+    :return: center x, center y, radius and error of each contour
+    :rtype: array
+    """
+    nb = i_first.shape[0]
+    params = empty((nb, 4), dtype=numba_types.float64)
+    for i in range(nb):
+        i0 = i_first[i]
+        i1 = i0 + nb_pt[i]
+        params[i] = _fit_circle_coordinates(x_value[i0:i1], y_value[i0:i1])
+    return params
+
+
+@njit(cache=True, fastmath=True)
+def _fit_circle_coordinates(lons, lats):
     # last coordinates == first
     lon0, lat0 = lons[1:].mean(), lats[1:].mean()
     c_x, c_y = coordinates_to_local(lons, lats, lon0, lat0)
@@ -200,7 +282,7 @@ def _get_pixel_in_unregular(vertices, x_c, y_c, x_start, x_stop, y_start, y_stop
     return i_x, i_y
 
 
-BasePath.fit_circle = fit_circle_path
+BasePath.fit_circle = ContourPath.fit_circle = fit_circle_path
 
 
 def pixels_in(self, grid):
@@ -232,15 +314,724 @@ def nb_pixel(self):
     return self._pixels_in[0].shape[0]
 
 
-BasePath.pixels_in = pixels_in
-BasePath.pixels_index = pixels_index
-BasePath.bbox_slice = bbox_slice
-BasePath.nb_pixel = nb_pixel
+for cls in (BasePath, ContourPath):
+    cls.pixels_in = pixels_in
+    cls.pixels_index = pixels_index
+    cls.bbox_slice = bbox_slice
+    cls.nb_pixel = nb_pixel
+
+
+def convolve_rows(
+    values,
+    valid,
+    wrap,
+    compute_dtype,
+    extend,
+    rows,
+    lats,
+    kernel_func,
+    kwargs_func,
+    method="direct",
+    fft_band=8,
+    fft_kernel_size=1000,
+):
+    """
+    Filter several rows of a grid with a kernel which depends on latitude,
+    look at :py:meth:`RegularGridDataset.convolve_filter_with_dynamic_kernel`
+
+    :param array values: grid values (x, y), masked values must be set to 0
+    :param array[bool] valid: False for masked pixels
+    :param bool wrap: True if grid is circular along x
+    :param numpy.dtype compute_dtype: type of kernel and result
+    :param bool,float extend: if set, pixels with a sum of valid weights lower than extend * kernel sum are masked
+    :param array rows: increasing indices of rows to filter
+    :param array lats: latitude of rows
+    :param func kernel_func: function which give kernel for a latitude
+    :param dict kwargs_func: keywords of kernel_func
+    :param str method: "direct", "fft" or "auto", look at
+        :py:meth:`RegularGridDataset.convolve_filter_with_dynamic_kernel`
+    :param int fft_band: Maximal number of rows which share Fourier transforms of latitude band
+    :param int fft_kernel_size: Minimal number of kernel pixels to use fft with method auto
+    :return: filtered values and mask of rows
+    :rtype: (array, array[bool])
+    """
+    nb_rows = rows.shape[0]
+    values_out = empty((nb_rows, values.shape[0]), dtype="f8")
+    weights_out = empty((nb_rows, values.shape[0]), dtype="f8")
+    kernels = [
+        kernel_func(lat, **kwargs_func).astype(compute_dtype, copy=False)
+        for lat in lats
+    ]
+    if method == "direct":
+        use_fft = zeros(nb_rows, dtype="bool")
+    elif method == "fft":
+        use_fft = ones(nb_rows, dtype="bool")
+    else:
+        use_fft = array([kernel.size >= fft_kernel_size for kernel in kernels])
+    # Rows in frequency domain
+    i_fft = where(use_fft)[0]
+    for i in range(0, i_fft.shape[0], fft_band):
+        i_band = i_fft[i : i + fft_band]
+        values_band = empty((i_band.shape[0], values.shape[0]), dtype="f8")
+        weights_band = empty((i_band.shape[0], values.shape[0]), dtype="f8")
+        convolve_rows_fft(
+            values,
+            valid,
+            [kernels[j] for j in i_band],
+            rows[i_band],
+            wrap,
+            values_band,
+            weights_band,
+        )
+        values_out[i_band], weights_out[i_band] = values_band, weights_band
+    # Consecutive rows which share kernel shape are filtered in one call
+    i_direct = where(~use_fft)[0]
+    i0 = 0
+    for i1 in range(1, i_direct.shape[0] + 1):
+        if (
+            i1 < i_direct.shape[0]
+            and i_direct[i1] == i_direct[i1 - 1] + 1
+            and kernels[i_direct[i1]].shape == kernels[i_direct[i0]].shape
+        ):
+            continue
+        j0, j1 = i_direct[i0], i_direct[i1 - 1] + 1
+        convolve_rows_(
+            values,
+            valid,
+            stack(kernels[j0:j1]),
+            rows[j0:j1],
+            wrap,
+            values_out[j0:j1],
+            weights_out[j0:j1],
+        )
+        i0 = i1
+    if extend:
+        kernel_sums = array([kernel.sum() for kernel in kernels])
+        mask_out = weights_out < (extend * kernel_sums.reshape(-1, 1))
+    else:
+        mask_out = zeros(values_out.shape, dtype="bool")
+    return values_out.T.astype(compute_dtype), mask_out.T
+
+
+def convolve_rows_fft(values, valid, kernels, rows, wrap, values_rows, weights_rows):
+    """
+    Apply kernels only on some rows of a grid in frequency domain along x, kernel weights are normalized
+    with weights of valid pixels. Result is the same than :py:func:`convolve_rows_` with round-off differences.
+
+    Fourier transforms of rows of latitude band are computed once for all rows, each row is the sum of
+    products of transforms of band rows with transforms of kernel columns.
+
+    :param array values: grid values (x, y), masked values must be set to 0
+    :param array[bool] valid: False for masked pixels
+    :param list(array) kernels: kernels with odd sizes, centered on pixel, one by row
+    :param array rows: increasing indices of rows to compute
+    :param bool wrap: True if grid is circular along x
+    :param array values_rows: filtered values (row, x), nan if no valid pixels are used
+    :param array weights_rows: sum of kernel weights of valid pixels (row, x)
+    """
+    nb_x, nb_y = values.shape
+    d_x = max(kernel.shape[0] for kernel in kernels) // 2
+    d_y = max(kernel.shape[1] for kernel in kernels) // 2
+    # Circular grid is periodic like transform, else zeros are added to avoid aliasing
+    nb_fft = nb_x if wrap else next_fast_len(nb_x + d_x)
+    j0, j1 = max(rows[0] - d_y, 0), min(rows[-1] + d_y, nb_y)
+    band = zeros((2, j1 - j0, nb_fft))
+    band[0, :, :nb_x] = values[:, j0:j1].T
+    band[1, :, :nb_x] = valid[:, j0:j1].T
+    band = rfft(band, axis=2)
+    for i_row, (kernel, row) in enumerate(zip(kernels, rows)):
+        k_x, k_y = kernel.shape
+        d_x, d_y = k_x // 2, k_y // 2
+        # Like direct filtering band of one row stops before row + d_y
+        ja, jb = max(row - d_y, 0), min(row + d_y, nb_y)
+        columns = kernel[:, ja - row + d_y : jb - row + d_y].T
+        # Kernel columns centered on first pixel, folded if kernel is larger than a circular grid
+        kernel_ = zeros((jb - ja, nb_fft))
+        i_x = (arange(k_x) - d_x) % nb_fft
+        if k_x <= nb_fft:
+            kernel_[:, i_x] = columns
+        else:
+            for i in range(k_x):
+                kernel_[:, i_x[i]] += columns[:, i]
+        # Correlation is given with conjugate of kernel transform
+        sums = (band[:, ja - j0 : jb - j0] * rfft(kernel_, axis=1).conj()).sum(axis=1)
+        sum_values, sum_weights = irfft(sums, nb_fft, axis=1)[:, :nb_x]
+        # Round-off gives weights close to 0 where no valid pixels are used
+        no_weights = abs(sum_weights) < (abs(columns).sum() * 1e-10)
+        sum_weights[no_weights] = 0
+        weights_rows[i_row] = sum_weights
+        with errstate(invalid="ignore", divide="ignore"):
+            values_rows[i_row] = sum_values / sum_weights
+        values_rows[i_row, no_weights] = nan
+
+
+def stencil_weights(stencil_halfwidth=4):
+    """
+    Stencil weights from the largest to the smallest, followed by uncentered differences
+
+    :param int stencil_halfwidth: from 1 to 4, maximal stencil used
+    :return: weights, weight given with a shift in a tuple must be applied on data shifted of one pixel
+    :rtype: list
+    """
+    stencil_halfwidth = max(min(int(stencil_halfwidth), 4), 1)
+    logger.debug("Stencil half width apply : %d", stencil_halfwidth)
+    weights = [
+        array((3, -32, 168, -672, 0, 672, -168, 32, -3)) / 840.0,
+        array((-1, 9, -45, 0, 45, -9, 1)) / 60.0,
+        array((1, -8, 0, 8, -1)) / 12.0,
+        array((-1, 0, 1)) / 2.0,
+        # uncentered kernel
+        # like array((0, -1, 1)) but left value could be default value
+        array((-1, 1)),
+        # like array((-1, 1, 0)) but right value could be default value
+        (1, array((-1, 1))),
+    ]
+    # reduce to stencil selected
+    return weights[4 - stencil_halfwidth :]
+
+
+def progress_printer():
+    """Give a progress function which print remaining time and expected end of a task
+
+    :return: function to call with number of items done and number of items
+    :rtype: func
+    """
+    t0 = datetime.now()
+
+    def progress(nb_done, nb_total):
+        now = datetime.now()
+        remain = (now - t0) / nb_done * (nb_total - nb_done)
+        print(
+            "Remain ",
+            remain,
+            "ETA ",
+            now + remain,
+            "Step : %d/%d    " % (nb_done, nb_total),
+            end="\r" if nb_done < nb_total else "\n",
+        )
+
+    return progress
+
+
+def eddies_as_arrays(a_and_c):
+    """
+    Give observations of eddies as arrays to be sent between processes
+
+    :param list(EddiesObservations) a_and_c: anticyclones and cyclones
+    :return: for anticyclones and cyclones, observations and keywords to build
+        an :py:class:`~py_eddy_tracker.observations.observation.EddiesObservations`
+    :rtype: list
+    """
+    return [
+        (
+            eddies.obs,
+            dict(
+                track_extra_variables=eddies.track_extra_variables,
+                track_array_variables=eddies.track_array_variables,
+                array_variables=eddies.array_variables,
+            ),
+        )
+        for eddies in a_and_c
+    ]
+
+
+def eddies_from_arrays(results):
+    """
+    Build anticyclones and cyclones from :py:func:`eddies_as_arrays` output
+
+    :param list results: observations and keywords for anticyclones and cyclones
+    :return: anticyclones and cyclones
+    :rtype: list(EddiesObservations)
+    """
+    a_and_c = list()
+    for sign_type, (obs, kw_obs) in zip((1, -1), results):
+        eddies = EddiesObservations(size=0, **kw_obs)
+        eddies.observations = obs
+        eddies.sign_type = sign_type
+        a_and_c.append(eddies)
+    return a_and_c
+
+
+def identification_on_tile(tile, args, kwargs):
+    """
+    Run identification on a tile, observations are given as arrays to be sent
+    between processes
+
+    :param RegularGridDataset tile: grid of tile
+    :param tuple args: arguments of :py:meth:`GridDataset.eddy_identification`
+    :param dict kwargs: keywords of :py:meth:`GridDataset.eddy_identification`
+    :return: look at :py:func:`eddies_as_arrays`
+    :rtype: list
+    """
+    return eddies_as_arrays(tile.eddy_identification(*args, **kwargs))
+
+
+def numba_threads_started():
+    """Check if numba threads were started in this process by a parallel kernel
+
+    :rtype: bool
+    """
+    try:
+        threading_layer()
+    except ValueError:
+        return False
+    return True
+
+
+def process_pool_context():
+    """
+    Context to create process pools, a process forked after start of numba threads
+    (parallel advection) could stay blocked at exit, in this case processes are started
+    with forkserver (or spawn), else default method is used. With forkserver or spawn, main module
+    is imported again by workers, so scripts must protect their code with `if __name__ == "__main__":`
+
+    :return: context to give as `mp_context` to :py:class:`~concurrent.futures.ProcessPoolExecutor`
+    :rtype: multiprocessing.context.BaseContext,None
+    """
+    if not numba_threads_started():
+        return None
+    methods = get_all_start_methods()
+    return get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class IdentificationStats:
+    """
+    Wall time spent in each stage of identification and count of contours by reject code
+
+    Timings are accumulated until :py:meth:`reset`, reject counts are stored
+    for each identification.
+    """
+
+    __slots__ = ("timings", "rejects", "levels")
+
+    STAGES = (
+        "filtering",
+        "contouring",
+        "circle_fit",
+        "pixels_in",
+        "amplitude",
+        "uavg",
+        "resampling",
+        "unit_conversion",
+    )
+    #: Meaning of :py:attr:`ContourPath.reject` codes, contours with code 0 are
+    #: accepted, skipped or not evaluated
+    REJECT_CODES = ("none", "shape", "masked", "pixel_limits", "amplitude")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget all timings and reject counts"""
+        self.timings = dict.fromkeys(self.STAGES, 0.0)
+        self.rejects = list()
+        self.levels = list()
+
+    def lap(self, stage, t0):
+        """
+        Add time elapsed since t0 to a stage
+
+        :param str stage: name of stage, look at :py:attr:`STAGES`
+        :param float t0: value of :py:func:`time.perf_counter` at stage start
+        :return: current value of :py:func:`time.perf_counter`
+        :rtype: float
+        """
+        t1 = perf_counter()
+        self.timings[stage] += t1 - t0
+        return t1
+
+    def add_rejects(self, contours):
+        """
+        Count contours by level and reject code at the end of an identification
+
+        :param Contours contours: contours used by identification
+        """
+        _, reject = contours.get_flags()
+        nb_level = contours.nb_contour_per_level.shape[0]
+        nb_code = len(self.REJECT_CODES)
+        level = repeat(arange(nb_level), contours.nb_contour_per_level)
+        counts = bincount(level * nb_code + reject, minlength=nb_level * nb_code)
+        self.rejects.append(counts.reshape(nb_level, nb_code))
+        self.levels.append(contours.levels.copy())
+
+    def __repr__(self):
+        elements = ["Wall time by stage :"]
+        for stage in self.STAGES:
+            elements.append(f"    {stage:<16} {self.timings[stage]:10.3f} s")
+        if len(self.rejects):
+            elements.append("Contours by reject code (last identification) :")
+            for code, nb in zip(self.REJECT_CODES, self.rejects[-1].sum(axis=0)):
+                elements.append(f"    {code:<16} {nb:10d}")
+        return "\n".join(elements)
+
+
+class GridVariables(dict):
+    """
+    Variables of a grid by name, a version is given to a variable each time it is set
+    (augmented assignment like ``vars[name] -= data`` included), so values computed from
+    a variable could be kept while its version is the same
+    """
+
+    __slots__ = ("versions", "counter")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.versions = dict()
+        self.counter = 0
+        self.update(*args, **kwargs)
+
+    def touch(self, name):
+        """Give a new version to a variable, must be called when a variable is modified in place
+
+        :param str name: variable modified
+        """
+        self.counter += 1
+        self.versions[name] = self.counter
+
+    def version(self, name):
+        """
+        :param str name: variable name
+        :return: version of the variable, None if variable was never set
+        :rtype: int,None
+        """
+        return self.versions.get(name, None)
+
+    def __setitem__(self, name, value):
+        super().__setitem__(name, value)
+        self.touch(name)
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        self.touch(name)
+
+    def pop(self, name, *args):
+        self.touch(name)
+        return super().pop(name, *args)
+
+    def update(self, *args, **kwargs):
+        for name, value in dict(*args, **kwargs).items():
+            self[name] = value
+
+    def __reduce__(self):
+        # Items must be set before versions when unpickled
+        return (
+            self.__class__,
+            (dict(self),),
+            (None, dict(versions=self.versions, counter=self.counter)),
+        )
+
+
+class ChunkCache:
+    """
+    Least recently used cache of arrays read in a file, total size of arrays is kept under a memory budget
+    """
+
+    __slots__ = ("budget", "nbytes", "chunks", "hits", "misses")
+
+    def __init__(self, budget):
+        """
+        :param int budget: maximal size in bytes of arrays stored, 0 disable cache
+        """
+        self.budget = budget
+        self.chunks = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(*items):
+        """Build a hashable key with names, integers, slices or arrays of indices"""
+        key = list()
+        for item in items:
+            if isinstance(item, slice):
+                key.append(("slice", item.start, item.stop, item.step))
+            elif isinstance(item, ndarray):
+                key.append(("array", *item.tolist()))
+            else:
+                key.append(item)
+        return tuple(key)
+
+    def get(self, key):
+        """
+        :param tuple key: key built with :py:meth:`key`
+        :return: array stored or None if key is unknown
+        """
+        data = self.chunks.get(key, None)
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.chunks.move_to_end(key)
+        return data
+
+    def add(self, key, data):
+        """Store an array, least recently used arrays are removed to respect budget
+
+        :param tuple key: key built with :py:meth:`key`
+        :param array data: array to store
+        """
+        if data.nbytes > self.budget:
+            return
+        if key in self.chunks:
+            self.nbytes -= self.chunks.pop(key).nbytes
+        self.chunks[key] = data
+        self.nbytes += data.nbytes
+        while self.nbytes > self.budget:
+            _, removed = self.chunks.popitem(last=False)
+            self.nbytes -= removed.nbytes
+
+    def clear(self):
+        """Remove all arrays"""
+        self.chunks.clear()
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def __repr__(self):
+        return (
+            f"{len(self)} chunks, {self.nbytes / 2 ** 20:.1f}/{self.budget / 2 ** 20:.1f} Mo, "
+            f"{self.hits} hits, {self.misses} misses"
+        )
+
+
+class KernelBank(ChunkCache):
+    """
+    Filter kernels stored by kind, grid steps, latitude, wave length and order.
+    Kernels don't depend on grid values, so they could be shared by all grids with the same geometry
+    and saved in a npz file to be reused by other runs.
+    """
+
+    __slots__ = ("nb_new", "lock")
+
+    def __init__(self, budget):
+        """
+        :param int budget: maximal size in bytes of kernels stored
+        """
+        super().__init__(budget)
+        self.nb_new = 0
+        self.lock = Lock()
+
+    @staticmethod
+    def kernel_key(kind, x_step, y_step, lat, wave_length, order):
+        """
+        :return: key of kernel
+        :rtype: tuple
+        """
+        return (kind, *(float(v) for v in (x_step, y_step, lat, wave_length, order)))
+
+    def get_kernel(self, key, build):
+        """Give kernel stored or build it
+
+        :param tuple key: key given by :py:meth:`kernel_key`
+        :param func build: function without argument to build kernel
+        :return: kernel, read only
+        :rtype: array
+        """
+        with self.lock:
+            kernel = self.get(key)
+        if kernel is None:
+            kernel = build()
+            kernel.setflags(write=False)
+            with self.lock:
+                self.add(key, kernel)
+                self.nb_new += 1
+        return kernel
+
+    def save(self, filename, x_step=None, y_step=None):
+        """Save kernels in a npz file
+
+        :param str filename: npz filename
+        :param float,None x_step: if set, only kernels of grids with this step along x are saved
+        :param float,None y_step: if set, only kernels of grids with this step along y are saved
+        """
+        with self.lock:
+            kernels = {
+                "_".join(map(str, key)): v
+                for key, v in self.chunks.items()
+                if (x_step is None or key[1] == float(x_step))
+                and (y_step is None or key[2] == float(y_step))
+            }
+            self.nb_new = 0
+        savez(filename, **kernels)
+        logger.debug("%d kernels saved in %s", len(kernels), filename)
+
+    def load(self, filename):
+        """Add kernels saved with :py:meth:`save`
+
+        :param str filename: npz filename
+        """
+        with np_load(filename) as h:
+            for name in h.files:
+                kind, *values = name.split("_")
+                kernel = h[name]
+                kernel.setflags(write=False)
+                with self.lock:
+                    self.add(self.kernel_key(kind, *values), kernel)
+        logger.debug("%d kernels loaded from %s", len(h.files), filename)
+
+
+#: Kernels used by filters of all grids of process
+KERNEL_BANK = KernelBank(256 * 2 ** 20)
+
+
+class CurvilinearLocator:
+    """
+    Locate points in cells of a curvilinear grid, cells are walked from the cell of the previous point
+    (or the last cell found), a KD-tree on grid nodes gives start cell only if walk fails.
+    A locator is shared by all grids with the same coordinates (:py:meth:`from_coordinates`).
+    """
+
+    #: Maximal number of cells visited from the cell of the previous point before to use KD-tree
+    WALK_STEP = 128
+
+    __slots__ = ("x_c", "y_c", "tree", "hint")
+
+    def __init__(self, x_c, y_c):
+        """
+        :param array x_c: x coordinates of nodes (x, y)
+        :param array y_c: y coordinates of nodes (x, y)
+        """
+        self.x_c = ascontiguousarray(ma.getdata(x_c), dtype="f8")
+        self.y_c = ascontiguousarray(ma.getdata(y_c), dtype="f8")
+        logger.debug("Create a KdTree could be long ...")
+        self.tree = cKDTree(create_vertice(self.x_c.reshape(-1), self.y_c.reshape(-1)))
+        logger.debug("... OK")
+        # Last cell found
+        self.hint = zeros(2, dtype=int_)
+
+    @property
+    def nbytes(self):
+        """Approximative memory size of coordinates and tree"""
+        return self.x_c.nbytes * 5
+
+    @classmethod
+    def from_coordinates(cls, x_c, y_c):
+        """Give locator of coordinates, built only if coordinates are not in :py:data:`CURVILINEAR_LOCATORS`
+
+        :param array x_c: x coordinates of nodes (x, y)
+        :param array y_c: y coordinates of nodes (x, y)
+        :rtype: CurvilinearLocator
+        """
+        key = ChunkCache.key(
+            "curvilinear",
+            x_c.shape,
+            x_c.dtype.str,
+            y_c.dtype.str,
+            sha1(ascontiguousarray(ma.getdata(x_c))).hexdigest(),
+            sha1(ascontiguousarray(ma.getdata(y_c))).hexdigest(),
+        )
+        locator = CURVILINEAR_LOCATORS.get(key)
+        if locator is None:
+            locator = cls(x_c, y_c)
+            CURVILINEAR_LOCATORS.add(key, locator)
+        return locator
+
+    def nearest_nodes(self, x, y):
+        """Nearest nodes with KD-tree
+
+        :param array x: x coordinates
+        :param array y: y coordinates
+        :return: indices of nodes
+        :rtype: array, array
+        """
+        _, idx = self.tree.query(create_vertice(x, y), k=1)
+        return divmod(idx, self.x_c.shape[1])
+
+    def locate(self, x, y):
+        """Cells which contain points, with local coordinates of points in cells
+
+        :param array x: x coordinates
+        :param array y: y coordinates
+        :return: indices of cells (-1 if point is not in grid) and local coordinates
+            (between 0 and 1) along x and y
+        :rtype: array, array, array, array
+        """
+        x = ascontiguousarray(x, dtype="f8").reshape(-1)
+        y = ascontiguousarray(y, dtype="f8").reshape(-1)
+        nb = x.shape[0]
+        i_cell, j_cell = empty(nb, dtype=int_), empty(nb, dtype=int_)
+        s_cell, t_cell = empty(nb), empty(nb)
+        start = full(nb, -1, dtype=int_)
+        locate_in_cells(
+            self.x_c,
+            self.y_c,
+            x,
+            y,
+            start,
+            start,
+            self.hint,
+            i_cell,
+            j_cell,
+            s_cell,
+            t_cell,
+            self.WALK_STEP,
+        )
+        missed = where(i_cell == -1)[0]
+        if missed.shape[0]:
+            # Walk again from nearest node
+            i_start, j_start = self.nearest_nodes(x[missed], y[missed])
+            values = [
+                empty(missed.shape[0], dtype=v.dtype)
+                for v in (i_cell, j_cell, s_cell, t_cell)
+            ]
+            locate_in_cells(
+                self.x_c,
+                self.y_c,
+                x[missed],
+                y[missed],
+                i_start,
+                j_start,
+                self.hint,
+                *values,
+            )
+            for v, v_missed in zip((i_cell, j_cell, s_cell, t_cell), values):
+                v[missed] = v_missed
+        return i_cell, j_cell, s_cell, t_cell
+
+    def nearest(self, x, y):
+        """Nearest corner of cells which contain points, nearest node with KD-tree if point is not in grid
+
+        :param array x: x coordinates
+        :param array y: y coordinates
+        :return: indices of nodes
+        :rtype: array, array
+        """
+        x = ascontiguousarray(x, dtype="f8").reshape(-1)
+        y = ascontiguousarray(y, dtype="f8").reshape(-1)
+        i_cell, j_cell, _, _ = self.locate(x, y)
+        i_x, i_y = empty(x.shape[0], dtype=int_), empty(x.shape[0], dtype=int_)
+        m = i_cell == -1
+        if m.any():
+            i_x[m], i_y[m] = self.nearest_nodes(x[m], y[m])
+        m = ~m
+        i_corner = i_cell[m].reshape(-1, 1) + array((0, 1, 1, 0))
+        j_corner = j_cell[m].reshape(-1, 1) + array((0, 0, 1, 1))
+        d = (self.x_c[i_corner, j_corner] - x[m].reshape(-1, 1)) ** 2 + (
+            self.y_c[i_corner, j_corner] - y[m].reshape(-1, 1)
+        ) ** 2
+        k = d.argmin(axis=1)
+        i_x[m] = i_corner[arange(k.shape[0]), k]
+        i_y[m] = j_corner[arange(k.shape[0]), k]
+        return i_x, i_y
+
+
+#: Locators of curvilinear grids, shared by grids with the same coordinates
+CURVILINEAR_LOCATORS = ChunkCache(512 * 2 ** 20)
 
 
 class GridDataset(object):
     """
     Class to have basic tool on NetCDF Grid
+
+    File is opened for each access, unless grid is used as a context manager (or :py:meth:`open` is called),
+    in this case one handle is kept until :py:meth:`close`.
+
+    .. code-block:: python
+
+        with RegularGridDataset(filename, "longitude", "latitude") as g:
+            for i in range(10):
+                tile = g.grid_tiles("adt", slice(i * 100, (i + 1) * 100), slice(None))
     """
 
     __slots__ = (
@@ -259,6 +1050,11 @@ class GridDataset(object):
         "global_attrs",
         "vars",
         "contours",
+        "level_sets",
+        "stats",
+        "dtype",
+        "chunk_cache",
+        "_handler",
     )
 
     GRAVITY = 9.807
@@ -268,7 +1064,15 @@ class GridDataset(object):
     N = 1
 
     def __init__(
-        self, filename, x_name, y_name, centered=None, indexs=None, unset=False
+        self,
+        filename,
+        x_name,
+        y_name,
+        centered=None,
+        indexs=None,
+        unset=False,
+        dtype=None,
+        cache_size=128 * 2 ** 20,
     ):
         """
         :param str filename: Filename to load
@@ -277,6 +1081,10 @@ class GridDataset(object):
         :param bool,None centered: Allow to know how coordinates could be used with pixel
         :param dict indexs: A dictionary which set indexs to use for non-coordinate dimensions
         :param bool unset: Set to True to create an empty grid object without file
+        :param str,None dtype:
+            If set (like 'f4'), variables are cast at loading and filtering, speed computation
+            and identification are computed with this type, else computations are done in float64
+        :param int cache_size: Memory budget in bytes of chunks read by :py:meth:`grid_tiles`
         """
         self.dimensions = None
         self.variables_description = None
@@ -289,9 +1097,14 @@ class GridDataset(object):
         self.y_dim = None
         self.centered = centered
         self.contours = None
+        self.level_sets = None
+        self.stats = IdentificationStats()
+        self.dtype = None if dtype is None else dtype_(dtype)
+        self.chunk_cache = ChunkCache(cache_size)
+        self._handler = None
         self.filename = filename
         self.coordinates = x_name, y_name
-        self.vars = dict()
+        self.vars = GridVariables()
         self.indexs = dict() if indexs is None else indexs
         if centered is None:
             logger.warning(
@@ -301,6 +1114,62 @@ class GridDataset(object):
             self.load_general_features()
             self.load()
 
+    def open(self):
+        """Open file and keep handle until :py:meth:`close`
+
+        :return: grid itself
+        """
+        if self._handler is None:
+            logger.debug("Open %s", self.filename)
+            self._handler = Dataset(self.filename)
+        return self
+
+    def close(self):
+        """Close handle opened by :py:meth:`open` and clear chunk cache"""
+        if self._handler is not None:
+            self._handler.close()
+            self._handler = None
+        self.chunk_cache.clear()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def is_opened(self):
+        """True if a handle is kept on file"""
+        return self._handler is not None
+
+    @contextmanager
+    def dataset(self):
+        """Give a dataset on file, handle kept by :py:meth:`open` if grid is opened,
+        else a new one closed at exit
+
+        :rtype: netCDF4.Dataset
+        """
+        if self._handler is not None:
+            yield self._handler
+        else:
+            with Dataset(self.filename) as h:
+                yield h
+
+    def __getstate__(self):
+        # File handle couldn't be shared, chunks are not copied
+        state = dict()
+        for cls in self.__class__.__mro__:
+            for attr in getattr(cls, "__slots__", ()):
+                if hasattr(self, attr):
+                    state[attr] = getattr(self, attr)
+        state["_handler"] = None
+        state["chunk_cache"] = ChunkCache(self.chunk_cache.budget)
+        return state
+
+    def __setstate__(self, state):
+        for attr, value in state.items():
+            setattr(self, attr, value)
+
     @property
     def is_centered(self):
         """Give True if pixel is described with its center's position or
@@ -319,7 +1188,7 @@ class GridDataset(object):
         logger.debug(
             "Load general feature from %(filename)s", dict(filename=self.filename)
         )
-        with Dataset(self.filename) as h:
+        with self.dataset() as h:
             # Load generals
             self.dimensions = {i: len(v) for i, v in h.dimensions.items()}
             self.variables_description = dict()
@@ -382,7 +1251,7 @@ class GridDataset(object):
         Get coordinates and setup coordinates function
         """
         x_name, y_name = self.coordinates
-        with Dataset(self.filename) as h:
+        with self.dataset() as h:
             self.x_dim = h.variables[x_name].dimensions
             self.y_dim = h.variables[y_name].dimensions
 
@@ -448,7 +1317,7 @@ class GridDataset(object):
         stored_units = self.variables_description[varname]["attrs"].get("units", None)
         if stored_units is not None:
             return stored_units
-        with Dataset(self.filename) as h:
+        with self.dataset() as h:
             var = h.variables[varname]
             if hasattr(var, "units"):
                 return var.units
@@ -493,42 +1362,170 @@ class GridDataset(object):
 
         .. minigallery:: py_eddy_tracker.GridDataset.grid
         """
-        if indexs is None:
-            indexs = dict()
         if varname not in self.vars:
-            coordinates_dims = list(self.x_dim)
-            coordinates_dims.extend(list(self.y_dim))
-            logger.debug(
-                "Load %(varname)s from %(filename)s",
-                dict(varname=varname, filename=self.filename),
+            with self.dataset() as h:
+                self.read_variable(h, varname, indexs)
+        if not hasattr(self.vars[varname], "mask"):
+            self.vars[varname] = ma.array(
+                self.vars[varname],
+                mask=zeros(self.vars[varname].shape, dtype="bool"),
             )
-            with Dataset(self.filename) as h:
-                dims = h.variables[varname].dimensions
-                sl = [
-                    indexs.get(
-                        dim,
-                        self.indexs.get(
-                            dim, slice(None) if dim in coordinates_dims else 0
-                        ),
-                    )
-                    for dim in dims
-                ]
-                self.vars[varname] = h.variables[varname][sl]
-                if len(self.x_dim) == 1:
-                    i_x = where(array(dims) == self.x_dim)[0][0]
-                    i_y = where(array(dims) == self.y_dim)[0][0]
-                    if i_x > i_y:
-                        self.variables_description[varname]["infos"]["transpose"] = True
-                        self.vars[varname] = self.vars[varname].T
-            if not hasattr(self.vars[varname], "mask"):
-                self.vars[varname] = ma.array(
-                    self.vars[varname],
-                    mask=zeros(self.vars[varname].shape, dtype="bool"),
-                )
+        if self.dtype is not None and self.is_data_field(varname):
+            self.vars[varname] = self.vars[varname].astype(self.dtype)
         return self.vars[varname]
 
+    def is_data_field(self, varname):
+        """Check if a variable must be cast in :py:attr:`dtype`, only floating data fields are cast,
+        coordinates are kept in float64 and integer or flag variables keep their type
+
+        :param str varname: Variable to check
+        :rtype: bool
+        """
+        if varname in self.coordinates:
+            return False
+        var_dtype = self.vars[varname].dtype
+        return var_dtype.kind == "f" and var_dtype != self.dtype
+
+    def read_variable(self, handler, varname, indexs=None):
+        """Read a variable in an opened dataset and store it in grid,
+        mask and type are set at the first call of :py:meth:`grid`
+
+        :param netCDF4.Dataset handler: dataset opened on grid file
+        :param str varname: Variable to read
+        :param dict,None indexs: If defined dict must have dimensions name as key
+        """
+        if indexs is None:
+            indexs = dict()
+        coordinates_dims = list(self.x_dim)
+        coordinates_dims.extend(list(self.y_dim))
+        logger.debug(
+            "Load %(varname)s from %(filename)s",
+            dict(varname=varname, filename=self.filename),
+        )
+        dims = handler.variables[varname].dimensions
+        sl = [
+            indexs.get(
+                dim,
+                self.indexs.get(dim, slice(None) if dim in coordinates_dims else 0),
+            )
+            for dim in dims
+        ]
+        self.vars[varname] = handler.variables[varname][sl]
+        if len(self.x_dim) == 1:
+            i_x = where(array(dims) == self.x_dim)[0][0]
+            i_y = where(array(dims) == self.y_dim)[0][0]
+            if i_x > i_y:
+                self.variables_description[varname]["infos"]["transpose"] = True
+                self.vars[varname] = self.vars[varname].T
+
+    def share_coordinates(self, indexs):
+        """
+        Give a new grid on the same file which shares coordinates, their setup and
+        variable descriptions with this grid, only indexs of non-coordinate dimensions change.
+        No variables are loaded.
+
+        :param dict indexs: indexs to update, like {"time": 5}
+        :return: grid without variables
+        :rtype: GridDataset
+        """
+        new = object.__new__(self.__class__)
+        new.__setstate__(self.__getstate__())
+        new.indexs = dict(self.indexs, **indexs)
+        new.variables_description = {
+            k: dict(v, infos=v["infos"].copy())
+            for k, v in self.variables_description.items()
+        }
+        new.vars = GridVariables((name, self.vars[name]) for name in self.coordinates)
+        new.contours = None
+        new.level_sets = None
+        new.stats = IdentificationStats()
+        return new
+
+    @staticmethod
+    def time_cube_dates(filename, t_name):
+        """Read dates of a NetCDF cube
+
+        :param str filename: NetCDF file
+        :param str t_name: Name of time variable, it must have units
+        :return: dimension of time and dates
+        :rtype: (str, array(datetime.datetime))
+        """
+        with Dataset(filename) as h:
+            return GridDataset._time_cube_dates(h, t_name)
+
+    @staticmethod
+    def _time_cube_dates(handler, t_name):
+        t = handler.variables[t_name]
+        dates = num2date(
+            t[:],
+            t.units,
+            getattr(t, "calendar", "standard"),
+            only_use_cftime_datetimes=False,
+            only_use_python_datetimes=True,
+        )
+        return t.dimensions[0], array(dates).reshape(-1)
+
+    @classmethod
+    def iter_time_cube(
+        cls, filename, x_name, y_name, t_name, varnames, steps=None, **kwargs
+    ):
+        """
+        Give grids of each time step of a NetCDF cube. File is opened once,
+        coordinates are loaded and set up once and shared by all grids
+        (look at :py:meth:`share_coordinates`).
+
+        :param str filename: NetCDF file with a time dimension
+        :param str x_name: Name of longitude coordinates
+        :param str y_name: Name of latitude coordinates
+        :param str t_name: Name of time variable
+        :param list(str) varnames: Variables read for each step
+        :param list(int),None steps: Indices of steps to read, by default all steps
+        :param dict kwargs: look at :py:class:`GridDataset`
+        :return: for each step, index, date and grid
+        :rtype: (int, datetime.datetime, GridDataset)
+
+        .. code-block:: python
+
+            for i, date, g in RegularGridDataset.iter_time_cube(
+                filename, "longitude", "latitude", "time", ("adt",)
+            ):
+                g.add_uv("adt")
+        """
+        with cls(filename, x_name, y_name, unset=True, **kwargs) as template:
+            with template.dataset() as h:
+                t_dim, dates = cls._time_cube_dates(h, t_name)
+            if steps is None:
+                steps = range(dates.shape[0])
+            template.indexs = dict(template.indexs, **{t_dim: 0})
+            template.load_general_features()
+            template.load()
+            for i in steps:
+                grid = template.share_coordinates({t_dim: i})
+                with template.dataset() as h:
+                    for varname in varnames:
+                        grid.read_variable(h, varname)
+                        grid.grid(varname)
+                yield i, dates[i], grid
+
+    @property
+    def compute_dtype(self):
+        """Type used for computation on grids, float64 if no type is forced"""
+        return dtype_("f8") if self.dtype is None else self.dtype
+
     def grid_tiles(self, varname, slice_x, slice_y):
-        """Give the grid tiles required, without buffer system"""
+        """Give the grid tiles required, tiles are kept in :py:attr:`chunk_cache`,
+        so a tile read again doesn't access file
+
+        :param str varname: Variable to get
+        :param slice,array slice_x: indices along x
+        :param slice,array slice_y: indices along y
+        :return: a copy of the tile
+        :rtype: array
+        """
+        key = self.chunk_cache.key(varname, slice_x, slice_y)
+        data = self.chunk_cache.get(key)
+        if data is not None:
+            return data.copy()
         coordinates_dims = list(self.x_dim)
         coordinates_dims.extend(list(self.y_dim))
         logger.debug(
@@ -540,7 +1537,7 @@ class GridDataset(object):
                 slice_x=slice_x,
             ),
         )
-        with Dataset(self.filename) as h:
+        with self.dataset() as h:
             dims = h.variables[varname].dimensions
             sl = [
                 (slice_x if dim in list(self.x_dim) else slice_y)
@@ -556,7 +1553,8 @@ class GridDataset(object):
                     data = data.T
         if not hasattr(data, "mask"):
             data = ma.array(data, mask=zeros(data.shape, dtype="bool"))
-        return data
+        self.chunk_cache.add(key, data)
+        return data.copy()
 
     def high_filter(self, grid_name, w_cut, **kwargs):
         """Return the grid high-pass filtered, by substracting to the grid the low-pass filter (default: order=1)
@@ -600,6 +1598,9 @@ class GridDataset(object):
         precision=None,
         force_height_unit=None,
         force_speed_unit=None,
+        concurrent_search=False,
+        levels=None,
+        engine="contour",
         **kwargs,
     ):
         """
@@ -618,6 +1619,14 @@ class GridDataset(object):
         :param float,None precision: Truncate values at the defined precision in m
         :param str force_height_unit: Unit used for height unit
         :param str force_speed_unit: Unit used for speed unit
+        :param bool concurrent_search:
+            If True, anticyclonic and cyclonic searches will be run in two processes,
+            results are the same than with a sequential search
+        :param array,None levels:
+            Levels of contours in grid unit, by default levels are defined with step between grid extrema
+        :param str engine:
+            'contour' to search eddies in iso lines, 'raster' to search eddies in connected regions
+            of pixels above or below each level, look at :py:class:`~py_eddy_tracker.eddy_feature.LevelSets`
         :param dict kwargs: Argument given to amplitude
 
         :return: Return a list of 2 elements: Anticyclone and Cyclone
@@ -625,24 +1634,178 @@ class GridDataset(object):
 
         .. minigallery:: py_eddy_tracker.GridDataset.eddy_identification
         """
-        if not isinstance(date, datetime):
-            raise Exception("Date argument be a datetime object")
-        # The inf limit must be in pixel and  sup limit in surface
-        if pixel_limit is None:
-            pixel_limit = (4, 1000)
-
-        # Compute an interpolator for eke
-        self.init_speed_coef(uname, vname)
-
-        # Get unit of h grid
-
+        parameters = dict(
+            shape_error=shape_error,
+            sampling=sampling,
+            sampling_method=sampling_method,
+            pixel_limit=pixel_limit,
+            **kwargs,
+        )
+        return self.eddy_identification_sweep(
+            grid_height,
+            uname,
+            vname,
+            date,
+            [parameters],
+            step=step,
+            precision=precision,
+            force_height_unit=force_height_unit,
+            force_speed_unit=force_speed_unit,
+            concurrent_search=concurrent_search,
+            levels=levels,
+            engine=engine,
+        )[0]
+
+    def eddy_identification_sweep(
+        self,
+        grid_height,
+        uname,
+        vname,
+        date,
+        parameters,
+        step=0.005,
+        precision=None,
+        force_height_unit=None,
+        force_speed_unit=None,
+        concurrent_search=False,
+        levels=None,
+        engine="contour",
+        **kwargs,
+    ):
+        """
+        Compute several eddy identifications with different settings on the same contours.
+
+        Contours, circle fits and pixels in contours are computed once, contour flags are
+        reset before each identification. Parameters which are not described here are the
+        same than in :py:meth:`eddy_identification`.
+
+        :param list(dict) parameters:
+            One set of settings by identification, keys could be `shape_error`, `sampling`,
+            `sampling_method`, `pixel_limit` and amplitude keywords,
+            look at :py:meth:`eddy_identification`
+        :param dict kwargs: Settings shared by all sets, overwritten by sets
+
+        :return: Anticyclones and Cyclones for each set of settings
+        :rtype: list(list(py_eddy_tracker.observations.observation.EddiesObservations))
+        """
+        if not isinstance(date, datetime):
+            raise Exception("Date argument be a datetime object")
+        if engine not in ("contour", "raster"):
+            raise Exception(f"Unknown identification engine : {engine}")
+        if engine == "raster" and concurrent_search:
+            raise Exception("Concurrent search is not available with raster engine")
+
+        # Compute an interpolator for eke
+        self.init_speed_coef(uname, vname)
+
+        # Get unit of h grid
+
         h_units = (
             self.units(grid_height) if force_height_unit is None else force_height_unit
         )
         units = UnitRegistry()
         in_h_unit = units.parse_expression(h_units)
-        if in_h_unit is not None:
-            factor, _ = in_h_unit.to("m").to_tuple()
+        data, step = self.identification_grid(grid_height, step, precision, in_h_unit)
+        if levels is None:
+            levels = self.identification_levels(data, step)
+
+        # Get x and y values
+        x, y = self.x_c, self.y_c
+
+        # Compute ssh contour
+        t0 = perf_counter()
+        if engine == "raster":
+            self.level_sets = LevelSets(x, y, data, levels, wrap_x=self.is_circular())
+            contours = self.level_sets
+            identification_pass = self.level_sets_identification_pass
+        else:
+            self.contours = Contours(x, y, data, levels, wrap_x=self.is_circular())
+            contours = self.contours
+            identification_pass = self.identification_pass
+        self.stats.lap("contouring", t0)
+        u_units = self.units(uname) if force_speed_unit is None else force_speed_unit
+        in_u_units = units.parse_expression(u_units)
+
+        results = list()
+        nb_contour = contours.nb_contour_per_level.sum()
+        for i, parameter in enumerate(parameters):
+            logger.info("Identification with settings %d/%d", i + 1, len(parameters))
+            contours.set_flags(
+                zeros(nb_contour, dtype="bool"), zeros(nb_contour, dtype="u1")
+            )
+            kw_pass = dict(
+                shape_error=55,
+                sampling=50,
+                sampling_method="visvalingam",
+                pixel_limit=None,
+            )
+            kw_pass.update(kwargs)
+            kw_pass.update(parameter)
+            # The inf limit must be in pixel and  sup limit in surface
+            if kw_pass["pixel_limit"] is None:
+                kw_pass["pixel_limit"] = (4, 1000)
+            # Each identification reserves pixels in mask, so each one use its own copy
+            data_ = data.copy() if i < len(parameters) - 1 else data
+            # Complete cyclonic and anticylonic research:
+            if concurrent_search:
+                a_and_c = self.concurrent_identification_pass(
+                    data_, date=date, step=step, **kw_pass
+                )
+            else:
+                a_and_c = [
+                    identification_pass(
+                        data_, anticyclonic_search, date=date, step=step, **kw_pass
+                    )
+                    for anticyclonic_search in (True, False)
+                ]
+            t0 = perf_counter()
+            self.convert_identification_units(a_and_c, units, in_h_unit, in_u_units)
+            self.stats.lap("unit_conversion", t0)
+            self.stats.add_rejects(contours)
+            results.append(a_and_c)
+        return results
+
+    @staticmethod
+    def convert_identification_units(a_and_c, units, h_unit, u_unit):
+        """
+        Convert heights and speeds of identified eddies in units of storage
+
+        :param list a_and_c: Anticyclones and Cyclones
+        :param pint.UnitRegistry units: registry used to parse units
+        :param pint.Unit,None h_unit: Unit of height grid
+        :param pint.Unit,None u_unit: Unit of speed grid
+        """
+        if h_unit is not None:
+            for name in [
+                "amplitude",
+                "height_max_speed_contour",
+                "height_external_contour",
+                "height_inner_contour",
+            ]:
+                out_unit = units.parse_expression(VAR_DESCR[name]["nc_attr"]["units"])
+                factor, _ = h_unit.to(out_unit).to_tuple()
+                a_and_c[0].obs[name] *= factor
+                a_and_c[1].obs[name] *= factor
+        if u_unit is not None:
+            for name in ["speed_average", "uavg_profile"]:
+                out_unit = units.parse_expression(VAR_DESCR[name]["nc_attr"]["units"])
+                factor, _ = u_unit.to(out_unit).to_tuple()
+                a_and_c[0].obs[name] *= factor
+                a_and_c[1].obs[name] *= factor
+
+    def identification_grid(self, grid_height, step, precision=None, h_unit=None):
+        """
+        Get height grid used by identification
+
+        :param str grid_height: Grid name of Sea Surface Height
+        :param float step: Height between two layers in m
+        :param float,None precision: Truncate values at the defined precision in m
+        :param pint.Unit,None h_unit: Unit of height grid
+        :return: height grid and step in grid unit
+        :rtype: (array, float)
+        """
+        if h_unit is not None:
+            factor, _ = h_unit.to("m").to_tuple()
             logger.info(
                 "We will apply on step a factor to be coherent with grid : %f",
                 1 / factor,
@@ -652,13 +1815,26 @@ class GridDataset(object):
                 precision /= factor
 
         # Get ssh grid
-        data = self.grid(grid_height).astype("f8")
+        data = self.grid(grid_height).astype(self.compute_dtype)
         # In case of a reduce mask
         if len(data.mask.shape) == 0 and not data.mask:
             data.mask = zeros(data.shape, dtype="bool")
         # we remove noisy information
         if precision is not None:
             data = (data / precision).round() * precision
+        return data, step
+
+    @staticmethod
+    def identification_levels(data, step):
+        """
+        Get levels of contours between grid extrema, extrema are replaced by percentiles
+        when they are far from others values
+
+        :param array data: height grid
+        :param float step: Height between two layers in grid unit
+        :return: levels
+        :rtype: array
+        """
         # Compute levels for ssh
         z_min, z_max = data.min(), data.max()
         d_z = z_max - z_min
@@ -679,16 +1855,364 @@ class GridDataset(object):
             )
             z_min, z_max = z_min_p, z_max_p
 
-        levels = arange(z_min - z_min % step, z_max - z_max % step + 2 * step, step)
+        return arange(z_min - z_min % step, z_max - z_max % step + 2 * step, step)
 
-        # Get x and y values
+    def identification_pass(
+        self,
+        data,
+        anticyclonic_search,
+        date,
+        step,
+        shape_error,
+        sampling,
+        sampling_method,
+        pixel_limit,
+        trace=None,
+        **kwargs,
+    ):
+        """
+        Search eddies of one sign in contours, pixels of accepted eddies are reserved in data mask
+
+        :param array data: Sea Surface Height grid, mask will be updated
+        :param bool anticyclonic_search: If True search anticyclones, else cyclones
+        :param array trace:
+            If given, state of each contour will be stored (1: evaluated, 2: amplitude computed, 3: accepted)
+        :param dict kwargs: look at :py:meth:`eddy_identification`
+
+        :return: eddies found
+        :rtype: py_eddy_tracker.observations.observation.EddiesObservations
+        """
         x, y = self.x_c, self.y_c
+        eddies = self.identification_buffer(sampling)
+        iterator = 1 if anticyclonic_search else -1
+        stats = self.stats
+        # Local extrema are searched once on whole grid and updated when pixels are reserved
+        t0 = perf_counter()
+        extrema = self.identification_extrema(data, anticyclonic_search)
+        stats.lap("amplitude", t0)
+        # FIXME : center could be not in contour and fit on raw sampling
+        t0 = perf_counter()
+        shape_errors = self.contours_circle_params()[:, 3]
+        stats.lap("circle_fit", t0)
+        bad_shapes = (
+            (shape_errors < 0) | (shape_errors > shape_error) | isnan(shape_errors)
+        ).tolist()
+
+        # Loop over each collection
+        for coll_ind, coll in enumerate(self.contours.iter(step=iterator)):
+            corrected_coll_index = coll_ind
+            if iterator == -1:
+                corrected_coll_index = -coll_ind - 1
+
+            contour_paths = coll.get_paths()
+            nb_paths = len(contour_paths)
+            if nb_paths == 0:
+                continue
+            cvalues = self.contours.cvalues[corrected_coll_index]
+            logger.debug(
+                "doing collection %s, contour value %.4f, %d paths",
+                corrected_coll_index,
+                cvalues,
+                nb_paths,
+            )
 
-        # Compute ssh contour
-        self.contours = Contours(x, y, data, levels, wrap_x=self.is_circular())
+            # Loop over individual c_s contours (i.e., every eddy in field)
+            i_contour = self.contours.level_index[corrected_coll_index]
+            for i_path, contour in enumerate(contour_paths):
+                if contour.used:
+                    continue
+                if trace is not None:
+                    trace[i_contour + i_path] = 1
+                # Filter for shape
+                if bad_shapes[contour.index]:
+                    contour.reject = 1
+                    continue
+                aerr = shape_errors[contour.index]
 
-        out_sampling = dict(fixed_size=sampling)
-        resample = visvalingam if sampling_method == "visvalingam" else uniform_resample
+                # Find all pixels in the contour
+                t0 = perf_counter()
+                i_x_in, i_y_in = contour.pixels_in(self)
+                stats.lap("pixels_in", t0)
+
+                # Check if pixels in contour are masked
+                if has_masked_value(data.mask, i_x_in, i_y_in):
+                    if contour.reject == 0:
+                        contour.reject = 2
+                    continue
+
+                # Test of the rotating sense: cyclone or anticyclone
+                if has_value(data, i_x_in, i_y_in, cvalues, below=anticyclonic_search):
+                    continue
+
+                # FIXME : Maybe limit max must be replace with a maximum of surface
+                if (
+                    contour.nb_pixel < pixel_limit[0]
+                    or contour.nb_pixel > pixel_limit[1]
+                ):
+                    contour.reject = 3
+                    continue
+
+                # Compute amplitude
+                if trace is not None:
+                    trace[i_contour + i_path] = 2
+                t0 = perf_counter()
+                reset_centroid, amp = self.get_amplitude(
+                    contour,
+                    cvalues,
+                    data,
+                    anticyclonic_search=anticyclonic_search,
+                    level=self.contours.levels[corrected_coll_index],
+                    interval=step,
+                    extrema=extrema,
+                    **kwargs,
+                )
+                stats.lap("amplitude", t0)
+                # If we have a valid amplitude
+                if (not amp.within_amplitude_limits()) or (amp.amplitude == 0):
+                    contour.reject = 4
+                    continue
+                if trace is not None:
+                    trace[i_contour + i_path] = 3
+                if reset_centroid:
+
+                    if self.is_circular():
+                        centi = self.normalize_x_indice(reset_centroid[0])
+                    else:
+                        centi = reset_centroid[0]
+                    centj = reset_centroid[1]
+                    # To move in regular and unregular grid
+                    if len(x.shape) == 1:
+                        centlon_e = x[centi]
+                        centlat_e = y[centj]
+                    else:
+                        centlon_e = x[centi, centj]
+                        centlat_e = y[centi, centj]
+
+                # centlat_e and centlon_e must be index of maximum, we will loose some inner contour if it's not
+                t0 = perf_counter()
+                (
+                    max_average_speed,
+                    speed_contour,
+                    inner_contour,
+                    speed_array,
+                    i_max_speed,
+                    i_inner,
+                ) = self.get_uavg(
+                    self.contours,
+                    centlon_e,
+                    centlat_e,
+                    contour,
+                    anticyclonic_search,
+                    corrected_coll_index,
+                    pixel_min=pixel_limit[0],
+                )
+                t0 = stats.lap("uavg", t0)
+
+                self.store_eddy(
+                    eddies,
+                    (contour, speed_contour, inner_contour),
+                    (
+                        cvalues,
+                        self.contours.cvalues[i_max_speed],
+                        self.contours.cvalues[i_inner],
+                    ),
+                    speed_array,
+                    max_average_speed,
+                    amp.amplitude,
+                    aerr,
+                    sampling,
+                    sampling_method,
+                    t0,
+                )
+
+                # To reserve definitively the area
+                data.mask[i_x_in, i_y_in] = True
+                self.update_identification_extrema(
+                    data, extrema, i_x_in, i_y_in, anticyclonic_search
+                )
+        return self.close_identification(eddies, anticyclonic_search, date)
+
+    def level_sets_identification_pass(
+        self,
+        data,
+        anticyclonic_search,
+        date,
+        step,
+        shape_error,
+        sampling,
+        sampling_method,
+        pixel_limit,
+        **kwargs,
+    ):
+        """
+        Search eddies of one sign in regions of :py:attr:`level_sets`, pixels of accepted eddies
+        are reserved in data mask.
+
+        Criterions are the same than in :py:meth:`identification_pass`, but pixels of a region
+        are known without any polygon test and only regions without hole are evaluated.
+        Iso lines are computed only for regions which respect pixel limits.
+
+        :param array data: Sea Surface Height grid, mask will be updated
+        :param bool anticyclonic_search: If True search anticyclones, else cyclones
+        :param dict kwargs: look at :py:meth:`eddy_identification`
+
+        :return: eddies found
+        :rtype: py_eddy_tracker.observations.observation.EddiesObservations
+        """
+        regions = self.level_sets
+        eddies = self.identification_buffer(sampling)
+        stats = self.stats
+        t0 = perf_counter()
+        extrema = self.identification_extrema(data, anticyclonic_search)
+        stats.lap("amplitude", t0)
+        # Outer regions first
+        candidates = where(regions.above == anticyclonic_search)[0]
+        if not anticyclonic_search:
+            candidates = candidates[::-1]
+        candidates = candidates[regions.nb_hole[candidates] == 0]
+        nb_pixel = regions.nb_pixel[candidates]
+        in_limits = (nb_pixel >= pixel_limit[0]) & (nb_pixel <= pixel_limit[1])
+        regions.reject[candidates[~in_limits]] = 3
+        candidates = candidates[in_limits]
+        t0 = perf_counter()
+        vertices, lines = regions.lines(candidates)
+        shape_errors = fit_circle_paths(
+            vertices[:, 0], vertices[:, 1], lines[:, 0], lines[:, 1]
+        )[:, 3]
+        stats.lap("circle_fit", t0)
+        bad_shapes = (
+            (shape_errors < 0) | (shape_errors > shape_error) | isnan(shape_errors)
+        )
+        regions.reject[candidates[bad_shapes]] = 1
+        good_shapes = ~bad_shapes
+        candidates = candidates[good_shapes]
+        contours = regions.paths(candidates, vertices, lines[good_shapes])
+
+        for contour, aerr in zip(contours, shape_errors[good_shapes].tolist()):
+            i_region = contour.index
+            if regions.used[i_region]:
+                continue
+            # Pixels of region are already known
+            t0 = perf_counter()
+            i_x_in, i_y_in = regions.region_pixels(i_region)
+            # Check if pixels in region are reserved by another eddy
+            if has_masked_value(data.mask, i_x_in, i_y_in):
+                if regions.reject[i_region] == 0:
+                    regions.reject[i_region] = 2
+                stats.lap("pixels_in", t0)
+                continue
+            contour._slice = self.bbox_indice(contour.vertices)
+            contour._pixels_in = i_x_in, i_y_in
+            stats.lap("pixels_in", t0)
+
+            # Compute amplitude
+            i_level = regions.level[i_region]
+            cvalues = regions.cvalues[i_level]
+            t0 = perf_counter()
+            reset_centroid, amp = self.get_amplitude(
+                contour,
+                cvalues,
+                data,
+                anticyclonic_search=anticyclonic_search,
+                level=regions.levels[i_level],
+                interval=step,
+                extrema=extrema,
+                **kwargs,
+            )
+            stats.lap("amplitude", t0)
+            # If we have a valid amplitude
+            if (not amp.within_amplitude_limits()) or (amp.amplitude == 0):
+                regions.reject[i_region] = 4
+                continue
+            if reset_centroid:
+                if self.is_circular():
+                    centi = self.normalize_x_indice(reset_centroid[0])
+                else:
+                    centi = reset_centroid[0]
+                centj = reset_centroid[1]
+
+            t0 = perf_counter()
+            (
+                max_average_speed,
+                speed_contour,
+                inner_contour,
+                speed_array,
+                i_max_speed,
+                i_inner,
+            ) = self.get_uavg_in_regions(
+                regions, i_region, contour, centi, centj, pixel_min=pixel_limit[0]
+            )
+            t0 = stats.lap("uavg", t0)
+            self.store_eddy(
+                eddies,
+                (contour, speed_contour, inner_contour),
+                (
+                    cvalues,
+                    regions.cvalues[regions.level[i_max_speed]],
+                    regions.cvalues[regions.level[i_inner]],
+                ),
+                speed_array,
+                max_average_speed,
+                amp.amplitude,
+                aerr,
+                sampling,
+                sampling_method,
+                t0,
+            )
+
+            # To reserve definitively the area
+            data.mask[i_x_in, i_y_in] = True
+            self.update_identification_extrema(
+                data, extrema, i_x_in, i_y_in, anticyclonic_search
+            )
+        return self.close_identification(eddies, anticyclonic_search, date)
+
+    def identification_extrema(self, data, anticyclonic_search):
+        """
+        Get local extrema used to compute amplitude of eddies of one sign
+
+        :param array data: Sea Surface Height grid
+        :param bool anticyclonic_search: If True get maxima, else minima
+        :return: True for local extrema
+        :rtype: array[bool]
+        """
+        return local_extrema_(
+            data.data,
+            data.mask,
+            -1 if anticyclonic_search else 1,
+            self.is_circular(),
+        )
+
+    def update_identification_extrema(
+        self, data, extrema, i_x, i_y, anticyclonic_search
+    ):
+        """
+        Update local extrema around pixels reserved by an eddy
+
+        :param array data: Sea Surface Height grid, with reserved pixels masked
+        :param array[bool] extrema: local extrema given by :py:meth:`identification_extrema`
+        :param array[int] i_x: index along x of reserved pixels
+        :param array[int] i_y: index along y of reserved pixels
+        :param bool anticyclonic_search: If True extrema are maxima, else minima
+        """
+        update_local_extrema_(
+            data.data,
+            data.mask,
+            extrema,
+            i_x,
+            i_y,
+            -1 if anticyclonic_search else 1,
+            self.is_circular(),
+        )
+
+    @staticmethod
+    def identification_buffer(sampling):
+        """
+        Get an empty buffer to store eddies found by an identification
+
+        :param int sampling: Number of points to store contours and speed profile
+        :rtype: py_eddy_tracker.observations.observation.ObservationsBuffer
+        """
         track_extra_variables = [
             "height_max_speed_contour",
             "height_external_contour",
@@ -703,216 +2227,252 @@ class GridDataset(object):
             "contour_lat_s",
             "uavg_profile",
         ]
-        # Complete cyclonic and anticylonic research:
-        a_and_c = list()
-        for anticyclonic_search in [True, False]:
-            eddies = list()
-            iterator = 1 if anticyclonic_search else -1
-
-            # Loop over each collection
-            for coll_ind, coll in enumerate(self.contours.iter(step=iterator)):
-                corrected_coll_index = coll_ind
-                if iterator == -1:
-                    corrected_coll_index = -coll_ind - 1
-
-                contour_paths = coll.get_paths()
-                nb_paths = len(contour_paths)
-                if nb_paths == 0:
-                    continue
-                cvalues = self.contours.cvalues[corrected_coll_index]
-                logger.debug(
-                    "doing collection %s, contour value %.4f, %d paths",
-                    corrected_coll_index,
-                    cvalues,
-                    nb_paths,
-                )
-
-                # Loop over individual c_s contours (i.e., every eddy in field)
-                for contour in contour_paths:
-                    if contour.used:
-                        continue
-                    # FIXME : center could be not in contour and fit on raw sampling
-                    _, _, _, aerr = contour.fit_circle()
+        return ObservationsBuffer(
+            track_extra_variables=track_extra_variables,
+            track_array_variables=sampling,
+            array_variables=array_variables,
+        )
 
-                    # Filter for shape
-                    if aerr < 0 or aerr > shape_error or isnan(aerr):
-                        contour.reject = 1
-                        continue
+    def store_eddy(
+        self,
+        eddies,
+        contours,
+        heights,
+        speed_array,
+        max_average_speed,
+        amplitude,
+        aerr,
+        sampling,
+        sampling_method,
+        t0,
+    ):
+        """
+        Add an accepted eddy in buffer
+
+        :param ObservationsBuffer eddies: buffer of identification
+        :param tuple contours: effective, speed and inner contours
+        :param tuple heights: heights of effective, speed and inner contours
+        :param array speed_array: average speed of each contour used
+        :param float max_average_speed: average speed of speed contour
+        :param float amplitude: amplitude of eddy
+        :param float aerr: shape error of effective contour
+        :param int sampling: Number of points to store contours and speed profile
+        :param str sampling_method: Method to resample 'uniform' or 'visvalingam'
+        :param float t0: start of resampling stage, for :py:attr:`stats`
+        """
+        contour, speed_contour, inner_contour = contours
+        out_sampling = dict(fixed_size=sampling)
+        resample = visvalingam if sampling_method == "visvalingam" else uniform_resample
+        stats = self.stats
+        # New observation written in buffer columns
+        i = eddies.add()
+        eddies["height_external_contour"][i] = heights[0]
+        eddies["height_max_speed_contour"][i] = heights[1]
+        eddies["height_inner_contour"][i] = heights[2]
+        array_size = speed_array.shape[0]
+        eddies["nb_contour_selected"][i] = array_size
+        if speed_array.shape[0] == 1:
+            eddies["uavg_profile"][i] = speed_array[0]
+        else:
+            eddies["uavg_profile"][i] = raw_resample(speed_array, sampling)
+        eddies["amplitude"][i] = amplitude
+        eddies["speed_average"][i] = max_average_speed
+        eddies["num_point_e"][i] = contour.lon.shape[0]
+        xy_e = resample(contour.lon, contour.lat, **out_sampling)
+        eddies["contour_lon_e"][i], eddies["contour_lat_e"][i] = xy_e
+        eddies["num_point_s"][i] = speed_contour.lon.shape[0]
+        xy_s = resample(speed_contour.lon, speed_contour.lat, **out_sampling)
+        eddies["contour_lon_s"][i], eddies["contour_lat_s"][i] = xy_s
+        t0 = stats.lap("resampling", t0)
+
+        # FIXME : we use a contour without resampling
+        # First, get position based on innermost contour
+        centlon_i, centlat_i, _, _ = _fit_circle_path(
+            create_vertice(inner_contour.lon, inner_contour.lat)
+        )
+        # Second, get speed-based radius based on contour of max uavg
+        centlon_s, centlat_s, eddy_radius_s, aerr_s = _fit_circle_path(
+            create_vertice(*xy_s)
+        )
+        # Compute again to use resampled contour
+        _, _, eddy_radius_e, aerr_e = _fit_circle_path(create_vertice(*xy_e))
+        stats.lap("circle_fit", t0)
+
+        eddies["radius_s"][i] = eddy_radius_s
+        eddies["radius_e"][i] = eddy_radius_e
+        eddies["shape_error_e"][i] = aerr_e
+        eddies["shape_error_s"][i] = aerr_s
+        eddies["speed_area"][i] = poly_area(
+            *coordinates_to_local(*xy_s, lon0=centlon_s, lat0=centlat_s)
+        )
+        eddies["effective_area"][i] = poly_area(
+            *coordinates_to_local(*xy_e, lon0=centlon_s, lat0=centlat_s)
+        )
+        eddies["lon"][i] = centlon_s
+        eddies["lat"][i] = centlat_s
+        eddies["lon_max"][i] = centlon_i
+        eddies["lat_max"][i] = centlat_i
+        if aerr > 99.9 or aerr_s > 99.9:
+            logger.warning(
+                "Strange shape at this step! shape_error : %f, %f",
+                aerr,
+                aerr_s,
+            )
 
-                    # Find all pixels in the contour
-                    i_x_in, i_y_in = contour.pixels_in(self)
+    @staticmethod
+    def close_identification(eddies, anticyclonic_search, date):
+        """
+        Freeze buffer of an identification and set sign, date and longitude range
 
-                    # Check if pixels in contour are masked
-                    if has_masked_value(data.mask, i_x_in, i_y_in):
-                        if contour.reject == 0:
-                            contour.reject = 2
-                        continue
+        :param ObservationsBuffer eddies: buffer of identification
+        :param bool anticyclonic_search: If True eddies are anticyclones
+        :param datetime.datetime date: Date of grid
+        :rtype: py_eddy_tracker.observations.observation.EddiesObservations
+        """
+        eddies = eddies.freeze()
+        eddies.sign_type = 1 if anticyclonic_search else -1
+        eddies.time[:] = (date - datetime(1950, 1, 1)).total_seconds() / 86400.0
+
+        # normalization longitude between 0 - 360, because storage have an offset on 180
+        eddies.lon_max[:] %= 360
+        eddies.lon[:] %= 360
+        ref = eddies.lon - 180
+        eddies.contour_lon_e[:] = ((eddies.contour_lon_e.T - ref) % 360 + ref).T
+        eddies.contour_lon_s[:] = ((eddies.contour_lon_s.T - ref) % 360 + ref).T
+        return eddies
+
+    def contours_circle_params(self):
+        """Fit circle on all contours at once, result is kept with contours
+
+        :return: center x, center y, radius and shape error of each contour
+        :rtype: array
+        """
+        c = self.contours
+        if c.circle_params is None:
+            c.circle_params = fit_circle_paths(
+                c.x_value, c.y_value, c.contour_index, c.nb_pt_per_contour
+            )
+        return c.circle_params
 
-                    # Test of the rotating sense: cyclone or anticyclone
-                    if has_value(
-                        data, i_x_in, i_y_in, cvalues, below=anticyclonic_search
-                    ):
-                        continue
+    def concurrent_identification_pass(self, data, **kwargs):
+        """
+        Search anticyclones in this process and cyclones in a forked process,
+        each search uses its own reservation mask.
 
-                    # FIXME : Maybe limit max must be replace with a maximum of surface
-                    if (
-                        contour.nb_pixel < pixel_limit[0]
-                        or contour.nb_pixel > pixel_limit[1]
-                    ):
-                        contour.reject = 3
-                        continue
+        In sequential mode, cyclonic search is done after anticyclonic search and could be
+        disturbed by anticyclonic reservations. Cyclonic result is kept only if
+        :py:meth:`check_concurrent_pass` ensure that is the same than in sequential mode,
+        else cyclonic search is done again. Search is sequential if fork is not available
+        or if numba threads are started (by parallel advection).
 
-                    # Compute amplitude
-                    reset_centroid, amp = self.get_amplitude(
-                        contour,
-                        cvalues,
-                        data,
-                        anticyclonic_search=anticyclonic_search,
-                        level=self.contours.levels[corrected_coll_index],
-                        interval=step,
-                        **kwargs,
-                    )
-                    # If we have a valid amplitude
-                    if (not amp.within_amplitude_limits()) or (amp.amplitude == 0):
-                        contour.reject = 4
-                        continue
-                    if reset_centroid:
-
-                        if self.is_circular():
-                            centi = self.normalize_x_indice(reset_centroid[0])
-                        else:
-                            centi = reset_centroid[0]
-                        centj = reset_centroid[1]
-                        # To move in regular and unregular grid
-                        if len(x.shape) == 1:
-                            centlon_e = x[centi]
-                            centlat_e = y[centj]
-                        else:
-                            centlon_e = x[centi, centj]
-                            centlat_e = y[centi, centj]
-
-                    # centlat_e and centlon_e must be index of maximum, we will loose some inner contour if it's not
-                    (
-                        max_average_speed,
-                        speed_contour,
-                        inner_contour,
-                        speed_array,
-                        i_max_speed,
-                        i_inner,
-                    ) = self.get_uavg(
-                        self.contours,
-                        centlon_e,
-                        centlat_e,
-                        contour,
-                        anticyclonic_search,
-                        corrected_coll_index,
-                        pixel_min=pixel_limit[0],
-                    )
+        :param array data: Sea Surface Height grid, mask will be updated
+        :param dict kwargs: look at :py:meth:`identification_pass`
 
-                    # FIXME : Instantiate new EddyObservation object (high cost need to be reviewed)
-                    obs = EddiesObservations(
-                        size=1,
-                        track_extra_variables=track_extra_variables,
-                        track_array_variables=sampling,
-                        array_variables=array_variables,
-                    )
-                    obs.height_max_speed_contour[:] = self.contours.cvalues[i_max_speed]
-                    obs.height_external_contour[:] = cvalues
-                    obs.height_inner_contour[:] = self.contours.cvalues[i_inner]
-                    array_size = speed_array.shape[0]
-                    obs.nb_contour_selected[:] = array_size
-                    if speed_array.shape[0] == 1:
-                        obs.uavg_profile[:] = speed_array[0]
-                    else:
-                        obs.uavg_profile[:] = raw_resample(speed_array, sampling)
-                    obs.amplitude[:] = amp.amplitude
-                    obs.speed_average[:] = max_average_speed
-                    obs.num_point_e[:] = contour.lon.shape[0]
-                    xy_e = resample(contour.lon, contour.lat, **out_sampling)
-                    obs.contour_lon_e[:], obs.contour_lat_e[:] = xy_e
-                    obs.num_point_s[:] = speed_contour.lon.shape[0]
-                    xy_s = resample(
-                        speed_contour.lon, speed_contour.lat, **out_sampling
-                    )
-                    obs.contour_lon_s[:], obs.contour_lat_s[:] = xy_s
+        :return: Return a list of 2 elements: Anticyclone and Cyclone
+        :rtype: list(py_eddy_tracker.observations.observation.EddiesObservations)
+        """
+        if "fork" not in get_all_start_methods() or current_process().daemon:
+            message = "Concurrent search need fork"
+        elif numba_threads_started():
+            # A process forked after start of numba threads could stay blocked at exit
+            message = "Concurrent search couldn't fork once numba threads are started"
+        else:
+            message = None
+        if message is not None:
+            logger.warning("%s, search will be sequential", message)
+            return [
+                self.identification_pass(data, anticyclonic_search, **kwargs)
+                for anticyclonic_search in (True, False)
+            ]
+        initial_mask = data.mask.copy()
+        context = get_context("fork")
+        reader, writer = context.Pipe(duplex=False)
+        process = context.Process(
+            target=self._cyclonic_pass_in_child, args=(writer, data, kwargs)
+        )
+        process.start()
+        writer.close()
+        anticyclones = self.identification_pass(data, True, **kwargs)
+        try:
+            result = reader.recv()
+        except EOFError:
+            result = "Process stop without result"
+        process.join()
+        if isinstance(result, str):
+            logger.warning("Concurrent cyclonic search failed :\n%s", result)
+            return [anticyclones, self.identification_pass(data, False, **kwargs)]
+
+        c_obs, c_mask, c_used, c_reject, trace = result
+        reject = self.check_concurrent_pass(
+            data.data, data.mask & ~initial_mask, trace, c_reject
+        )
+        if reject is None:
+            logger.info("Cyclonic search depends on anticyclones, search again")
+            return [anticyclones, self.identification_pass(data, False, **kwargs)]
+        data.mask |= c_mask
+        a_used, _ = self.contours.get_flags()
+        self.contours.set_flags(a_used | c_used, reject)
+        # Eddies object could not be pickled, we only get observations from child
+        cyclones = EddiesObservations.new_like(anticyclones, 0)
+        cyclones.observations = c_obs
+        cyclones.sign_type = -1
+        return [anticyclones, cyclones]
+
+    def _cyclonic_pass_in_child(self, connection, data, kwargs):
+        try:
+            trace = zeros(self.contours.nb_pt_per_contour.shape[0], dtype="i1")
+            cyclones = self.identification_pass(data, False, trace=trace, **kwargs)
+            used, reject = self.contours.get_flags()
+            connection.send((cyclones.obs, data.mask, used, reject, trace))
+        except Exception:
+            connection.send(format_exc())
+        finally:
+            connection.close()
+
+    def check_concurrent_pass(self, values, reserved, trace, c_reject):
+        """
+        Check if a cyclonic search done without anticyclonic reservations get
+        same eddies than a search done after anticyclonic search.
 
-                    # FIXME : we use a contour without resampling
-                    # First, get position based on innermost contour
-                    centlon_i, centlat_i, _, _ = _fit_circle_path(
-                        create_vertice(inner_contour.lon, inner_contour.lat)
-                    )
-                    # Second, get speed-based radius based on contour of max uavg
-                    centlon_s, centlat_s, eddy_radius_s, aerr_s = _fit_circle_path(
-                        create_vertice(*xy_s)
-                    )
-                    # Compute again to use resampled contour
-                    _, _, eddy_radius_e, aerr_e = _fit_circle_path(
-                        create_vertice(*xy_e)
-                    )
+        A contour used by an anticyclone is skipped and a contour with a reserved pixel
+        is rejected, so an accepted contour must be in none of this cases. Extrema detection
+        used in amplitude computation ignore masked pixels, so result could change only if
+        a reserved neighbour of a contour pixel is lower than this pixel.
 
-                    obs.radius_s[:] = eddy_radius_s
-                    obs.radius_e[:] = eddy_radius_e
-                    obs.shape_error_e[:] = aerr_e
-                    obs.shape_error_s[:] = aerr_s
-                    obs.speed_area[:] = poly_area(
-                        *coordinates_to_local(*xy_s, lon0=centlon_s, lat0=centlat_s)
-                    )
-                    obs.effective_area[:] = poly_area(
-                        *coordinates_to_local(*xy_e, lon0=centlon_s, lat0=centlat_s)
-                    )
-                    obs.lon[:] = centlon_s
-                    obs.lat[:] = centlat_s
-                    obs.lon_max[:] = centlon_i
-                    obs.lat_max[:] = centlat_i
-                    if aerr > 99.9 or aerr_s > 99.9:
-                        logger.warning(
-                            "Strange shape at this step! shape_error : %f, %f",
-                            aerr,
-                            aerr_s,
-                        )
-
-                    eddies.append(obs)
-                    # To reserve definitively the area
-                    data.mask[i_x_in, i_y_in] = True
-            if len(eddies) == 0:
-                eddies = EddiesObservations(
-                    track_extra_variables=track_extra_variables,
-                    track_array_variables=sampling,
-                    array_variables=array_variables,
-                )
-            else:
-                eddies = EddiesObservations.concatenate(eddies)
-            eddies.sign_type = 1 if anticyclonic_search else -1
-            eddies.time[:] = (date - datetime(1950, 1, 1)).total_seconds() / 86400.0
-
-            # normalization longitude between 0 - 360, because storage have an offset on 180
-            eddies.lon_max[:] %= 360
-            eddies.lon[:] %= 360
-            ref = eddies.lon - 180
-            eddies.contour_lon_e[:] = ((eddies.contour_lon_e.T - ref) % 360 + ref).T
-            eddies.contour_lon_s[:] = ((eddies.contour_lon_s.T - ref) % 360 + ref).T
-            a_and_c.append(eddies)
+        :param array values: Sea Surface Height values
+        :param array reserved: pixels reserved by anticyclones
+        :param array trace: contour states, look at :py:meth:`identification_pass`
+        :param array c_reject: reject flags set by cyclonic search alone
 
-        if in_h_unit is not None:
-            for name in [
-                "amplitude",
-                "height_max_speed_contour",
-                "height_external_contour",
-                "height_inner_contour",
-            ]:
-                out_unit = units.parse_expression(VAR_DESCR[name]["nc_attr"]["units"])
-                factor, _ = in_h_unit.to(out_unit).to_tuple()
-                a_and_c[0].obs[name] *= factor
-                a_and_c[1].obs[name] *= factor
-        u_units = self.units(uname) if force_speed_unit is None else force_speed_unit
-        in_u_units = units.parse_expression(u_units)
-        if in_u_units is not None:
-            for name in ["speed_average", "uavg_profile"]:
-                out_unit = units.parse_expression(VAR_DESCR[name]["nc_attr"]["units"])
-                factor, _ = in_u_units.to(out_unit).to_tuple()
-                a_and_c[0].obs[name] *= factor
-                a_and_c[1].obs[name] *= factor
-        return a_and_c
+        :return: reject flags of sequential search or None if cyclonic result is not valid
+        :rtype: array
+        """
+        a_used, reject = self.contours.get_flags()
+        # Contours skipped in sequential search
+        skipped = (trace == 0) | a_used
+        if (skipped & (trace == 3)).any():
+            return None
+        reject[~skipped & (c_reject == 1)] = 1
+        paths = [path for coll in self.contours.iter() for path in coll.get_paths()]
+        for i in where(~skipped & (c_reject != 1))[0]:
+            i_x, i_y = paths[i].pixels_in(self)
+            if has_masked_value(reserved, i_x, i_y):
+                # Contour is rejected in sequential search
+                if trace[i] == 3:
+                    return None
+                if reject[i] == 0:
+                    reject[i] = 2
+                continue
+            if trace[i] >= 2 and has_lower_masked_neighbour(
+                values, reserved, i_x, i_y, self.is_circular()
+            ):
+                return None
+            if c_reject[i] == 2:
+                if reject[i] == 0:
+                    reject[i] = 2
+            elif c_reject[i] != 0:
+                reject[i] = c_reject[i]
+        return reject
 
     def get_uavg(
         self,
@@ -938,16 +2498,24 @@ class GridDataset(object):
         step = 1 if anticyclonic_search else -1
         i_inner = i_max_speed = -1
 
-        for i, coll in enumerate(
-            all_contours.iter(start=level_start + step, step=step)
+        for i, level_contour in enumerate(
+            all_contours.iter_nearest_path_bbox_contain_pt(
+                centlon_e, centlat_e, start=level_start + step, step=step
+            )
         ):
-            level_contour = coll.get_nearest_path_bbox_contain_pt(centlon_e, centlat_e)
             # Leave loop if no contours at level
             if level_contour is None:
                 break
-            # Ensure polygon_i is within polygon_e
-            if not poly_contain_poly(original_contour.vertices, level_contour.vertices):
-                break
+            # Ensure polygon_i is within polygon_e, with containment tree, inner contour
+            # found at previous level is already in polygon_e
+            if (
+                all_contours.get_parent(level_contour.index, step)
+                != inner_contour.index
+            ):
+                if not all_contours.contain(
+                    original_contour.index, level_contour.index, i + 1, step
+                ):
+                    break
             # 3. Respect size range (for max speed)
             # nb_pixel properties need to call pixels_in before with a grid of pixel
             level_contour.pixels_in(self)
@@ -977,6 +2545,50 @@ class GridDataset(object):
             i_inner,
         )
 
+    def get_uavg_in_regions(
+        self, regions, i_region, original_contour, i_x, i_y, pixel_min=3
+    ):
+        """
+        Calculate geostrophic speed around successive regions which contain a pixel,
+        like :py:meth:`get_uavg` with regions of :py:class:`~py_eddy_tracker.eddy_feature.LevelSets`
+
+        :param LevelSets regions: regions of identification
+        :param int i_region: index of external region
+        :param ContourPath original_contour: iso line of external region
+        :param int i_x: x index of pixel
+        :param int i_y: y index of pixel
+        :param int pixel_min: minimal number of pixels of speed region
+        :return: speed, speed and inner contours, average speed of each contour,
+            speed and inner region index
+        """
+        max_average_speed = self.speed_coef_mean(original_contour)
+        speed_array = [max_average_speed]
+        inner_contour = selected_contour = original_contour
+        i_inner = i_max_speed = i_region
+        inner_regions = regions.inner_regions(i_region, i_x, i_y)
+        for level_contour in regions.contours(inner_regions):
+            level_average_speed = self.speed_coef_mean(level_contour)
+            speed_array.append(level_average_speed)
+            if (
+                pixel_min < regions.nb_pixel[level_contour.index]
+                and level_average_speed >= max_average_speed
+            ):
+                max_average_speed = level_average_speed
+                i_max_speed = level_contour.index
+                selected_contour = level_contour
+            inner_contour = level_contour
+            i_inner = level_contour.index
+        regions.used[i_region] = True
+        regions.used[inner_regions] = True
+        return (
+            max_average_speed,
+            selected_contour,
+            inner_contour,
+            array(speed_array),
+            i_max_speed,
+            i_inner,
+        )
+
     @staticmethod
     def _gaussian_filter(data, sigma, mode="reflect"):
         """Standard gaussian filter"""
@@ -1015,13 +2627,14 @@ class UnRegularGridDataset(GridDataset):
 
     __slots__ = (
         "index_interp",
+        "locator",
         "_speed_norm",
     )
 
     def load(self):
         """Load variable (data)"""
         x_name, y_name = self.coordinates
-        with Dataset(self.filename) as h:
+        with self.dataset() as h:
             self.x_dim = h.variables[x_name].dimensions
             self.y_dim = h.variables[y_name].dimensions
 
@@ -1041,12 +2654,15 @@ class UnRegularGridDataset(GridDataset):
         return self.x_c.min(), self.x_c.max(), self.y_c.min(), self.y_c.max()
 
     def bbox_indice(self, vertices):
-        dist, idx = self.index_interp.query(vertices, k=1)
-        i_y = idx % self.x_c.shape[1]
-        i_x = int_((idx - i_y) / self.x_c.shape[1])
+        i_x, i_y, _, _ = self.locator.locate(vertices[:, 0], vertices[:, 1])
+        m = i_x == -1
+        if m.any():
+            i_x[m], i_y[m] = self.locator.nearest_nodes(vertices[m, 0], vertices[m, 1])
+        # Cells are given by their first corner
+        nb_x, nb_y = self.x_c.shape
         return (
-            (max(i_x.min() - self.N, 0), i_x.max() + self.N + 1),
-            (max(i_y.min() - self.N, 0), i_y.max() + self.N + 1),
+            (max(i_x.min() - self.N, 0), min(i_x.max() + self.N + 2, nb_x)),
+            (max(i_y.min() - self.N, 0), min(i_y.max() + self.N + 2, nb_y)),
         )
 
     def get_pixels_in(self, contour):
@@ -1060,21 +2676,18 @@ class UnRegularGridDataset(GridDataset):
         return indices
 
     def nearest_grd_indice(self, x, y):
-        dist, idx = self.index_interp.query((x, y), k=1)
-        i_y = idx % self.x_c.shape[1]
-        i_x = int_((idx - i_y) / self.x_c.shape[1])
-        return i_x, i_y
+        i_x, i_y = self.locator.nearest(x, y)
+        if isscalar(x):
+            return i_x[0], i_y[0]
+        return i_x.reshape(shape(x)), i_y.reshape(shape(x))
 
     def compute_pixel_path(self, x0, y0, x1, y1):
         pass
 
     def init_pos_interpolator(self):
-        logger.debug("Create a KdTree could be long ...")
-        self.index_interp = cKDTree(
-            create_vertice(self.x_c.reshape(-1), self.y_c.reshape(-1))
-        )
-
-        logger.debug("... OK")
+        """Get locator of coordinates, locator (and its KD-tree) is shared by grids with the same coordinates"""
+        self.locator = CurvilinearLocator.from_coordinates(self.x_c, self.y_c)
+        self.index_interp = self.locator.tree
 
     def _low_filter(self, grid_name, w_cut, factor=8.0):
         data = self.grid(grid_name)
@@ -1120,23 +2733,43 @@ class UnRegularGridDataset(GridDataset):
         return ma.array(z_interp, mask=m_interp.ev(x, y) > 0.00001)
 
     def speed_coef_mean(self, contour):
-        dist, idx = self.index_interp.query(
-            uniform_resample_stack(contour.vertices)[1:], k=4
+        """Mean of speed norm on contour, speed is interpolated with bilinear weights in cells,
+        points near masked values are not used
+        """
+        points = uniform_resample_stack(contour.vertices)[1:]
+        i_x, i_y, s, t = self.locator.locate(points[:, 0], points[:, 1])
+        return mean_in_cells(
+            self._speed_norm.data, self._speed_norm.mask, i_x, i_y, s, t
         )
-        i_y = idx % self.x_c.shape[1]
-        i_x = int_((idx - i_y) / self.x_c.shape[1])
-        # A simplified solution to be change by a weight mean
-        return self._speed_norm[i_x, i_y].mean(axis=1).mean()
 
     def init_speed_coef(self, uname="u", vname="v"):
-        self._speed_norm = (self.grid(uname) ** 2 + self.grid(vname) ** 2) ** 0.5
+        speed = (self.grid(uname) ** 2 + self.grid(vname) ** 2) ** 0.5
+        self._speed_norm = ma.array(speed, mask=ma.getmaskarray(speed))
 
 
 class RegularGridDataset(GridDataset):
     """Class only for regular grid"""
 
+    #: Number of rows filtered together without pool, rows which share kernel shape are filtered in one call
+    FILTER_CHUNK = 8
+    #: Maximal number of rows which share Fourier transforms of latitude band
+    FFT_BAND = 8
+    #: Minimal number of kernel pixels to filter in frequency domain with method auto
+    FFT_KERNEL_SIZE = 1000
+    #: Fields derived from velocities (long name and units), computed at first access with :py:meth:`grid`
+    DERIVED_FIELDS = dict(
+        vorticity=("Relative vorticity", "s-1"),
+        normal_strain=("Normal strain", "s-1"),
+        shear_strain=("Shear strain", "s-1"),
+        ow=("Okubo-Weiss parameter", "s-2"),
+        eke=("Kinetic energy", "m2 s-2"),
+    )
+
     __slots__ = (
         "_speed_ev",
+        "_speed_uv",
+        "_derived",
+        "_gradients",
         "_is_circular",
         "x_size",
         "_x_step",
@@ -1144,8 +2777,38 @@ class RegularGridDataset(GridDataset):
     )
 
     def __init__(self, *args, **kwargs):
+        self._derived = dict()
+        self._gradients = dict()
         super().__init__(*args, **kwargs)
         self._is_circular = None
+        self._speed_uv = None
+
+    def share_coordinates(self, indexs):
+        new = super().share_coordinates(indexs)
+        # Derived fields are declared on the new grid, but computed again on its velocities
+        new._derived = {k: dict(v, sources=None) for k, v in self._derived.items()}
+        new._gradients = dict()
+        new._speed_uv = None
+        return new
+
+    def grid(self, varname, indexs=None):
+        """Give the grid required, fields of :py:attr:`DERIVED_FIELDS` which are not in file
+        are computed at first access (see :py:meth:`add_derived`)
+
+        :param str varname: Variable to get
+        :param dict,None indexs: If defined dict must have dimensions name as key
+        :return: array asked, reduced by the indexes
+        :rtype: array
+        """
+        if varname in self._derived:
+            self.update_derived(varname)
+        elif (
+            varname in self.DERIVED_FIELDS
+            and varname not in self.vars
+            and varname not in self.variables_description
+        ):
+            self.update_derived(self.add_derived(varname))
+        return super().grid(varname, indexs)
 
     def setup_coordinates(self):
         super().setup_coordinates()
@@ -1181,6 +2844,166 @@ class RegularGridDataset(GridDataset):
         obj.setup_coordinates()
         return obj
 
+    def tile(self, i_x, i_y, varnames):
+        """
+        Extract a sub grid. For a circular grid, indices along x could cross grid bounds,
+        columns are wrapped and longitudes are shifted by 360 degrees to stay continuous,
+        so sub grid keeps the size of indices.
+
+        :param array i_x: indices along x, could be negative or upper than grid size
+            for a circular grid
+        :param array i_y: indices along y
+        :param list varnames: variables to copy in sub grid
+        :return: sub grid
+        :rtype: RegularGridDataset
+        """
+        x_name, y_name = self.coordinates
+        nb_x = self.x_size
+        i_x_wrapped = i_x % nb_x
+        x = self.x_c[i_x_wrapped] + 360 * (i_x // nb_x)
+        datas = {x_name: x, y_name: self.y_c[i_y]}
+        variables_description = dict()
+        for varname in varnames:
+            data = self.grid(varname)[i_x_wrapped][:, i_y]
+            datas[varname] = ma.array(data, mask=ma.getmaskarray(data))
+            attrs = self.variables_description[varname]["attrs"].copy()
+            units = self.units(varname)
+            if units is not None:
+                attrs["units"] = units
+            variables_description[varname] = attrs
+        return self.with_array(
+            coordinates=self.coordinates,
+            datas=datas,
+            variables_description=variables_description,
+            centered=True,
+            dtype=self.dtype,
+        )
+
+    def tiled_eddy_identification(
+        self,
+        grid_height,
+        uname,
+        vname,
+        date,
+        step=0.005,
+        precision=None,
+        force_height_unit=None,
+        tiles=(4, 2),
+        halo=100,
+        nb_workers=None,
+        **kwargs,
+    ):
+        """
+        Compute eddy identification on tiles of the grid with a pool of processes.
+
+        Each tile is extended with a halo and levels are computed on the whole grid.
+        An eddy is kept only by the tile which contains in its core
+        the pixel of the eddy center, so eddies found in halo of several tiles are kept once.
+        Tiles which cross bounds of a circular grid get wrapped columns,
+        look at :py:meth:`tile`.
+        Halo must be larger than eddies to get same eddies than
+        :py:meth:`~py_eddy_tracker.dataset.grid.GridDataset.eddy_identification`,
+        eddies are sorted by level of their external contour (in search order), latitude and longitude.
+
+        :param str grid_height: Grid name of Sea Surface Height
+        :param str uname: Grid name of u speed component
+        :param str vname: Grid name of v speed component
+        :param datetime.datetime date: Date which will be stored in object to date data
+        :param float,int step: Height between two layers in m
+        :param float,None precision: Truncate values at the defined precision in m
+        :param str force_height_unit: Unit used for height unit
+        :param (int,int) tiles: Number of tiles along x and y
+        :param int halo: Number of pixels added around each tile
+        :param int,None nb_workers: Number of processes, by default number of cpu, if 1 no process are created
+        :param dict kwargs: look at :py:meth:`~py_eddy_tracker.dataset.grid.GridDataset.eddy_identification`
+
+        :return: Return a list of 2 elements: Anticyclone and Cyclone
+        :rtype: py_eddy_tracker.observations.observation.EddiesObservations
+        """
+        if not isinstance(date, datetime):
+            raise Exception("Date argument be a datetime object")
+        # Levels must be the same for all tiles
+        h_units = (
+            self.units(grid_height) if force_height_unit is None else force_height_unit
+        )
+        in_h_unit = UnitRegistry().parse_expression(h_units)
+        data, step_ = self.identification_grid(grid_height, step, precision, in_h_unit)
+        levels = self.identification_levels(data, step_)
+
+        nb_x, nb_y = data.shape
+        x_bounds = linspace(0, nb_x, tiles[0] + 1).round().astype("int")
+        y_bounds = linspace(0, nb_y, tiles[1] + 1).round().astype("int")
+        cores, grids = list(), list()
+        for x0, x1 in zip(x_bounds[:-1], x_bounds[1:]):
+            if tiles[0] == 1:
+                i_x = arange(nb_x)
+            elif self.is_circular() and (x1 - x0 + 2 * halo) < nb_x:
+                i_x = arange(x0 - halo, x1 + halo)
+            else:
+                i_x = arange(max(x0 - halo, 0), min(x1 + halo, nb_x))
+            for y0, y1 in zip(y_bounds[:-1], y_bounds[1:]):
+                i_y = arange(max(y0 - halo, 0), min(y1 + halo, nb_y))
+                cores.append((x0, x1, y0, y1))
+                grids.append(self.tile(i_x, i_y, (grid_height, uname, vname)))
+        logger.info("Identification will be done on %d tiles", len(grids))
+
+        args = (grid_height, uname, vname, date)
+        kwargs = dict(
+            step=step,
+            precision=precision,
+            force_height_unit=h_units,
+            levels=levels,
+            **kwargs,
+        )
+        if nb_workers == 1:
+            results = [identification_on_tile(grid, args, kwargs) for grid in grids]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=nb_workers, mp_context=process_pool_context()
+            ) as executor:
+                results = list(
+                    executor.map(
+                        identification_on_tile,
+                        grids,
+                        [args] * len(grids),
+                        [kwargs] * len(grids),
+                    )
+                )
+
+        results = [eddies_from_arrays(result) for result in results]
+        a_and_c = list()
+        for i, sign_type in enumerate((1, -1)):
+            eddies = list()
+            for (x0, x1, y0, y1), result in zip(cores, results):
+                eddies_ = result[i]
+                # Only tile with eddy center in its core keep it
+                i_x, i_y = self.nearest_grd_indices(eddies_.lon, eddies_.lat)
+                m = (i_x >= x0) * (i_x < x1) * (i_y >= y0) * (i_y < y1)
+                eddies.append(eddies_.index(where(m)[0]))
+            eddies = EddiesObservations.concatenate(eddies)
+            eddies = eddies.index(
+                lexsort(
+                    (eddies.lon, eddies.lat, eddies.height_external_contour * sign_type)
+                )
+            )
+            a_and_c.append(eddies)
+        return a_and_c
+
+    def nearest_grd_indices(self, x, y):
+        """
+        Get indices of nearest pixels for several positions
+
+        :param array x: longitudes
+        :param array y: latitudes
+        :return: indices along x and y
+        :rtype: (array, array)
+        """
+        i_x = round_(((x - self.x_c[0]) % 360) / self.xstep).astype("int")
+        if self.is_circular():
+            i_x %= self.x_size
+        i_y = round_((y - self.y_c[0]) / self.ystep).astype("int")
+        return i_x.clip(0, self.x_size - 1), i_y.clip(0, self.y_c.shape[0] - 1)
+
     def bbox_indice(self, vertices):
         return bbox_indice_regular(
             vertices,
@@ -1201,7 +3024,7 @@ class RegularGridDataset(GridDataset):
         :return: Indices of grid in contour
         :rtype: array[int],array[int]
         """
-        if isinstance(contour, BasePath):
+        if isinstance(contour, (BasePath, ContourPath)):
             (x_start, x_stop), (y_start, y_stop) = contour.bbox_slice
             return get_pixel_in_regular(
                 contour.vertices, self.x_c, self.y_c, x_start, x_stop, y_start, y_stop
@@ -1310,28 +3133,44 @@ class RegularGridDataset(GridDataset):
         """Not really operational
         wave_length in km
         order must be int
+        kernel is stored in :py:data:`KERNEL_BANK`
         """
         order = self.check_order(order)
-        half_x_pt, half_y_pt, dist_norm = self.estimate_kernel_shape(
-            lat, wave_length, order
+
+        def build():
+            half_x_pt, half_y_pt, dist_norm = self.estimate_kernel_shape(
+                lat, wave_length, order
+            )
+            kernel = sinc(dist_norm / order) * sinc(dist_norm)
+            kernel[dist_norm > order] = 0
+            return self.finalize_kernel(kernel, order, half_x_pt, half_y_pt)
+
+        key = KERNEL_BANK.kernel_key(
+            "lanczos", self.xstep, self.ystep, lat, wave_length, order
         )
-        kernel = sinc(dist_norm / order) * sinc(dist_norm)
-        kernel[dist_norm > order] = 0
-        return self.finalize_kernel(kernel, order, half_x_pt, half_y_pt)
+        return KERNEL_BANK.get_kernel(key, build)
 
     def kernel_bessel(self, lat, wave_length, order=1):
         """wave_length in km
         order must be int
+        kernel is stored in :py:data:`KERNEL_BANK`
         """
         order = self.check_order(order)
-        half_x_pt, half_y_pt, dist_norm = self.estimate_kernel_shape(
-            lat, wave_length, order
+
+        def build():
+            half_x_pt, half_y_pt, dist_norm = self.estimate_kernel_shape(
+                lat, wave_length, order
+            )
+            with errstate(invalid="ignore"):
+                kernel = sinc(dist_norm / order) * j1(2 * pi * dist_norm) / dist_norm
+            kernel[0, half_y_pt * order] = pi
+            kernel[dist_norm > order] = 0
+            return self.finalize_kernel(kernel, order, half_x_pt, half_y_pt)
+
+        key = KERNEL_BANK.kernel_key(
+            "bessel", self.xstep, self.ystep, lat, wave_length, order
         )
-        with errstate(invalid="ignore"):
-            kernel = sinc(dist_norm / order) * j1(2 * pi * dist_norm) / dist_norm
-        kernel[0, half_y_pt * order] = pi
-        kernel[dist_norm > order] = 0
-        return self.finalize_kernel(kernel, order, half_x_pt, half_y_pt)
+        return KERNEL_BANK.get_kernel(key, build)
 
     def _low_filter(self, grid_name, w_cut, **kwargs):
         """low filtering"""
@@ -1340,95 +3179,127 @@ class RegularGridDataset(GridDataset):
         )
 
     def convolve_filter_with_dynamic_kernel(
-        self, grid, kernel_func, lat_max=85, extend=False, **kwargs_func
+        self,
+        grid,
+        kernel_func,
+        lat_max=85,
+        extend=False,
+        nb_workers=1,
+        pool="thread",
+        progress=None,
+        kernel_cache=None,
+        method="auto",
+        **kwargs_func,
     ):
         """
+        Rows are independent, they could be filtered in a pool of threads or processes,
+        result doesn't depend on number of workers.
+
         :param str grid: grid name
         :param func kernel_func: function of kernel to use
         :param float lat_max: absolute latitude above no filtering apply
         :param bool extend: if False, only non masked value will return a filtered value
+        :param int,None nb_workers: Number of workers, by default 1 and no pool is created,
+            if None number of cpu is used
+        :param str pool: "thread" or "process"
+        :param func,None progress: Called with number of rows filtered and number of rows to filter
+            each time rows are filtered, by default remaining time is printed in debug mode
+        :param str,bool,None kernel_cache: npz file where kernels are loaded before filtering and
+            saved after if new kernels are computed (look at :py:class:`KernelBank`),
+            if True file is `pet_kernels.npz` in directory of grid,
+            kernels computed in a pool of processes are not saved
+        :param str method: "direct" sum kernel weighted pixels, "fft" compute rows in frequency domain
+            along x (faster for large kernels, result is the same with round-off differences),
+            "auto" use "fft" for rows where kernel has more than :py:attr:`FFT_KERNEL_SIZE` pixels
         :param dict kwargs_func: look at kernel_func
         :return: filtered value
         :rtype: array
         """
+        if pool not in ("thread", "process"):
+            raise Exception(f"Unknown pool {pool}, it must be thread or process")
+        if method not in ("direct", "fft", "auto"):
+            raise Exception(f"Unknown method {method}, it must be direct, fft or auto")
         if (abs(self.y_c) > lat_max).any():
             logger.warning("No filtering above %f degrees of latitude", lat_max)
         if isinstance(grid, str):
             data = self.grid(grid).copy()
         else:
             data = grid.copy()
+        compute_dtype = self.compute_dtype
         # Matrix for result
-        data_out = ma.empty(data.shape)
+        data_out = ma.empty(data.shape, dtype=compute_dtype)
         data_out.mask = ones(data_out.shape, dtype=bool)
-        nb_lines = self.y_c.shape[0]
-        dt = list()
-
-        debug_active = logger.getEffectiveLevel() == logging.DEBUG
-
-        for i, lat in enumerate(self.y_c):
-            if abs(lat) > lat_max or data[:, i].mask.all():
-                data_out.mask[:, i] = True
-                continue
-            # Get kernel
-            kernel = kernel_func(lat, **kwargs_func)
-            # Kernel shape
-            k_shape = kernel.shape
-            t0 = datetime.now()
-            if debug_active and len(dt) > 0:
-                dt_mean = np_mean(dt) * (nb_lines - i)
-                print(
-                    "Remain ",
-                    dt_mean,
-                    "ETA ",
-                    t0 + dt_mean,
-                    "current kernel size :",
-                    k_shape,
-                    "Step : %d/%d    " % (i, nb_lines),
-                    end="\r",
+        # Masked values are replaced by 0 and not counted in kernel weights
+        valid = ~ma.getmaskarray(data)
+        values = data.filled(0).astype(compute_dtype, copy=False)
+        rows = where((abs(self.y_c) <= lat_max) * valid.any(axis=0))[0]
+        nb_rows = rows.shape[0]
+        if progress is None and logger.getEffectiveLevel() == logging.DEBUG:
+            progress = progress_printer()
+
+        if kernel_cache is True:
+            kernel_cache = join(dirname(abspath(self.filename)), "pet_kernels.npz")
+        if kernel_cache is not None and exists(kernel_cache):
+            KERNEL_BANK.load(kernel_cache)
+
+        t_start = perf_counter()
+        if nb_workers is None:
+            nb_workers = cpu_count()
+        if nb_workers == 1:
+            nb_chunks = ceil(nb_rows / self.FILTER_CHUNK).astype(int)
+            chunks = array_split(rows, nb_chunks) if nb_rows else list()
+        else:
+            # Kernel is computed in workers with a grid without variables
+            if pool == "process" and getattr(kernel_func, "__self__", None) is self:
+                kernel_func = getattr(
+                    self.share_coordinates(dict()), kernel_func.__name__
                 )
-
-            # Half size, k_shape must be always impair
-            d_lat = int((k_shape[1] - 1) / 2)
-            d_lon = int((k_shape[0] - 1) / 2)
-            # Temporary matrix to have exact shape at outuput
-            tmp_matrix = ma.zeros((2 * d_lon + data.shape[0], k_shape[1]))
-            tmp_matrix.mask = ones(tmp_matrix.shape, dtype=bool)
-            # Slice to apply on input data
-            sl_lat_data = slice(max(0, i - d_lat), min(i + d_lat, data.shape[1]))
-            # slice to apply on temporary matrix to store input data
-            sl_lat_in = slice(
-                d_lat - (i - sl_lat_data.start), d_lat + (sl_lat_data.stop - i)
+            chunks = (
+                array_split(rows, min(nb_rows, 4 * nb_workers)) if nb_rows else list()
             )
-            # If global => manual wrapping
-            if self.is_circular():
-                tmp_matrix[:d_lon, sl_lat_in] = data[-d_lon:, sl_lat_data]
-                tmp_matrix[-d_lon:, sl_lat_in] = data[:d_lon, sl_lat_data]
-            # Copy data
-            tmp_matrix[d_lon:-d_lon, sl_lat_in] = data[:, sl_lat_data]
-            # Convolution
-            m = ~tmp_matrix.mask
-            tmp_matrix[~m] = 0
-
-            demi_x, demi_y = k_shape[0] // 2, k_shape[1] // 2
-            values_sum = filter2D(tmp_matrix.data, -1, kernel)[demi_x:-demi_x, demi_y]
-            kernel_sum = filter2D(m.astype(float), -1, kernel)[demi_x:-demi_x, demi_y]
-            with errstate(invalid="ignore", divide="ignore"):
-                if extend:
-                    data_out[:, i] = ma.array(
-                        values_sum / kernel_sum,
-                        mask=kernel_sum < (extend * kernel.sum()),
-                    )
-                else:
-                    data_out[:, i] = values_sum / kernel_sum
-            dt.append(datetime.now() - t0)
-            if len(dt) == 100:
-                dt.pop(0)
+        convolve = partial(
+            convolve_rows,
+            values,
+            valid,
+            self.is_circular(),
+            compute_dtype,
+            extend,
+            kernel_func=kernel_func,
+            kwargs_func=kwargs_func,
+            method=method,
+            fft_band=self.FFT_BAND,
+            fft_kernel_size=self.FFT_KERNEL_SIZE,
+        )
+        lats = [self.y_c[chunk] for chunk in chunks]
+        if nb_workers == 1:
+            results = map(convolve, chunks, lats)
+        else:
+            if pool == "thread":
+                executor = ThreadPoolExecutor(max_workers=nb_workers)
+            else:
+                executor = ProcessPoolExecutor(
+                    max_workers=nb_workers, mp_context=process_pool_context()
+                )
+            results = executor.map(convolve, chunks, lats)
+        nb_done = 0
+        try:
+            for chunk, (values_out, mask_out) in zip(chunks, results):
+                data_out.data[:, chunk] = values_out
+                data_out.mask[:, chunk] = mask_out
+                nb_done += chunk.shape[0]
+                if progress is not None:
+                    progress(nb_done, nb_rows)
+        finally:
+            if nb_workers != 1:
+                executor.shutdown()
+        if kernel_cache is not None and KERNEL_BANK.nb_new:
+            # Kernels built for other grid geometries are not saved beside this grid
+            KERNEL_BANK.save(kernel_cache, self.xstep, self.ystep)
         if extend:
             out = ma.array(data_out, mask=data_out.mask)
         else:
             out = ma.array(data_out, mask=data.mask + data_out.mask)
-        if debug_active:
-            print()
+        self.stats.lap("filtering", t_start)
         if out.dtype != data.dtype:
             return out.astype(data.dtype)
         return out
@@ -1506,71 +3377,101 @@ class RegularGridDataset(GridDataset):
         self.vars[grid_name] = data_out
 
     def spectrum_lonlat(self, grid_name, area=None, ref=None, **kwargs):
+        """
+        Mean spectra along longitude and latitude of a grid in an area.
+
+        :param str grid_name: grid to use
+        :param dict,None area: area with keys llcrnrlon, urcrnrlon, llcrnrlat, urcrnrlat
+        :param RegularGridDataset,None ref: if set, spectra are divided by spectra of ref in the same area
+        :param dict kwargs: `scaling` and `ref_grid_name` (grid of ref to use, by default `grid_name`),
+            others are given to :py:func:`scipy.signal.welch`
+        :return: (wavelength in km, spectrum) along longitude and along latitude
+        :rtype: tuple
+        """
         if area is None:
             area = dict(llcrnrlon=190, urcrnrlon=280, llcrnrlat=-62, urcrnrlat=8)
         scaling = kwargs.pop("scaling", "density")
         ref_grid_name = kwargs.pop("ref_grid_name", None)
+        if ref_grid_name is None:
+            ref_grid_name = grid_name
+        names = [grid_name]
+        if ref is self:
+            # Same windows, both grids are computed in one pass
+            names.append(ref_grid_name)
+        spectra = self.spectra_lonlat(names, area, scaling=scaling, **kwargs)
+        lon_content, lat_content = spectra[0]
+        if ref is None:
+            return lon_content, lat_content
+        if ref is self:
+            ref_lon_content, ref_lat_content = spectra[1]
+        else:
+            ref_lon_content, ref_lat_content = ref.spectra_lonlat(
+                [ref_grid_name], area, scaling=scaling, **kwargs
+            )[0]
+        return (
+            (lon_content[0], lon_content[1] / ref_lon_content[1]),
+            (lat_content[0], lat_content[1] / ref_lat_content[1]),
+        )
+
+    def spectra_lonlat(self, grid_names, area, scaling="density", **kwargs):
+        """
+        Mean spectra along longitude and latitude of several grids in an area.
+
+        Welch is computed once on all columns and all rows of all grids, columns or rows with
+        nan are dropped. Along longitude, rows are computed with a unit sampling frequency and
+        scaled with step of each latitude, then resampled on a common frequency axis.
+
+        :param list(str) grid_names: grids to use
+        :param dict area: area with keys llcrnrlon, urcrnrlon, llcrnrlat, urcrnrlat
+        :param str scaling: `density` or `spectrum`
+        :param dict kwargs: given to :py:func:`scipy.signal.welch`
+        :return: for each grid, (wavelength in km, spectrum) along longitude and along latitude
+        :rtype: list
+        """
         x0, y0 = self.nearest_grd_indice(area["llcrnrlon"], area["llcrnrlat"])
         x1, y1 = self.nearest_grd_indice(area["urcrnrlon"], area["urcrnrlat"])
-
-        data = self.grid(grid_name)[x0:x1, y0:y1]
+        # Masked values are given to welch like in a column by column computation
+        data = stack([ma.getdata(self.grid(name)[x0:x1, y0:y1]) for name in grid_names])
+        nb_x, nb_y = data.shape[1:]
 
         # Lat spectrum
-        pws = list()
         step_y_km = self.ystep * distance(0, 0, 0, 1) / 1000
-        nb_invalid = 0
-        for i, _ in enumerate(self.x_c[x0:x1]):
-            f, pw = welch(data[i, :], 1 / step_y_km, scaling=scaling, **kwargs)
-            if isnan(pw).any():
-                nb_invalid += 1
-                continue
-            pws.append(pw)
-        if nb_invalid:
-            logger.warning("%d/%d columns invalid", nb_invalid, i + 1)
-        with errstate(divide="ignore"):
-            lat_content = 1 / f, array(pws).mean(axis=0)
-
-        # Lon spectrum
-        fs, pws = list(), list()
-        f_min, f_max = None, None
-        nb_invalid = 0
-        for i, lat in enumerate(self.y_c[y0:y1]):
-            step_x_km = self.xstep * distance(0, lat, 1, lat) / 1000
-            f, pw = welch(data[:, i], 1 / step_x_km, scaling=scaling, **kwargs)
-            if isnan(pw).any():
-                nb_invalid += 1
-                continue
-            if f_min is None:
-                f_min = f.min()
-                f_max = f.max()
-            else:
-                f_min = max(f_min, f.min())
-                f_max = min(f_max, f.max())
-            fs.append(f)
-            pws.append(pw)
-        if nb_invalid:
-            logger.warning("%d/%d lines invalid", nb_invalid, i + 1)
-        f_interp = linspace(f_min, f_max, f.shape[0])
-        pw_m = array(
-            [
-                interp1d(f, pw, fill_value=0.0, bounds_error=False)(f_interp)
-                for f, pw in zip(fs, pws)
-            ]
-        ).mean(axis=0)
+        f, pws = welch(data, 1 / step_y_km, scaling=scaling, axis=2, **kwargs)
         with errstate(divide="ignore"):
-            lon_content = 1 / f_interp, pw_m
-        if ref is None:
-            return lon_content, lat_content
-        else:
-            if ref_grid_name is not None:
-                grid_name = ref_grid_name
-            ref_lon_content, ref_lat_content = ref.spectrum_lonlat(
-                grid_name, area, **kwargs
-            )
-            return (
-                (lon_content[0], lon_content[1] / ref_lon_content[1]),
-                (lat_content[0], lat_content[1] / ref_lat_content[1]),
-            )
+            wave_lat = 1 / f
+        lat_contents = list()
+        for pw in pws:
+            valid = ~isnan(pw).any(axis=1)
+            nb_invalid = nb_x - valid.sum()
+            if nb_invalid:
+                logger.warning("%d/%d columns invalid", nb_invalid, nb_x)
+            lat_contents.append((wave_lat, pw[valid].mean(axis=0)))
+
+        # Lon spectrum, frequencies and density are linear with sampling frequency
+        lat = self.y_c[y0:y1]
+        fs = 1 / (self.xstep * distance(0, lat, 1, lat) / 1000)
+        f, pws = welch(data.transpose(0, 2, 1), 1, scaling=scaling, axis=2, **kwargs)
+        if scaling == "density":
+            pws /= fs.reshape(1, -1, 1)
+        nb_f = f.shape[0]
+        lon_contents = list()
+        for pw in pws:
+            valid = ~isnan(pw).any(axis=1)
+            nb_invalid = nb_y - valid.sum()
+            if nb_invalid:
+                logger.warning("%d/%d lines invalid", nb_invalid, nb_y)
+            pw, fs_ = pw[valid], fs[valid]
+            f_interp = linspace((f.min() * fs_).max(), (f.max() * fs_).min(), nb_f)
+            # Linear resampling of each row on the common frequency axis
+            f_row = f_interp.reshape(1, -1) / fs_.reshape(-1, 1)
+            i1 = f.searchsorted(f_row, side="right").clip(1, nb_f - 1)
+            i0 = i1 - 1
+            w = (f_row - f[i0]) / (f[i1] - f[i0])
+            i_row = arange(pw.shape[0]).reshape(-1, 1)
+            pw_m = (pw[i_row, i0] * (1 - w) + pw[i_row, i1] * w).mean(axis=0)
+            with errstate(divide="ignore"):
+                lon_contents.append((1 / f_interp, pw_m))
+        return list(zip(lon_contents, lat_contents))
 
     def compute_finite_difference(self, data, schema=1, mode="reflect", vertical=False):
         if not isinstance(schema, int) and schema < 1:
@@ -1675,24 +3576,9 @@ class RegularGridDataset(GridDataset):
 
 
         """
-        stencil_halfwidth = max(min(int(stencil_halfwidth), 4), 1)
-        logger.debug("Stencil half width apply : %d", stencil_halfwidth)
         # output
         grad = None
-
-        weights = [
-            array((3, -32, 168, -672, 0, 672, -168, 32, -3)) / 840.0,
-            array((-1, 9, -45, 0, 45, -9, 1)) / 60.0,
-            array((1, -8, 0, 8, -1)) / 12.0,
-            array((-1, 0, 1)) / 2.0,
-            # uncentered kernel
-            # like array((0, -1, 1)) but left value could be default value
-            array((-1, 1)),
-            # like array((-1, 1, 0)) but right value could be default value
-            (1, array((-1, 1))),
-        ]
-        # reduce to stencil selected
-        weights = weights[4 - stencil_halfwidth :]
+        weights = stencil_weights(stencil_halfwidth)
         if vertical:
             data = data.T
         # Iteration from larger stencil to smaller (to fill matrix)
@@ -1714,29 +3600,12 @@ class RegularGridDataset(GridDataset):
             d_h = ma.array(d_h, mask=mask != 0)
 
             # Delta d
+            d = self.stencil_distance(weight, mode, vertical)
             if vertical:
                 d_h = d_h.T
-                d = self.EARTH_RADIUS * 2 * pi / 360 * convolve(self.y_c, weight)
             else:
-                if mode == "wrap":
-                    # Along x axis, we need to close
-                    # we will compute in two part
-                    x = self.x_c % 360
-                    d_degrees = convolve(x, weight, mode=mode)
-                    d_degrees_180 = convolve((x + 180) % 360 - 180, weight, mode=mode)
-                    # Arbitrary, to be sure to be far far away of bound
-                    m = (x < 90) + (x > 270)
-                    d_degrees[m] = d_degrees_180[m]
-                else:
-                    d_degrees = convolve(self.x_c, weight, mode=mode)
-                d = (
-                    self.EARTH_RADIUS
-                    * 2
-                    * pi
-                    / 360
-                    * d_degrees.reshape((-1, 1))
-                    * cos(deg2rad(self.y_c))
-                )
+                d = d.reshape((-1, 1)) * cos(deg2rad(self.y_c))
+            d = d.astype(self.compute_dtype, copy=False)
             if grad is None:
                 # First Gradient
                 grad = d_h / d
@@ -1745,6 +3614,31 @@ class RegularGridDataset(GridDataset):
                 grad[grad.mask] = (d_h / d)[grad.mask]
         return grad
 
+    def stencil_distance(self, weight, mode="reflect", vertical=False):
+        """
+        Distance covered by a stencil weight, along x distance must be multiply by cosinus of latitude
+
+        :param array weight: stencil weight
+        :param str mode: convolution mode
+        :param bool vertical: if True, distance along y
+        :return: distance in m for each column (or each row if vertical)
+        :rtype: array
+        """
+        if vertical:
+            return self.EARTH_RADIUS * 2 * pi / 360 * convolve(self.y_c, weight)
+        if mode == "wrap":
+            # Along x axis, we need to close
+            # we will compute in two part
+            x = self.x_c % 360
+            d_degrees = convolve(x, weight, mode=mode)
+            d_degrees_180 = convolve((x + 180) % 360 - 180, weight, mode=mode)
+            # Arbitrary, to be sure to be far far away of bound
+            m = (x < 90) + (x > 270)
+            d_degrees[m] = d_degrees_180[m]
+        else:
+            d_degrees = convolve(self.x_c, weight, mode=mode)
+        return self.EARTH_RADIUS * 2 * pi / 360 * d_degrees
+
     def add_uv_lagerloef(self, grid_height, uname="u", vname="v", schema=15):
         self.add_uv(grid_height, uname, vname)
         latmax = 5
@@ -1798,9 +3692,14 @@ class RegularGridDataset(GridDataset):
         w = 1 - exp(-((lat / 2.2) ** 2))
         self.vars[vname][:, sl] = self.vars[vname][:, sl] * w + v_lagerloef * (1 - w)
         self.vars[uname][:, sl] = self.vars[uname][:, sl] * w + u_lagerloef * (1 - w)
+        # Speed and fields computed with previous velocities are no more valid
+        self.vars.touch(vname)
+        self.vars.touch(uname)
 
     def add_uv(self, grid_height, uname="u", vname="v", stencil_halfwidth=4):
-        """Compute a u and v grid
+        """Compute a u and v grid, u, v and speed norm are computed in one pass (:py:func:`uv_stencil_`)
+        with the same stencils than :py:meth:`compute_stencil`, speed norm is kept for
+        :py:meth:`init_speed_coef`
 
         :param str grid_height: grid name where the funtion will apply stencil method
         :param str uname: future name of u
@@ -1826,29 +3725,163 @@ class RegularGridDataset(GridDataset):
                     "long_name"
                 ] += " gradient"
         # Divide by sideral day
-        gof = (
-            sin(deg2rad(self.y_c))
-            * ones((self.x_c.shape[0], 1))
-            * 4.0
-            * pi
-            / (23 * 3600 + 56 * 60 + 4.1)
-        )
+        gof = sin(deg2rad(self.y_c)) * 4.0 * pi / (23 * 3600 + 56 * 60 + 4.1)
         with errstate(divide="ignore"):
-            gof = self.GRAVITY / (gof * ones((self.x_c.shape[0], 1)))
+            gof = self.GRAVITY / gof
+        gof = gof.astype(self.compute_dtype, copy=False)
+
+        # Stencils along x (v) and along y (u)
+        wrap = self.is_circular()
+        weights = stencil_weights(stencil_halfwidth)
+        nb_stencil = len(weights)
+        stencils = zeros((nb_stencil, 9))
+        lengths = empty(nb_stencil, dtype=int_)
+        shifts = zeros(nb_stencil, dtype="bool")
+        d_x = empty((nb_stencil, self.x_c.shape[0]))
+        d_y = empty((nb_stencil, self.y_c.shape[0]))
+        for i, weight in enumerate(weights):
+            if isinstance(weight, tuple):
+                shifts[i], weight = True, weight[1]
+            lengths[i] = weight.shape[0]
+            stencils[i, : lengths[i]] = weight
+            d_x[i] = self.stencil_distance(weight, "wrap" if wrap else "reflect")
+            d_y[i] = self.stencil_distance(weight, vertical=True)
+
+        dtype = result_type(data.dtype, self.compute_dtype)
+        u, v, speed = (empty(data.shape, dtype=dtype) for _ in range(3))
+        m_u, m_v, m_speed = (empty(data.shape, dtype="bool") for _ in range(3))
+        uv_stencil_(
+            data.data,
+            ma.getmaskarray(data),
+            stencils,
+            lengths,
+            shifts,
+            wrap,
+            d_x,
+            cos(deg2rad(self.y_c)),
+            d_y,
+            gof,
+            u,
+            v,
+            speed,
+            m_u,
+            m_v,
+            m_speed,
+        )
+        self.vars[vname] = ma.array(v, mask=m_v)
+        self.vars[uname] = ma.array(u, mask=m_u)
+        self._speed_ev = ma.array(speed, mask=m_speed)
+        self._speed_uv = self.vars.version(uname), self.vars.version(vname)
 
-        # Compute v
-        mode = "wrap" if self.is_circular() else "reflect"
-        self.vars[vname] = (
-            self.compute_stencil(data, mode=mode, stencil_halfwidth=stencil_halfwidth)
-            * gof
-        )
-        # Compute u
-        self.vars[uname] = (
-            -self.compute_stencil(
-                data, vertical=True, stencil_halfwidth=stencil_halfwidth
+    def add_derived(
+        self, field, uname="u", vname="v", stencil_halfwidth=4, varname=None
+    ):
+        r"""
+        Declare a field derived from velocities, it will be computed at first access with
+        :py:meth:`grid` and computed again if u or v grids are modified (look at :py:class:`GridVariables`).
+        Gradients of velocities are shared by all derived fields.
+
+        .. math::
+            S_n = \frac{\partial u}{\partial x} - \frac{\partial v}{\partial y},
+            S_s = \frac{\partial v}{\partial x} + \frac{\partial u}{\partial y},
+            \omega = \frac{\partial v}{\partial x} - \frac{\partial u}{\partial y},
+            OW = S_n^2 + S_s^2 - \omega^2,
+            EKE = \frac{u^2 + v^2}{2}
+
+        :param str field: `vorticity`, `normal_strain`, `shear_strain`, `ow` or `eke`
+        :param str uname: grid of velocity along x
+        :param str vname: grid of velocity along y
+        :param int stencil_halfwidth: largest stencil used for gradients (max: 4)
+        :param str,None varname: name of the grid, by default name of field
+        :return: name of the grid
+        :rtype: str
+
+        .. minigallery:: py_eddy_tracker.RegularGridDataset.add_derived
+        """
+        if field not in self.DERIVED_FIELDS:
+            raise Exception(
+                f"Unknown derived field : {field}, must be one of {list(self.DERIVED_FIELDS)}"
+            )
+        if varname is None:
+            varname = field
+        self._derived[varname] = dict(
+            field=field,
+            uname=uname,
+            vname=vname,
+            stencil_halfwidth=stencil_halfwidth,
+            sources=None,
+        )
+        self.vars.pop(varname, None)
+        return varname
+
+    def update_derived(self, varname):
+        """
+        Compute a derived field if it's not computed or if velocities used are modified
+
+        :param str varname: name of a grid declared with :py:meth:`add_derived`
+        """
+        derived = self._derived[varname]
+        uname, vname = derived["uname"], derived["vname"]
+        u, v = self.grid(uname), self.grid(vname)
+        sources = self.vars.version(uname), self.vars.version(vname)
+        if varname in self.vars and derived["sources"] == sources:
+            return
+        field = derived["field"]
+        logger.debug("Compute %s from %s and %s", field, uname, vname)
+        if field == "eke":
+            value = (u ** 2 + v ** 2) / 2
+        else:
+            u_x, u_y, v_x, v_y = self.velocity_gradients(
+                uname, vname, derived["stencil_halfwidth"]
             )
-            * gof
+            if field == "vorticity":
+                value = v_x - u_y
+            elif field == "normal_strain":
+                value = u_x - v_y
+            elif field == "shear_strain":
+                value = v_x + u_y
+            else:
+                value = (u_x - v_y) ** 2 + (v_x + u_y) ** 2 - (v_x - u_y) ** 2
+        self.vars[varname] = value
+        derived["sources"] = sources
+        if uname in self.variables_description:
+            u_dict = self.variables_description[uname]
+            long_name, units = self.DERIVED_FIELDS[field]
+            self.variables_description[varname] = dict(
+                infos=u_dict["infos"].copy(),
+                attrs=dict(long_name=long_name, units=units),
+                args=tuple((varname, *u_dict["args"][1:])),
+                kwargs=u_dict["kwargs"].copy(),
+            )
+
+    def velocity_gradients(self, uname="u", vname="v", stencil_halfwidth=4):
+        """
+        Gradients of velocities computed with :py:meth:`compute_stencil`, gradients are kept
+        while u and v grids are not modified
+
+        :param str uname: grid of velocity along x
+        :param str vname: grid of velocity along y
+        :param int stencil_halfwidth: largest stencil used (max: 4)
+        :return: du/dx, du/dy, dv/dx, dv/dy
+        :rtype: tuple
+        """
+        u, v = self.grid(uname), self.grid(vname)
+        key = uname, vname, stencil_halfwidth
+        sources = self.vars.version(uname), self.vars.version(vname)
+        if key in self._gradients:
+            sources_, gradients = self._gradients[key]
+            if sources_ == sources:
+                return gradients
+        mode = "wrap" if self.is_circular() else "reflect"
+        kw = dict(stencil_halfwidth=stencil_halfwidth)
+        gradients = (
+            self.compute_stencil(u, mode=mode, **kw),
+            self.compute_stencil(u, vertical=True, **kw),
+            self.compute_stencil(v, mode=mode, **kw),
+            self.compute_stencil(v, vertical=True, **kw),
         )
+        self._gradients[key] = sources, gradients
+        return gradients
 
     def speed_coef_mean(self, contour):
         """Some nan can be computed over contour if we are near border,
@@ -1858,14 +3891,21 @@ class RegularGridDataset(GridDataset):
             self.x_c,
             self.y_c,
             self._speed_ev,
-            self._speed_ev.mask,
+            ma.getmaskarray(self._speed_ev),
             contour.vertices,
             nan_remove=True,
         )
 
     def init_speed_coef(self, uname="u", vname="v"):
-        """Draft"""
-        self._speed_ev = (self.grid(uname) ** 2 + self.grid(vname) ** 2) ** 0.5
+        """Speed norm used to compute mean speed on contour, speed norm is kept
+        (like the one computed by :py:meth:`add_uv`) while u and v grids are not modified
+        """
+        u, v = self.grid(uname), self.grid(vname)
+        sources = self.vars.version(uname), self.vars.version(vname)
+        if self._speed_uv == sources:
+            return
+        self._speed_ev = (u ** 2 + v ** 2) ** 0.5
+        self._speed_uv = sources
 
     def display(self, ax, name, factor=1, ref=None, **kwargs):
         """
@@ -1973,7 +4013,7 @@ class RegularGridDataset(GridDataset):
         m = u.mask + v.mask
         return u, v, m
 
-    def advect(self, x, y, u_name, v_name, nb_step=10, rk4=False, **kw):
+    def advect(self, x, y, u_name, v_name, nb_step=10, rk4=False, parallel=False, **kw):
         """
         At each call it will update position in place with u & v field
 
@@ -1984,15 +4024,31 @@ class RegularGridDataset(GridDataset):
         :param str,array v_name: V field to advect obs
         :param int nb_step: Number of iteration before to release data
         :param int time_step: Number of second for each advection
+        :param bool parallel: Split particles across numba threads,
+            result is the same as with serial advection. Once numba threads are started,
+            process pools of this package use forkserver or spawn (look at :py:func:`process_pool_context`),
+            a process forked by other code could stay blocked at exit
         """
         u, v, m = self.uv_for_advection(u_name, v_name, **kw)
-        advect_ = advect_rk4 if rk4 else advect
+        if parallel:
+            advect_ = advect_rk4_parallel if rk4 else advect_parallel
+        else:
+            advect_ = advect_rk4 if rk4 else advect
         while True:
             advect_(self.x_c, self.y_c, u, v, m, x, y, nb_step)
             yield x, y
 
     def filament(
-        self, x, y, u_name, v_name, nb_step=10, filament_size=6, rk4=False, **kw
+        self,
+        x,
+        y,
+        u_name,
+        v_name,
+        nb_step=10,
+        filament_size=6,
+        rk4=False,
+        parallel=False,
+        **kw,
     ):
         """
         Produce filament with concatenation of advection
@@ -2005,6 +4061,10 @@ class RegularGridDataset(GridDataset):
         :param int nb_step: Number of iteration before to release data
         :param int time_step: Number of second for each advection
         :param int filament_size: Number of point by filament
+        :param bool parallel: Split particles across numba threads,
+            result is the same as with serial advection. Once numba threads are started,
+            process pools of this package use forkserver or spawn (look at :py:func:`process_pool_context`),
+            a process forked by other code could stay blocked at exit
         :return: x,y for a line
         """
         u, v, m = self.uv_for_advection(u_name, v_name, **kw)
@@ -2017,7 +4077,10 @@ class RegularGridDataset(GridDataset):
         f_y[:] = nan
         f_x[::filament_size_] = x
         f_y[::filament_size_] = y
-        advect_ = advect_rk4 if rk4 else advect
+        if parallel:
+            advect_ = advect_rk4_parallel if rk4 else advect_parallel
+        else:
+            advect_ = advect_rk4 if rk4 else advect
         while True:
             # Shift position
             f_x[1:] = f_x[:-1]
@@ -2036,8 +4099,48 @@ def advect_rk4(x_g, y_g, u_g, v_g, m_g, x, y, nb_step):
     # Grid coordinates
     x_ref, y_ref = x_g[0], y_g[0]
     x_step, y_step = x_g[1] - x_ref, y_g[1] - y_ref
+    _advect_rk4_chunk(
+        x_ref, y_ref, x_step, y_step, u_g, v_g, m_g, x, y, 0, x.size, nb_step
+    )
+
+
+@njit(parallel=True)
+def advect_rk4_parallel(x_g, y_g, u_g, v_g, m_g, x, y, nb_step):
+    """
+    Same as :py:func:`advect_rk4`, but particles are split in chunks which are
+    advected by several threads, each chunk keeps its own cache.
+    Not cached on disk, numba could reload it with a wrong thread number.
+    """
+    # Grid coordinates
+    x_ref, y_ref = x_g[0], y_g[0]
+    x_step, y_step = x_g[1] - x_ref, y_g[1] - y_ref
+    nb = x.size
+    # Chunks are independent of thread number, so result never depend of it
+    chunk_size = 1024
+    for i_chunk in prange((nb - 1) // chunk_size + 1):
+        i_start = i_chunk * chunk_size
+        _advect_rk4_chunk(
+            x_ref,
+            y_ref,
+            x_step,
+            y_step,
+            u_g,
+            v_g,
+            m_g,
+            x,
+            y,
+            i_start,
+            min(i_start + chunk_size, nb),
+            nb_step,
+        )
+
+
+@njit(cache=True)
+def _advect_rk4_chunk(
+    x_ref, y_ref, x_step, y_step, u_g, v_g, m_g, x, y, i_start, i_stop, nb_step
+):
     # On each particule
-    for i in prange(x.size):
+    for i in range(i_start, i_stop):
         # If particule are not valid => continue
         x_, y_ = x[i], y[i]
         if isnan(x_) or isnan(y_):
@@ -2098,10 +4201,48 @@ def advect(x_g, y_g, u_g, v_g, m_g, x, y, nb_step):
     # Grid coordinates
     x_ref, y_ref = x_g[0], y_g[0]
     x_step, y_step = x_g[1] - x_ref, y_g[1] - y_ref
+    _advect_chunk(x_ref, y_ref, x_step, y_step, u_g, v_g, m_g, x, y, 0, x.size, nb_step)
+
+
+@njit(parallel=True)
+def advect_parallel(x_g, y_g, u_g, v_g, m_g, x, y, nb_step):
+    """
+    Same as :py:func:`advect`, but particles are split in chunks which are
+    advected by several threads, each chunk keeps its own cache.
+    Not cached on disk, numba could reload it with a wrong thread number.
+    """
+    # Grid coordinates
+    x_ref, y_ref = x_g[0], y_g[0]
+    x_step, y_step = x_g[1] - x_ref, y_g[1] - y_ref
+    nb = x.size
+    # Chunks are independent of thread number, so result never depend of it
+    chunk_size = 1024
+    for i_chunk in prange((nb - 1) // chunk_size + 1):
+        i_start = i_chunk * chunk_size
+        _advect_chunk(
+            x_ref,
+            y_ref,
+            x_step,
+            y_step,
+            u_g,
+            v_g,
+            m_g,
+            x,
+            y,
+            i_start,
+            min(i_start + chunk_size, nb),
+            nb_step,
+        )
+
+
+@njit(cache=True)
+def _advect_chunk(
+    x_ref, y_ref, x_step, y_step, u_g, v_g, m_g, x, y, i_start, i_stop, nb_step
+):
     # Indices which should be never exist
     i0_old, j0_old = -100000, -100000
     # On each particule
-    for i in prange(x.size):
+    for i in range(i_start, i_stop):
         # If particule are not valid => continue
         if isnan(x[i]) or isnan(y[i]):
             continue
@@ -2222,36 +4363,134 @@ def has_value(grid, i_x, i_y, value, below=False):
     return False
 
 
+@njit(cache=True)
+def has_lower_masked_neighbour(grid, mask, i_x, i_y, wrap_x=False):
+    """Check if a masked neighbour of a pixel is lower than this pixel"""
+    nb_x, nb_y = grid.shape
+    for i, j in zip(i_x, i_y):
+        value = grid[i, j]
+        for i_ in range(i - 1, i + 2):
+            if wrap_x:
+                i_ %= nb_x
+            elif i_ < 0 or i_ >= nb_x:
+                continue
+            for j_ in range(max(j - 1, 0), min(j + 2, nb_y)):
+                if mask[i_, j_] and grid[i_, j_] < value:
+                    return True
+    return False
+
+
 class GridCollection:
-    def __init__(self):
-        self.datasets = list()
+    """
+    Time series of grids, times must be increasing.
+
+    Steps built from files only store (time, filename, indexs), grids are loaded on demand and kept in a least
+    recently used cache of `nb_cache` steps.
+    """
+
+    def __init__(self, nb_cache=None):
+        """
+        :param int,None nb_cache: maximal number of grids loaded from files kept in memory, None to keep all
+        """
+        self.times = list()
+        # A step is a grid or a (filename, indexs) to load
+        self.steps = list()
+        self.x_name, self.y_name, self.heigth = None, None, None
+        self.nb_cache = nb_cache
+        self.cache = OrderedDict()
+        self.lock = Lock()
+        self.executor = None
 
     @classmethod
-    def from_netcdf_cube(cls, filename, x_name, y_name, t_name, heigth=None):
-        new = cls()
+    def from_netcdf_cube(
+        cls, filename, x_name, y_name, t_name, heigth=None, nb_cache=None
+    ):
+        """
+        Declare each time step of a NetCDF cube, only times are read
+
+        :param str filename: NetCDF cube
+        :param str x_name: longitude name
+        :param str y_name: latitude name
+        :param str t_name: time name, times are in days
+        :param str,None heigth: if given, u and v are computed from this field at grid loading
+        :param int,None nb_cache: maximal number of grids kept in memory, None to keep all
+        """
+        new = cls(nb_cache)
+        new.x_name, new.y_name, new.heigth = x_name, y_name, heigth
         with Dataset(filename) as h:
             for i, t in enumerate(h.variables[t_name][:]):
-                d = RegularGridDataset(filename, x_name, y_name, indexs={t_name: i})
-                if heigth is not None:
-                    d.add_uv(heigth)
-                new.datasets.append((t, d))
+                new.times.append(t)
+                new.steps.append((filename, {t_name: i}))
         return new
 
     @classmethod
-    def from_netcdf_list(cls, filenames, t, x_name, y_name, indexs=None, heigth=None):
-        new = cls()
+    def from_netcdf_list(
+        cls, filenames, t, x_name, y_name, indexs=None, heigth=None, nb_cache=None
+    ):
+        """
+        Declare one time step by file, no file is read
+
+        :param list filenames: one file by time step
+        :param list t: time of each file in days
+        :param str x_name: longitude name
+        :param str y_name: latitude name
+        :param dict indexs: indexs to select a 2D grid in each file
+        :param str,None heigth: if given, u and v are computed from this field at grid loading
+        :param int,None nb_cache: maximal number of grids kept in memory, None to keep all
+        """
+        new = cls(nb_cache)
+        new.x_name, new.y_name, new.heigth = x_name, y_name, heigth
         for i, t in enumerate(t):
-            d = RegularGridDataset(filenames[i], x_name, y_name, indexs=indexs)
-            if heigth is not None:
-                d.add_uv(heigth)
-            new.datasets.append((t, d))
+            new.times.append(t)
+            new.steps.append((filenames[i], indexs))
         return new
 
-    def __getitem__(self, item):
-        for t, d in self.datasets:
-            if t == item:
+    @property
+    def datasets(self):
+        """List of (time, grid), all grids are loaded"""
+        return [(t, self.dataset(i)) for i, t in enumerate(self.times)]
+
+    @datasets.setter
+    def datasets(self, datasets):
+        self.times = [t for t, _ in datasets]
+        self.steps = [d for _, d in datasets]
+        self.cache.clear()
+
+    def __len__(self):
+        return len(self.times)
+
+    def dataset(self, i):
+        """
+        Get grid of a step, grids declared from files are loaded if they are not in cache
+
+        :param int i: index of step
+        :return: grid of step
+        :rtype: RegularGridDataset
+        """
+        step = self.steps[i]
+        if isinstance(step, GridDataset):
+            return step
+        i %= len(self.steps)
+        with self.lock:
+            d = self.cache.get(i, None)
+            if d is not None:
+                self.cache.move_to_end(i)
                 return d
-        raise KeyError(item)
+            filename, indexs = step
+            d = RegularGridDataset(filename, self.x_name, self.y_name, indexs=indexs)
+            if self.heigth is not None:
+                d.add_uv(self.heigth)
+            self.cache[i] = d
+            if self.nb_cache is not None:
+                while len(self.cache) > self.nb_cache:
+                    self.cache.popitem(last=False)
+        return d
+
+    def __getitem__(self, item):
+        i = bisect_left(self.times, item)
+        if i == len(self.times) or self.times[i] != item:
+            raise KeyError(item)
+        return self.dataset(i)
 
     def filament(
         self,
@@ -2264,6 +4503,8 @@ class GridCollection:
         time_step=600,
         filament_size=6,
         rk4=False,
+        parallel=False,
+        prefetch=True,
         **kw,
     ):
         """
@@ -2277,6 +4518,11 @@ class GridCollection:
         :param int nb_step: Number of iteration before to release data
         :param int time_step: Number of second for each advection
         :param int filament_size: Number of point by filament
+        :param bool parallel: Split particles across numba threads,
+            result is the same as with serial advection. Once numba threads are started,
+            process pools of this package use forkserver or spawn (look at :py:func:`process_pool_context`),
+            a process forked by other code could stay blocked at exit
+        :param bool prefetch: Load next step and compute its current in a background thread
         :return: x,y for a line
         """
         x, y = x.copy(), y.copy()
@@ -2291,21 +4537,21 @@ class GridCollection:
 
         backward = kw.get("backward", False)
         if backward:
-            generator = self.get_previous_time_step(t_init)
             dt = -nb_step * time_step
             t_step = -time_step
         else:
-            generator = self.get_next_time_step(t_init)
             dt = nb_step * time_step
             t_step = time_step
-        t0, d0 = generator.__next__()
-        u0, v0, m0 = d0.uv_for_advection(u_name, v_name, time_step, **kw)
-        t1, d1 = generator.__next__()
-        u1, v1, m1 = d1.uv_for_advection(u_name, v_name, time_step, **kw)
+        generator = self.uv_steps(t_init, u_name, v_name, time_step, prefetch, **kw)
+        t0, d0, u0, v0, m0 = generator.__next__()
+        t1, d1, u1, v1, m1 = generator.__next__()
         t0 = t0 * 86400
         t1 = t1 * 86400
         t = t_init * 86400
-        advect_ = advect_t_rk4 if rk4 else advect_t
+        if parallel:
+            advect_ = advect_t_rk4_parallel if rk4 else advect_t_parallel
+        else:
+            advect_ = advect_t_rk4 if rk4 else advect_t
         while True:
             # Shift position
             f_x[1:] = f_x[:-1]
@@ -2316,9 +4562,8 @@ class GridCollection:
 
             if (backward and t <= t1) or (not backward and t >= t1):
                 t0, u0, v0, m0 = t1, u1, v1, m1
-                t1, d1 = generator.__next__()
+                t1, d1, u1, v1, m1 = generator.__next__()
                 t1 = t1 * 86400
-                u1, v1, m1 = d1.uv_for_advection(u_name, v_name, time_step, **kw)
             w = 1 - (arange(t, t + dt, t_step) - t0) / (t1 - t0)
             half_w = t_step / 2.0 / (t1 - t0)
             advect_(d0.x_c, d0.y_c, u0, v0, m0, u1, v1, m1, x, y, w, half_w=half_w)
@@ -2337,69 +4582,208 @@ class GridCollection:
         nb_step=10,
         time_step=600,
         rk4=False,
+        parallel=False,
+        prefetch=True,
         **kw,
     ):
+        """
+        At each call it will update position in place with u & v field,
+        current is interpolated in time between the two nearest datasets
+
+        :param array x: Longitude of obs to move
+        :param array y: Latitude of obs to move
+        :param str,array u_name: U field to advect obs
+        :param str,array v_name: V field to advect obs
+        :param float t_init: Time of the initial position, in days
+        :param int nb_step: Number of iteration before to release data
+        :param int time_step: Number of second for each advection
+        :param bool rk4: Use a Runge-Kutta 4 scheme
+        :param bool parallel: Split particles across numba threads,
+            result is the same as with serial advection. Once numba threads are started,
+            process pools of this package use forkserver or spawn (look at :py:func:`process_pool_context`),
+            a process forked by other code could stay blocked at exit
+        :param bool prefetch: Load next step and compute its current in a background thread
+        """
         backward = kw.get("backward", False)
         if backward:
-            generator = self.get_previous_time_step(t_init)
             dt = -nb_step * time_step
             t_step = -time_step
         else:
-            generator = self.get_next_time_step(t_init)
             dt = nb_step * time_step
             t_step = time_step
-        t0, d0 = generator.__next__()
-        u0, v0, m0 = d0.uv_for_advection(u_name, v_name, time_step, **kw)
-        t1, d1 = generator.__next__()
-        u1, v1, m1 = d1.uv_for_advection(u_name, v_name, time_step, **kw)
+        generator = self.uv_steps(t_init, u_name, v_name, time_step, prefetch, **kw)
+        t0, d0, u0, v0, m0 = generator.__next__()
+        t1, d1, u1, v1, m1 = generator.__next__()
         t0 = t0 * 86400
         t1 = t1 * 86400
         t = t_init * 86400
-        advect_ = advect_t_rk4 if rk4 else advect_t
+        if parallel:
+            advect_ = advect_t_rk4_parallel if rk4 else advect_t_parallel
+        else:
+            advect_ = advect_t_rk4 if rk4 else advect_t
         while True:
             if (backward and t <= t1) or (not backward and t >= t1):
                 t0, u0, v0, m0 = t1, u1, v1, m1
-                t1, d1 = generator.__next__()
+                t1, d1, u1, v1, m1 = generator.__next__()
                 t1 = t1 * 86400
-                u1, v1, m1 = d1.uv_for_advection(u_name, v_name, time_step, **kw)
             w = 1 - (arange(t, t + dt, t_step) - t0) / (t1 - t0)
             half_w = t_step / 2.0 / (t1 - t0)
             advect_(d0.x_c, d0.y_c, u0, v0, m0, u1, v1, m1, x, y, w, half_w=half_w)
             t += dt
             yield t, x, y
 
+    def next_indices(self, t_init):
+        """Indices of steps used to advect forward from `t_init`, step before `t_init` first"""
+        i = bisect_left(self.times, t_init)
+        if i == len(self.times):
+            return
+        yield i - 1
+        yield from range(i, len(self.times))
+
+    def previous_indices(self, t_init):
+        """Indices of steps used to advect backward from `t_init`, step after `t_init` first"""
+        i = bisect_right(self.times, t_init)
+        if i == 0:
+            return
+        yield i
+        yield from range(i - 1, -1, -1)
+
     def get_next_time_step(self, t_init):
-        first = True
-        for i, (t, dataset) in enumerate(self.datasets):
-            if t < t_init:
-                continue
-            if first:
-                first = False
-                yield self.datasets[i - 1]
-            yield t, dataset
+        for i in self.next_indices(t_init):
+            yield self.times[i], self.dataset(i)
 
     def get_previous_time_step(self, t_init):
-        first = True
-        i = len(self.datasets)
-        for t, dataset in reversed(self.datasets):
-            i -= 1
-            if t > t_init:
-                continue
-            if first:
-                first = False
-                yield self.datasets[i + 1]
-            yield t, dataset
+        for i in self.previous_indices(t_init):
+            yield self.times[i], self.dataset(i)
+
+    def uv_for_advection(self, i, u_name, v_name, time_step=600, **kw):
+        """
+        Get time and U,V of a step to be used in degrees with precomputed time step
 
+        :param int i: index of step
+        :return: time, grid, u, v and mask
+        """
+        d = self.dataset(i)
+        return (self.times[i], d, *d.uv_for_advection(u_name, v_name, time_step, **kw))
 
-@njit(cache=True)
+    def uv_steps(self, t_init, u_name, v_name, time_step=600, prefetch=True, **kw):
+        """
+        Yield time, grid and U,V of steps used to advect from `t_init`
+
+        :param float t_init: initial time in days
+        :param bool prefetch: while a step is used, next one is loaded and its current computed in a
+            background thread
+        """
+        indices = (
+            self.previous_indices(t_init)
+            if kw.get("backward", False)
+            else self.next_indices(t_init)
+        )
+        uv = partial(
+            self.uv_for_advection,
+            u_name=u_name,
+            v_name=v_name,
+            time_step=time_step,
+            **kw,
+        )
+        if not prefetch:
+            for i in indices:
+                yield uv(i)
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1)
+        future = None
+        for i in indices:
+            next_future = self.executor.submit(uv, i)
+            if future is not None:
+                yield future.result()
+            future = next_future
+        if future is not None:
+            yield future.result()
+
+
+@njit(cache=True, nogil=True)
 def advect_t(x_g, y_g, u_g0, v_g0, m_g0, u_g1, v_g1, m_g1, x, y, weigths, half_w=0):
     # Grid coordinates
     x_ref, y_ref = x_g[0], y_g[0]
     x_step, y_step = x_g[1] - x_ref, y_g[1] - y_ref
+    _advect_t_chunk(
+        x_ref,
+        y_ref,
+        x_step,
+        y_step,
+        u_g0,
+        v_g0,
+        m_g0,
+        u_g1,
+        v_g1,
+        m_g1,
+        x,
+        y,
+        0,
+        x.size,
+        weigths,
+    )
+
+
+@njit(parallel=True, nogil=True)
+def advect_t_parallel(
+    x_g, y_g, u_g0, v_g0, m_g0, u_g1, v_g1, m_g1, x, y, weigths, half_w=0
+):
+    """
+    Same as :py:func:`advect_t`, but particles are split in chunks which are
+    advected by several threads, each chunk keeps its own cache.
+    Not cached on disk, numba could reload it with a wrong thread number.
+    """
+    # Grid coordinates
+    x_ref, y_ref = x_g[0], y_g[0]
+    x_step, y_step = x_g[1] - x_ref, y_g[1] - y_ref
+    nb = x.size
+    # Chunks are independent of thread number, so result never depend of it
+    chunk_size = 1024
+    for i_chunk in prange((nb - 1) // chunk_size + 1):
+        i_start = i_chunk * chunk_size
+        _advect_t_chunk(
+            x_ref,
+            y_ref,
+            x_step,
+            y_step,
+            u_g0,
+            v_g0,
+            m_g0,
+            u_g1,
+            v_g1,
+            m_g1,
+            x,
+            y,
+            i_start,
+            min(i_start + chunk_size, nb),
+            weigths,
+        )
+
+
+@njit(cache=True)
+def _advect_t_chunk(
+    x_ref,
+    y_ref,
+    x_step,
+    y_step,
+    u_g0,
+    v_g0,
+    m_g0,
+    u_g1,
+    v_g1,
+    m_g1,
+    x,
+    y,
+    i_start,
+    i_stop,
+    weigths,
+):
     # Indices which should be never exist
     i0_old, j0_old = -100000, -100000
     # On each particule
-    for i in prange(x.size):
+    for i in range(i_start, i_stop):
         # If particule are not valid => continue
         if isnan(x[i]) or isnan(y[i]):
             continue
@@ -2450,13 +4834,89 @@ def advect_t(x_g, y_g, u_g0, v_g0, m_g0, u_g1, v_g1, m_g1, x, y, weigths, half_w
             y[i] += dy0 * w + dy1 * (1 - w)
 
 
-@njit(cache=True)
+@njit(cache=True, nogil=True)
 def advect_t_rk4(x_g, y_g, u_g0, v_g0, m_g0, u_g1, v_g1, m_g1, x, y, weigths, half_w):
     # Grid coordinates
     x_ref, y_ref = x_g[0], y_g[0]
     x_step, y_step = x_g[1] - x_ref, y_g[1] - y_ref
+    _advect_t_rk4_chunk(
+        x_ref,
+        y_ref,
+        x_step,
+        y_step,
+        u_g0,
+        v_g0,
+        m_g0,
+        u_g1,
+        v_g1,
+        m_g1,
+        x,
+        y,
+        0,
+        x.size,
+        weigths,
+        half_w,
+    )
+
+
+@njit(parallel=True, nogil=True)
+def advect_t_rk4_parallel(
+    x_g, y_g, u_g0, v_g0, m_g0, u_g1, v_g1, m_g1, x, y, weigths, half_w
+):
+    """
+    Same as :py:func:`advect_t_rk4`, but particles are split in chunks which are
+    advected by several threads, each chunk keeps its own cache.
+    Not cached on disk, numba could reload it with a wrong thread number.
+    """
+    # Grid coordinates
+    x_ref, y_ref = x_g[0], y_g[0]
+    x_step, y_step = x_g[1] - x_ref, y_g[1] - y_ref
+    nb = x.size
+    # Chunks are independent of thread number, so result never depend of it
+    chunk_size = 1024
+    for i_chunk in prange((nb - 1) // chunk_size + 1):
+        i_start = i_chunk * chunk_size
+        _advect_t_rk4_chunk(
+            x_ref,
+            y_ref,
+            x_step,
+            y_step,
+            u_g0,
+            v_g0,
+            m_g0,
+            u_g1,
+            v_g1,
+            m_g1,
+            x,
+            y,
+            i_start,
+            min(i_start + chunk_size, nb),
+            weigths,
+            half_w,
+        )
+
+
+@njit(cache=True)
+def _advect_t_rk4_chunk(
+    x_ref,
+    y_ref,
+    x_step,
+    y_step,
+    u_g0,
+    v_g0,
+    m_g0,
+    u_g1,
+    v_g1,
+    m_g1,
+    x,
+    y,
+    i_start,
+    i_stop,
+    weigths,
+    half_w,
+):
     # On each particule
-    for i in prange(x.size):
+    for i in range(i_start, i_stop):
         # If particule are not valid => continue
         x_, y_ = x[i], y[i]
         if isnan(x_) or isnan(y_):
@@ -2501,3 +4961,311 @@ def advect_t_rk4(x_g, y_g, u_g0, v_g0, m_g0, u_g1, v_g1, m_g1, x, y, weigths, ha
             x_ += dx
             y_ += dy
         x[i], y[i] = x_, y_
+
+
+@njit(cache=True, nogil=True)
+def convolve_rows_(values, valid, kernels, rows, wrap, values_rows, weights_rows):
+    """
+    Apply kernels only on some rows of a grid, kernel weights are normalized
+    with weights of valid pixels
+
+    :param array values: grid values (x, y), masked values must be set to 0
+    :param array[bool] valid: False for masked pixels
+    :param array kernels: kernels (row, x, y) with the same odd sizes, centered on pixel
+    :param array rows: increasing indices of rows to compute
+    :param bool wrap: True if grid is circular along x
+    :param array values_rows: filtered values (row, x), nan if no valid pixels are used
+    :param array weights_rows: sum of kernel weights of valid pixels (row, x)
+    """
+    nb_x, nb_y = values.shape
+    _, k_x, k_y = kernels.shape
+    d_x, d_y = k_x // 2, k_y // 2
+    # Band of rows used by all kernels, stored along x to get contiguous access,
+    # band of one row stops before row + d_y
+    nb_band = nb_x + 2 * d_x
+    j0 = rows[0] - d_y
+    nb_j = rows[-1] + d_y - j0
+    band_values = zeros((nb_j, nb_band), dtype=values.dtype)
+    band_weights = zeros((nb_j, nb_band), dtype=values.dtype)
+    band_used = zeros(nb_j, dtype=numba_types.bool_)
+    for j in range(nb_j):
+        j_ = j0 + j
+        if j_ < 0 or j_ >= nb_y:
+            continue
+        for i in range(nb_band):
+            i_ = i - d_x
+            if i_ < 0 or i_ >= nb_x:
+                if not wrap:
+                    continue
+                i_ %= nb_x
+            if valid[i_, j_]:
+                band_values[j, i] = values[i_, j_]
+                band_weights[j, i] = 1
+                band_used[j] = True
+    sum_values = empty(nb_x)
+    sum_weights = empty(nb_x)
+    for i_row in range(rows.shape[0]):
+        kernel = kernels[i_row]
+        offset = rows[i_row] - d_y - j0
+        sum_values[:] = 0
+        sum_weights[:] = 0
+        for i_k in range(k_x):
+            for j_k in range(k_y - 1):
+                k = kernel[i_k, j_k]
+                if k == 0 or not band_used[offset + j_k]:
+                    continue
+                band_v = band_values[offset + j_k, i_k:]
+                band_w = band_weights[offset + j_k, i_k:]
+                for i in range(nb_x):
+                    sum_values[i] += k * band_v[i]
+                    sum_weights[i] += k * band_w[i]
+        for i in range(nb_x):
+            weights_rows[i_row, i] = sum_weights[i]
+            values_rows[i_row, i] = (
+                nan if sum_weights[i] == 0 else sum_values[i] / sum_weights[i]
+            )
+
+
+@njit(cache=True)
+def _stencil_index(i, nb, wrap, shift, shift_wrap):
+    """Index in data of a stencil pixel, like scipy.ndimage.convolve with reflect or wrap mode,
+    on data shifted of one pixel if shift
+    """
+    if wrap:
+        i %= nb
+    elif i < 0:
+        i = -i - 1
+    elif i >= nb:
+        i = 2 * nb - i - 1
+    if shift:
+        if i >= 1:
+            i -= 1
+        elif shift_wrap:
+            i = nb - 1
+    return i
+
+
+@njit(cache=True)
+def _stencil_gradient(
+    values, mask, i, j, vertical, weights, lengths, shifts, wrap, distances, coef, gof
+):
+    """Gradient of the first stencil without masked pixels and with a valid result"""
+    if vertical:
+        nb, pos, shift_wrap = values.shape[1], j, False
+    else:
+        nb, pos, shift_wrap = values.shape[0], i, True
+    for i_s in range(lengths.shape[0]):
+        length = lengths[i_s]
+        offset = pos + length // 2 - length + 1
+        valid = True
+        for k in range(length):
+            k_ = _stencil_index(offset + k, nb, wrap, shifts[i_s], shift_wrap)
+            if mask[i, k_] if vertical else mask[k_, j]:
+                valid = False
+                break
+        if not valid:
+            continue
+        # Same order than scipy.ndimage.convolve, null weights are skipped
+        d_h = 0.0
+        for k in range(length):
+            w = weights[i_s, length - 1 - k]
+            if w == 0:
+                continue
+            k_ = _stencil_index(offset + k, nb, wrap, shifts[i_s], shift_wrap)
+            d_h += w * (values[i, k_] if vertical else values[k_, j])
+        d_h = values.dtype.type(d_h)
+        d = gof.dtype.type(distances[i_s, pos] * coef)
+        if abs(d_h) * 2.2250738585072014e-308 >= abs(d):
+            continue
+        gradient = d_h / d
+        if isfinite(gradient):
+            return gradient, True
+    return values.dtype.type(0) / gof.dtype.type(1), False
+
+
+@njit(cache=True)
+def uv_stencil_(
+    values,
+    mask,
+    weights,
+    lengths,
+    shifts,
+    wrap,
+    d_x,
+    cos_lat,
+    d_y,
+    gof,
+    u,
+    v,
+    speed,
+    m_u,
+    m_v,
+    m_speed,
+):
+    """
+    Compute geostrophic velocities and speed norm in one pass, for each pixel, the first
+    stencil (from the largest) without masked pixels is used
+
+    :param array values: height (x, y)
+    :param array[bool] mask: True for masked pixels
+    :param array weights: stencil weights (stencil, 9), padded with 0
+    :param array[int] lengths: length of each stencil
+    :param array[bool] shifts: True if stencil is applied on data shifted of one pixel
+    :param bool wrap: True if grid is circular along x
+    :param array d_x: distance of stencil along x (stencil, x), must be multiply by cos_lat
+    :param array cos_lat: cosinus of latitude (y)
+    :param array d_y: distance of stencil along y (stencil, y)
+    :param array gof: gravity divided by coriolis parameter (y)
+    :param array u: output velocity along x
+    :param array v: output velocity along y
+    :param array speed: output speed norm
+    :param array[bool] m_u: output mask of u
+    :param array[bool] m_v: output mask of v
+    :param array[bool] m_speed: output mask of speed
+    """
+    nb_x, nb_y = values.shape
+    for i in range(nb_x):
+        for j in range(nb_y):
+            gradient, valid = _stencil_gradient(
+                values,
+                mask,
+                i,
+                j,
+                False,
+                weights,
+                lengths,
+                shifts,
+                wrap,
+                d_x,
+                cos_lat[j],
+                gof,
+            )
+            v[i, j] = gradient * gof[j] if valid else 0
+            m_v[i, j] = not valid
+            gradient, valid = _stencil_gradient(
+                values, mask, i, j, True, weights, lengths, shifts, False, d_y, 1.0, gof
+            )
+            u[i, j] = -gradient * gof[j] if valid else 0
+            m_u[i, j] = not valid
+            if m_u[i, j] or m_v[i, j]:
+                speed[i, j] = 0
+                m_speed[i, j] = True
+            else:
+                speed[i, j] = sqrt(u[i, j] ** 2 + v[i, j] ** 2)
+                m_speed[i, j] = not isfinite(speed[i, j])
+
+
+@njit(cache=True)
+def _cell_coordinates(x_c, y_c, i, j, x, y):
+    """Local coordinates of a point in cell (i, j), bilinear transform is inverted with Newton method"""
+    x00, x10, x11, x01 = x_c[i, j], x_c[i + 1, j], x_c[i + 1, j + 1], x_c[i, j + 1]
+    y00, y10, y11, y01 = y_c[i, j], y_c[i + 1, j], y_c[i + 1, j + 1], y_c[i, j + 1]
+    s, t = 0.5, 0.5
+    for _ in range(20):
+        f_x = (
+            (1 - s) * (1 - t) * x00
+            + s * (1 - t) * x10
+            + s * t * x11
+            + (1 - s) * t * x01
+            - x
+        )
+        f_y = (
+            (1 - s) * (1 - t) * y00
+            + s * (1 - t) * y10
+            + s * t * y11
+            + (1 - s) * t * y01
+            - y
+        )
+        dx_s = (1 - t) * (x10 - x00) + t * (x11 - x01)
+        dx_t = (1 - s) * (x01 - x00) + s * (x11 - x10)
+        dy_s = (1 - t) * (y10 - y00) + t * (y11 - y01)
+        dy_t = (1 - s) * (y01 - y00) + s * (y11 - y10)
+        det = dx_s * dy_t - dx_t * dy_s
+        if det == 0:
+            return nan, nan
+        d_s = (f_x * dy_t - f_y * dx_t) / det
+        d_t = (f_y * dx_s - f_x * dy_s) / det
+        s -= d_s
+        t -= d_t
+        if abs(d_s) + abs(d_t) < 1e-12:
+            break
+    return s, t
+
+
+@njit(cache=True)
+def locate_in_cells(
+    x_c, y_c, x, y, i_start, j_start, hint, i_cell, j_cell, s_cell, t_cell, max_step=-1
+):
+    """
+    Walk in cells of a curvilinear grid to find cell which contains each point,
+    cell (i, j) is the quadrilateral of nodes (i, j), (i + 1, j), (i + 1, j + 1), (i, j + 1)
+
+    :param array x_c: x coordinates of nodes
+    :param array y_c: y coordinates of nodes
+    :param array x: x coordinates of points
+    :param array y: y coordinates of points
+    :param array[int] i_start: first index of start cell for each point, -1 to start from the cell of previous point
+    :param array[int] j_start: second index of start cell for each point
+    :param array[int] hint: last cell found, used as start cell of the first point and updated
+    :param array[int] i_cell: output first index of cell, -1 if point is not in grid
+    :param array[int] j_cell: output second index of cell
+    :param array s_cell: output local coordinate of point along first index
+    :param array t_cell: output local coordinate of point along second index
+    :param int max_step: maximal number of cells visited for a point, -1 for no limit
+    """
+    nb_x, nb_y = x_c.shape[0] - 1, x_c.shape[1] - 1
+    if max_step == -1:
+        max_step = nb_x + nb_y + 1
+    eps = 1e-9
+    i, j = min(hint[0], nb_x - 1), min(hint[1], nb_y - 1)
+    for k in range(x.shape[0]):
+        if i_start[k] >= 0:
+            i, j = min(i_start[k], nb_x - 1), min(j_start[k], nb_y - 1)
+        i_cell[k] = -1
+        for _ in range(max_step):
+            s, t = _cell_coordinates(x_c, y_c, i, j, x[k], y[k])
+            if isnan(s) or isnan(t):
+                break
+            d_i = -1 if s < -eps else (1 if s > 1 + eps else 0)
+            d_j = -1 if t < -eps else (1 if t > 1 + eps else 0)
+            if d_i == 0 and d_j == 0:
+                i_cell[k], j_cell[k], s_cell[k], t_cell[k] = i, j, s, t
+                hint[0], hint[1] = i, j
+                break
+            i_, j_ = min(max(i + d_i, 0), nb_x - 1), min(max(j + d_j, 0), nb_y - 1)
+            if i_ == i and j_ == j:
+                # Point is out of grid
+                break
+            i, j = i_, j_
+
+
+@njit(cache=True)
+def mean_in_cells(z_g, m_g, i_cell, j_cell, s_cell, t_cell):
+    """
+    Mean of values interpolated with bilinear weights in cells, points out of grid or in a
+    cell with a masked corner are not used
+
+    :param array z_g: values on nodes
+    :param array[bool] m_g: True if value is masked
+    :param array[int] i_cell: first index of cell, -1 if point is not in grid
+    :param array[int] j_cell: second index of cell
+    :param array s_cell: local coordinate of point along first index
+    :param array t_cell: local coordinate of point along second index
+    :return: mean, nan if no points could be used
+    :rtype: float
+    """
+    total, nb = 0.0, 0
+    for k in range(i_cell.shape[0]):
+        i, j, s, t = i_cell[k], j_cell[k], s_cell[k], t_cell[k]
+        if i == -1:
+            continue
+        if m_g[i, j] or m_g[i + 1, j] or m_g[i + 1, j + 1] or m_g[i, j + 1]:
+            continue
+        total += (
+            (1 - s) * (1 - t) * z_g[i, j]
+            + s * (1 - t) * z_g[i + 1, j]
+            + s * t * z_g[i + 1, j + 1]
+            + (1 - s) * t * z_g[i, j + 1]
+        )
+        nb += 1
+    return total / nb if nb else nan
@@ -7,18 +7,34 @@ import logging
 
 from matplotlib.cm import get_cmap
 from matplotlib.colors import Normalize
-from matplotlib.figure import Figure
 from numba import njit
 from numba import types as numba_types
 from numpy import (
+    add,
+    arange,
     array,
+    asarray,
+    ascontiguousarray,
+    bincount,
     concatenate,
     digitize,
+    dtype,
     empty,
+    float32,
+    float64,
+    full,
+    inf,
     int_,
+    lexsort,
     ma,
+    maximum,
+    median,
+    minimum,
     ones,
+    repeat,
     round,
+    searchsorted,
+    stack,
     unique,
     zeros,
 )
@@ -38,14 +54,17 @@ class Amplitude(object):
     __slots__ = (
         "h_0",
         "grid_extract",
+        "grid_values",
         "pixel_mask",
         "nb_pixel",
         "sla",
+        "sla_mask",
         "contour",
         "interval_min",
         "interval_min_secondary",
         "amplitude",
         "mle",
+        "extrema",
     )
 
     def __init__(
@@ -57,6 +76,7 @@ class Amplitude(object):
         mle=1,
         nb_step_min=2,
         nb_step_to_be_mle=2,
+        extrema=None,
     ):
         """
         Create amplitude object
@@ -68,6 +88,9 @@ class Amplitude(object):
         :param int mle: maximum number of local maxima in contour
         :param int nb_step_min: number of interval to consider like an eddy
         :param int nb_step_to_be_mle: number of interval to be consider like another maxima
+        :param array[bool],None extrema:
+            local extrema of data for searched sign, look at :py:func:`local_extrema_`,
+            if None local extrema are searched in contour bbox
         """
 
         # Height of the contour
@@ -80,29 +103,45 @@ class Amplitude(object):
         # Link on original grid (local view) or copy if it's on bound
         (x_start, x_stop), (y_start, y_stop) = contour.bbox_slice
         on_bounds = x_start > x_stop
-        if on_bounds:
-            self.grid_extract = ma.concatenate(
-                (data[x_start:, y_start:y_stop], data[:x_stop, y_start:y_stop])
-            )
-            if self.grid_extract.mask.size == 1:
-                self.grid_extract = ma.array(
-                    self.grid_extract,
-                    mask=ones(self.grid_extract.shape, dtype="bool")
-                    * self.grid_extract.mask,
-                )
-        else:
-            self.grid_extract = data[x_start:x_stop, y_start:y_stop]
-        # => maybe replace pixel out of contour by nan?
-        self.pixel_mask = zeros(self.grid_extract.shape, dtype="bool")
         i_x = contour.pixels_index[0] - x_start
         if on_bounds:
             i_x %= data.shape[0]
-
-        self.pixel_mask[i_x, contour.pixels_index[1] - y_start] = True
         self.nb_pixel = i_x.shape[0]
+        if extrema is None:
+            if on_bounds:
+                self.grid_extract = ma.concatenate(
+                    (data[x_start:, y_start:y_stop], data[:x_stop, y_start:y_stop])
+                )
+                if self.grid_extract.mask.size == 1:
+                    self.grid_extract = ma.array(
+                        self.grid_extract,
+                        mask=ones(self.grid_extract.shape, dtype="bool")
+                        * self.grid_extract.mask,
+                    )
+            else:
+                self.grid_extract = data[x_start:x_stop, y_start:y_stop]
+            self.grid_values = self.grid_extract.data
+            # => maybe replace pixel out of contour by nan?
+            self.pixel_mask = zeros(self.grid_extract.shape, dtype="bool")
+            self.pixel_mask[i_x, contour.pixels_index[1] - y_start] = True
+            self.extrema = None
+        else:
+            # Masked array are avoided, local extrema are already known
+            values = data.data
+            if on_bounds:
+                self.grid_values = concatenate(
+                    (values[x_start:, y_start:y_stop], values[:x_stop, y_start:y_stop])
+                )
+            else:
+                self.grid_values = values[x_start:x_stop, y_start:y_stop]
+            self.grid_extract = self.pixel_mask = None
+            # Local extrema in contour, in index of extract
+            m = extrema[contour.pixels_index]
+            self.extrema = i_x[m], contour.pixels_index[1][m] - y_start
 
         # Only pixel in contour
-        self.sla = data[contour.pixels_index]
+        self.sla = data.data[contour.pixels_index]
+        self.sla_mask = ma.getmaskarray(data)[contour.pixels_index]
         # Amplitude which will be provide
         self.amplitude = 0
         # Maximum local extrema accepted
@@ -112,23 +151,41 @@ class Amplitude(object):
         """Need update"""
         return self.interval_min <= self.amplitude
 
+    def local_extrema(self, sign):
+        """
+        Local extrema in contour, in index of extract, extrema of a same group are replaced
+        by their barycentre when there are more extrema than allowed
+
+        :param int sign: 1 for minima, -1 for maxima
+        :return: index of extrema along x and y
+        """
+        if self.extrema is None:
+            return detect_local_minima_(
+                self.grid_extract.data,
+                self.grid_extract.mask,
+                self.pixel_mask,
+                self.mle,
+                sign,
+            )
+        lmi_i, lmi_j = self.extrema
+        # Same order than a scan of extract
+        i = lexsort((lmi_j, lmi_i))
+        lmi_i, lmi_j = lmi_i[i], lmi_j[i]
+        if lmi_i.shape[0] > self.mle:
+            return group_local_extrema_(lmi_i, lmi_j)
+        return lmi_i, lmi_j
+
     def all_pixels_below_h0(self, level):
         """
         Check CSS11 criterion 1: The SSH values of all of the pixels
         are below a given SSH threshold for cyclonic eddies.
         """
         # In some case pixel value must be very near of contour bounds
-        if self.sla.mask.any() or ((self.sla.data - self.h_0) > self.EPSILON).any():
+        if self.sla_mask.any() or ((self.sla - self.h_0) > self.EPSILON).any():
             return False
         else:
             # All local extrema index on th box
-            lmi_i, lmi_j = detect_local_minima_(
-                self.grid_extract.data,
-                self.grid_extract.mask,
-                self.pixel_mask,
-                self.mle,
-                1,
-            )
+            lmi_i, lmi_j = self.local_extrema(1)
             # After we use grid.data because index are in contour and we check before than no pixel are hide
             nb = len(lmi_i)
             if nb == 0:
@@ -143,14 +200,14 @@ class Amplitude(object):
             else:
                 # Verify if several extrema are seriously below contour
                 nb_real_extrema = (
-                    (level - self.grid_extract.data[lmi_i, lmi_j])
+                    (level - self.grid_values[lmi_i, lmi_j])
                     >= self.interval_min_secondary
                 ).sum()
                 if nb_real_extrema > self.mle:
                     return False
-                index = self.grid_extract.data[lmi_i, lmi_j].argmin()
+                index = self.grid_values[lmi_i, lmi_j].argmin()
                 i, j = lmi_i[index], lmi_j[index]
-            self.amplitude = abs(self.grid_extract.data[i, j] - self.h_0)
+            self.amplitude = abs(self.grid_values[i, j] - self.h_0)
             (x_start, _), (y_start, _) = self.contour.bbox_slice
             i += x_start
             j += y_start
@@ -162,17 +219,11 @@ class Amplitude(object):
         are above a given SSH threshold for anticyclonic eddies.
         """
         # In some case pixel value must be very near of contour bounds
-        if self.sla.mask.any() or ((self.h_0 - self.sla.data) > self.EPSILON).any():
+        if self.sla_mask.any() or ((self.h_0 - self.sla) > self.EPSILON).any():
             return False
         else:
             # All local extrema index on th box
-            lmi_i, lmi_j = detect_local_minima_(
-                self.grid_extract.data,
-                self.grid_extract.mask,
-                self.pixel_mask,
-                self.mle,
-                -1,
-            )
+            lmi_i, lmi_j = self.local_extrema(-1)
             nb = len(lmi_i)
             if nb == 0:
                 logger.warning(
@@ -186,14 +237,14 @@ class Amplitude(object):
             else:
                 # Verify if several extrema are seriously above contour
                 nb_real_extrema = (
-                    (self.grid_extract.data[lmi_i, lmi_j] - level)
+                    (self.grid_values[lmi_i, lmi_j] - level)
                     >= self.interval_min_secondary
                 ).sum()
                 if nb_real_extrema > self.mle:
                     return False
-                index = self.grid_extract.data[lmi_i, lmi_j].argmax()
+                index = self.grid_values[lmi_i, lmi_j].argmax()
                 i, j = lmi_i[index], lmi_j[index]
-            self.amplitude = abs(self.grid_extract.data[i, j] - self.h_0)
+            self.amplitude = abs(self.grid_values[i, j] - self.h_0)
             (x_start, _), (y_start, _) = self.contour.bbox_slice
             i += x_start
             j += y_start
@@ -228,60 +279,187 @@ def detect_local_minima_(grid, general_mask, pixel_mask, maximum_local_extremum,
             if g.min() == (grid[i, j] * sign) and pixel_mask[i, j]:
                 xs.append(i)
                 ys.append(j)
+    # If several extrema we try to separate them
+    if len(xs) > maximum_local_extremum:
+        return group_local_extrema_(xs, ys)
+    return xs, ys
+
+
+@njit(cache=True)
+def group_local_extrema_(xs, ys):
+    """
+    Replace each group of neighbour extrema by its barycentre
+
+    :param xs: index of extrema along x
+    :param ys: index of extrema along y
+    :return: index of non grouped extrema followed by index of barycentres
+    """
     nb_extrema = len(xs)
+    # Group
+    nb_group = 1
+    gr = zeros(nb_extrema, dtype=numba_types.int16)
+    for i0 in range(nb_extrema - 1):
+        for i1 in range(i0 + 1, nb_extrema):
+            if (abs(xs[i0] - xs[i1]) + abs(ys[i0] - ys[i1])) == 1:
+                if gr[i0] == 0 and gr[i1] == 0:
+                    # Nobody was link with a known group
+                    gr[i0] = nb_group
+                    gr[i1] = nb_group
+                    nb_group += 1
+                elif gr[i0] == 0 and gr[i1] != 0:
+                    # i1 is link not i0
+                    gr[i0] = gr[i1]
+                elif gr[i1] == 0 and gr[i0] != 0:
+                    # i0 is link not i1
+                    gr[i1] = gr[i0]
+                else:
+                    # there already linked in two different group
+                    # we replace group from i0 with group from i1
+                    gr[gr == gr[i0]] = gr[i1]
 
-    # If several extrema we try to separate them
-    if nb_extrema > maximum_local_extremum:
-        # Group
-        nb_group = 1
-        gr = zeros(nb_extrema, dtype=numba_types.int16)
-        for i0 in range(nb_extrema - 1):
-            for i1 in range(i0 + 1, nb_extrema):
-                if (abs(xs[i0] - xs[i1]) + abs(ys[i0] - ys[i1])) == 1:
-                    if gr[i0] == 0 and gr[i1] == 0:
-                        # Nobody was link with a known group
-                        gr[i0] = nb_group
-                        gr[i1] = nb_group
-                        nb_group += 1
-                    elif gr[i0] == 0 and gr[i1] != 0:
-                        # i1 is link not i0
-                        gr[i0] = gr[i1]
-                    elif gr[i1] == 0 and gr[i0] != 0:
-                        # i0 is link not i1
-                        gr[i1] = gr[i0]
-                    else:
-                        # there already linked in two different group
-                        # we replace group from i0 with group from i1
-                        gr[gr == gr[i0]] = gr[i1]
-
-        m = gr != 0
-        grs = unique(gr[m])
-        # all non grouped extremum
-        # Numba work around
-        xs_new, ys_new = [0], [0]
-        xs_new.pop(0), ys_new.pop(0)
+    m = gr != 0
+    grs = unique(gr[m])
+    # all non grouped extremum
+    # Numba work around
+    xs_new, ys_new = [0], [0]
+    xs_new.pop(0), ys_new.pop(0)
+    for i in range(nb_extrema):
+        if m[i]:
+            continue
+        xs_new.append(xs[i])
+        ys_new.append(ys[i])
+    for gr_ in grs:
+        nb = 0
+        x_mean = 0
+        y_mean = 0
+        # Choose barycentre of group
         for i in range(nb_extrema):
-            if m[i]:
+            if gr_ == gr[i]:
+                x_mean += xs[i]
+                y_mean += ys[i]
+                nb += 1
+        x_mean /= nb
+        y_mean /= nb
+
+        xs_new.append(numba_types.int32(round(x_mean)))
+        ys_new.append(numba_types.int32(round(y_mean)))
+    return xs_new, ys_new
+
+
+@njit(cache=True)
+def is_local_extremum_(grid, mask, i, j, sign, wrap):
+    """
+    Check if a pixel is lower (sign=1) or higher (sign=-1) or equal to its 8 unmasked
+    neighbours, like :py:func:`detect_local_minima_`
+    """
+    nb_x = grid.shape[0]
+    value = grid[i, j] * sign
+    for i_ in range(i - 1, i + 2):
+        if wrap:
+            i_ %= nb_x
+        for j_ in range(j - 1, j + 2):
+            if not mask[i_, j_] and grid[i_, j_] * sign < value:
+                return False
+    return True
+
+
+@njit(cache=True)
+def local_extrema_(grid, mask, sign, wrap=False):
+    """
+    Get all local extrema of a grid, pixels on bounds are never extrema except along x
+    on a wrapped grid
+
+    :param array grid: values
+    :param array[bool] mask: masked values
+    :param int sign: 1 for minima, -1 for maxima
+    :param bool wrap: if True first and last rows are neighbours
+    :return: True for local extrema
+    :rtype: array[bool]
+    """
+    nb_x, nb_y = grid.shape
+    extrema = zeros(grid.shape, dtype=numba_types.bool_)
+    for i in range(0 if wrap else 1, nb_x if wrap else nb_x - 1):
+        for j in range(1, nb_y - 1):
+            if not mask[i, j]:
+                extrema[i, j] = is_local_extremum_(grid, mask, i, j, sign, wrap)
+    return extrema
+
+
+@njit(cache=True)
+def update_local_extrema_(grid, mask, extrema, i_x, i_y, sign, wrap=False):
+    """
+    Update local extrema around pixels which were masked
+
+    :param array grid: values
+    :param array[bool] mask: masked values, with pixels masked since last update
+    :param array[bool] extrema: local extrema which will be updated
+    :param array[int] i_x: index along x of masked pixels
+    :param array[int] i_y: index along y of masked pixels
+    :param int sign: 1 for minima, -1 for maxima
+    :param bool wrap: if True first and last rows are neighbours
+    """
+    nb_x, nb_y = grid.shape
+    for k in range(i_x.shape[0]):
+        for i in range(i_x[k] - 1, i_x[k] + 2):
+            if wrap:
+                i %= nb_x
+            elif i < 1 or i >= nb_x - 1:
                 continue
-            xs_new.append(xs[i])
-            ys_new.append(ys[i])
-        for gr_ in grs:
-            nb = 0
-            x_mean = 0
-            y_mean = 0
-            # Choose barycentre of group
-            for i in range(nb_extrema):
-                if gr_ == gr[i]:
-                    x_mean += xs[i]
-                    y_mean += ys[i]
-                    nb += 1
-            x_mean /= nb
-            y_mean /= nb
+            for j in range(i_y[k] - 1, i_y[k] + 2):
+                if j < 1 or j >= nb_y - 1:
+                    continue
+                if mask[i, j]:
+                    extrema[i, j] = False
+                else:
+                    extrema[i, j] = is_local_extremum_(grid, mask, i, j, sign, wrap)
 
-            xs_new.append(numba_types.int32(round(x_mean)))
-            ys_new.append(numba_types.int32(round(y_mean)))
-        return xs_new, ys_new
-    return xs, ys
+
+class ContourPath(object):
+    """
+    Iso line of a level, vertices are a view on coordinates stored in :py:class:`Contours`
+    """
+
+    __slots__ = (
+        "vertices",
+        "index",
+        "used",
+        "reject",
+        "contain_eddies",
+        "xmin",
+        "xmax",
+        "ymin",
+        "ymax",
+        "_circle_params",
+        "_slice",
+        "_pixels_in",
+    )
+
+    def __init__(self, vertices, xmin, ymin, xmax, ymax, index):
+        self.vertices = vertices
+        self.index = index
+        self.xmin, self.ymin, self.xmax, self.ymax = xmin, ymin, xmax, ymax
+        self.used = False
+        self.reject = 0
+        self.contain_eddies = False
+
+
+class ContourLevel(object):
+    """
+    All iso lines of one level
+    """
+
+    __slots__ = ("contours", "index", "paths")
+
+    def __init__(self, contours, index, paths):
+        self.contours = contours
+        self.index = index
+        self.paths = paths
+
+    def get_paths(self):
+        return self.paths
+
+    def get_nearest_path_bbox_contain_pt(self, x, y):
+        return self.contours.get_index_nearest_path_bbox_contain_pt(self.index, x, y)
 
 
 class Contours(object):
@@ -290,19 +468,18 @@ class Contours(object):
     a contour, *uavg*, and return index to contour with maximum
     *uavg* within a series of closed contours.
 
-    Attributes:
-      contour:
-        A matplotlib contour object of high-pass filtered SLA
-
-      eddy:
-        A tracklist object holding the SLA data
+    Iso lines are computed with a marching squares algorithm, coordinates of all
+    lines are stored in flat arrays.
 
-      grd:
-        A grid object
+    Attributes:
+      collections:
+        One :py:class:`ContourLevel` by level, which give access to iso lines
+        as :py:class:`ContourPath`
     """
 
     __slots__ = (
-        "contours",
+        "collections",
+        "_levels",
         "x_value",
         "y_value",
         "contour_index",
@@ -313,88 +490,126 @@ class Contours(object):
         "y_max_per_contour",
         "nb_pt_per_contour",
         "nb_contour_per_level",
+        "bucket_grid",
+        "bucket_keys",
+        "bucket_contours",
+        "_bucket_args",
+        "_vertices",
+        "_parents",
+        "circle_params",
     )
 
     DELTA_PREC = 1e-10
     DELTA_SUP = 1e-2
+    # Contours which cover more buckets are always tested
+    BUCKET_MAX = 64
 
     def get_next(self, origin, paths_left, paths_right):
         for i, path in enumerate(paths_right):
-            if abs(origin.vertices[-1, 1] - path.vertices[0, 1]) < self.DELTA_PREC:
-                if (path.vertices[0, 0] - origin.vertices[-1, 0]) > 1:
-                    path.vertices[:, 0] -= 360
-                origin.vertices = concatenate((origin.vertices, path.vertices))
+            if abs(origin[-1, 1] - path[0, 1]) < self.DELTA_PREC:
+                if (path[0, 0] - origin[-1, 0]) > 1:
+                    path[:, 0] -= 360
+                origin = concatenate((origin, path))
                 paths_right.pop(i)
                 if self.check_closing(origin):
-                    origin.vertices[-1] = origin.vertices[0]
-                    return True
+                    origin[-1] = origin[0]
+                    return origin
                 return self.get_next(origin, paths_right, paths_left)
-        return False
+        return None
 
-    def check_closing(self, path):
-        return abs(path.vertices[0, 1] - path.vertices[-1, 1]) < self.DELTA_PREC
+    def check_closing(self, vertices):
+        return abs(vertices[0, 1] - vertices[-1, 1]) < self.DELTA_PREC
 
-    def find_wrapcut_path_and_join(self, x0, x1):
-        poly_solve = 0
-        for collection in self.contours.collections:
-            paths = collection.get_paths()
-            paths_left = []
-            paths_right = []
-            paths_solve = []
-            paths_out = list()
-            # All path near meridian bounds
-            for path in paths:
-                x_start, x_end = path.vertices[0, 0], path.vertices[-1, 0]
+    def join_paths(self, paths_left, paths_right):
+        """Join paths cut by the meridian bounds
+
+        :param list paths_left: vertices of paths which start and stop on west bound
+        :param list paths_right: vertices of paths which start and stop on east bound
+        :return: vertices of joined paths and vertices of all paths, joined paths first
+        :rtype: list, list
+        """
+        paths_solve = list()
+        polys_to_pop_left = list()
+        # Solve simple close (2 segment)
+        for i_left, path_left in enumerate(paths_left):
+            for i_right, path_right in enumerate(paths_right):
                 if (
-                    abs(x_start - x0) < self.DELTA_PREC
-                    and abs(x_end - x0) < self.DELTA_PREC
-                ):
-                    paths_left.append(path)
-                elif (
-                    abs(x_start - x1) < self.DELTA_PREC
-                    and abs(x_end - x1) < self.DELTA_PREC
+                    abs(path_left[0, 1] - path_right[-1, 1]) < self.DELTA_PREC
+                    and abs(path_left[-1, 1] - path_right[0, 1]) < self.DELTA_PREC
                 ):
-                    paths_right.append(path)
-                else:
-                    paths_out.append(path)
-            if paths_left and paths_right:
-                polys_to_pop_left = list()
-                # Solve simple close (2 segment)
-                for i_left, path_left in enumerate(paths_left):
-                    for i_right, path_right in enumerate(paths_right):
-                        if (
-                            abs(path_left.vertices[0, 1] - path_right.vertices[-1, 1])
-                            < self.DELTA_PREC
-                            and abs(
-                                path_left.vertices[-1, 1] - path_right.vertices[0, 1]
-                            )
-                            < self.DELTA_PREC
-                        ):
-                            polys_to_pop_left.append(i_left)
-                            path_right.vertices[:, 0] -= 360
-                            path_left.vertices = concatenate(
-                                (path_left.vertices, path_right.vertices[1:])
-                            )
-                            path_left.vertices[-1] = path_left.vertices[0]
-                            paths_solve.append(path_left)
-                            paths_right.pop(i_right)
-                            break
-                for i in polys_to_pop_left[::-1]:
-                    paths_left.pop(i)
-                # Solve multiple segment:
-                if paths_left and paths_right:
-                    while len(paths_left):
-                        origin = paths_left.pop(0)
-                        if self.get_next(origin, paths_left, paths_right):
-                            paths_solve.append(origin)
-
-                poly_solve += len(paths_solve)
-
-                paths_out.extend(paths_solve)
-                paths_out.extend(paths_left)
-                paths_out.extend(paths_right)
-                collection._paths = paths_out
+                    polys_to_pop_left.append(i_left)
+                    path_right[:, 0] -= 360
+                    path_left = concatenate((path_left, path_right[1:]))
+                    path_left[-1] = path_left[0]
+                    paths_solve.append(path_left)
+                    paths_right.pop(i_right)
+                    break
+        for i in polys_to_pop_left[::-1]:
+            paths_left.pop(i)
+        # Solve multiple segment:
+        if paths_left and paths_right:
+            while len(paths_left):
+                origin = self.get_next(paths_left.pop(0), paths_left, paths_right)
+                if origin is not None:
+                    paths_solve.append(origin)
+        return paths_solve, paths_solve + paths_left + paths_right
+
+    def find_wrapcut_path_and_join(self, vertices, lines, nb_line_per_level, x0, x1):
+        """Join paths cut by the meridian bounds, joined paths are added after
+        the others in their level
+
+        :param array vertices: coordinates of all lines
+        :param array lines: first vertex index and number of vertices of each line
+        :param array nb_line_per_level: number of lines in each level
+        :param float x0: west bound
+        :param float x1: east bound
+        :return: vertices, lines and number of lines in each level, updated
+        :rtype: array, array, array
+        """
+        x_start = vertices[lines[:, 0], 0]
+        x_end = vertices[lines[:, 0] + lines[:, 1] - 1, 0]
+        left = (abs(x_start - x0) < self.DELTA_PREC) & (
+            abs(x_end - x0) < self.DELTA_PREC
+        )
+        right = (
+            ~left
+            & (abs(x_start - x1) < self.DELTA_PREC)
+            & (abs(x_end - x1) < self.DELTA_PREC)
+        )
+        poly_solve = 0
+        i_vertex = vertices.shape[0]
+        new_vertices, new_lines, nb_line_per_level = (
+            list(),
+            list(),
+            nb_line_per_level.copy(),
+        )
+        i_first = 0
+        for i_level, nb_line in enumerate(nb_line_per_level):
+            sl = slice(i_first, i_first + nb_line)
+            i_first += nb_line
+            if not (left[sl].any() and right[sl].any()):
+                new_lines.append(lines[sl])
+                continue
+            paths_left = [vertices[i : i + nb].copy() for i, nb in lines[sl][left[sl]]]
+            paths_right = [
+                vertices[i : i + nb].copy() for i, nb in lines[sl][right[sl]]
+            ]
+            paths_solve, paths = self.join_paths(paths_left, paths_right)
+            poly_solve += len(paths_solve)
+            nb_line_per_level[i_level] = (~(left[sl] | right[sl])).sum() + len(paths)
+            new_lines.append(lines[sl][~(left[sl] | right[sl])])
+            for path in paths:
+                new_lines.append(array(((i_vertex, path.shape[0]),)))
+                new_vertices.append(path)
+                i_vertex += path.shape[0]
         logger.info("%d contours close over the bounds", poly_solve)
+        if len(new_vertices) == 0:
+            return vertices, lines, nb_line_per_level
+        return (
+            concatenate([vertices] + new_vertices),
+            concatenate(new_lines),
+            nb_line_per_level,
+        )
 
     def __init__(self, x, y, z, levels, wrap_x=False, keep_unclose=False):
         """
@@ -402,8 +617,6 @@ class Contours(object):
         l_i : index to levels
         """
         logger.info("Start computing iso lines")
-        fig = Figure()
-        ax = fig.add_subplot(111)
         if wrap_x:
             logger.debug("wrapping activate to compute contour")
             x = concatenate((x, x[:1] + 360))
@@ -417,156 +630,323 @@ class Contours(object):
             levels[0],
             levels[-1],
         )
-        self.contours = ax.contour(
-            x, y, z.T if z.shape != x.shape else z, levels, cmap="rainbow"
-        )
+        self._levels = array(levels, dtype="f8")
+        vertices, lines, nb_line_per_level = self.compute_lines(x, y, z, self._levels)
         if wrap_x:
-            self.find_wrapcut_path_and_join(x[0], x[-1])
-        logger.info("Finish computing iso lines")
-
-        nb_level = 0
-        nb_contour = 0
-        nb_pt = 0
-        almost_closed_contours = 0
-        closed_contours = 0
-        # Count level and contour
-        for i, collection in enumerate(self.contours.collections):
-            collection.get_nearest_path_bbox_contain_pt = (
-                lambda x, y, i=i: self.get_index_nearest_path_bbox_contain_pt(i, x, y)
+            vertices, lines, nb_line_per_level = self.find_wrapcut_path_and_join(
+                vertices, lines, nb_line_per_level, x[0], x[-1]
             )
-            nb_level += 1
-
-            keep_path = list()
+        logger.info("Finish computing iso lines")
 
-            for contour in collection.get_paths():
-                # Contour with less vertices than 4 are popped
-                if contour.vertices.shape[0] < 4:
-                    continue
-                # Remove unclosed path
-                d_closed = (
-                    (contour.vertices[0, 0] - contour.vertices[-1, 0]) ** 2
-                    + (contour.vertices[0, 1] - contour.vertices[-1, 1]) ** 2
-                ) ** 0.5
-                if d_closed > self.DELTA_SUP and not keep_unclose:
-                    continue
-                elif d_closed != 0 and d_closed <= self.DELTA_SUP:
-                    # Repair almost closed contour
-                    if d_closed > self.DELTA_PREC:
-                        almost_closed_contours += 1
-                    else:
-                        closed_contours += 1
-                    contour.vertices[-1] = contour.vertices[0]
-                x_min, y_min = contour.vertices.min(axis=0)
-                x_max, y_max = contour.vertices.max(axis=0)
-                ptp_min = self.DELTA_PREC * 100
-                if abs(x_min - x_max) < ptp_min or abs(y_min - y_max) < ptp_min:
-                    continue
-                # Store to use latter
-                contour.xmin = x_min
-                contour.xmax = x_max
-                contour.ymin = y_min
-                contour.ymax = y_max
-                keep_path.append(contour)
-            collection._paths = keep_path
-            for contour in collection.get_paths():
-                contour.used = False
-                contour.reject = 0
-                nb_contour += 1
-                nb_pt += contour.vertices.shape[0]
+        nb_level = self._levels.shape[0]
+        i_first, nb_pt = lines[:, 0], lines[:, 1]
+        i_last = i_first + nb_pt - 1
+        # Contour with less vertices than 4 are popped
+        keep = nb_pt >= 4
+        # Remove unclosed path
+        d_closed = (
+            (vertices[i_first, 0] - vertices[i_last, 0]) ** 2
+            + (vertices[i_first, 1] - vertices[i_last, 1]) ** 2
+        ) ** 0.5
+        if not keep_unclose:
+            keep &= d_closed <= self.DELTA_SUP
+        # Repair almost closed contour
+        repair = keep & (d_closed != 0) & (d_closed <= self.DELTA_SUP)
+        vertices[i_last[repair]] = vertices[i_first[repair]]
+        almost_closed_contours = (d_closed[repair] > self.DELTA_PREC).sum()
+        closed_contours = repair.sum() - almost_closed_contours
+        # Bounding box of contours
+        xy = gather_lines(vertices, i_first[keep], nb_pt[keep])
+        xy_min, xy_max = empty((0, 2)), empty((0, 2))
+        if keep.any():
+            bounds = nb_pt[keep].cumsum() - nb_pt[keep]
+            xy_min = minimum.reduceat(xy, bounds, axis=0)
+            xy_max = maximum.reduceat(xy, bounds, axis=0)
+        ptp_min = self.DELTA_PREC * 100
+        small = (abs(xy_max - xy_min) < ptp_min).any(axis=1)
+        keep[keep] = ~small
+        xy_min, xy_max = xy_min[~small], xy_max[~small]
         logger.info(
             "Repair %d closed contours and %d almost closed contours / %d contours",
             closed_contours,
             almost_closed_contours,
-            nb_contour,
+            keep.sum(),
         )
-        # Type for coordinates
-        coord_dtype = contour.vertices.dtype
 
-        # Array declaration
-        self.x_value = empty(nb_pt, dtype=coord_dtype)
-        self.y_value = empty(nb_pt, dtype=coord_dtype)
-
-        self.level_index = empty(nb_level, dtype="u4")
-        self.nb_contour_per_level = empty(nb_level, dtype="u4")
-
-        self.nb_pt_per_contour = empty(nb_contour, dtype="u4")
+        # Flat arrays
+        self.nb_pt_per_contour = nb_pt[keep].astype("u4")
+        xy = gather_lines(vertices, i_first[keep], self.nb_pt_per_contour)
+        self.x_value = xy[:, 0].copy()
+        self.y_value = xy[:, 1].copy()
+        self._vertices = xy
+        self._parents = dict()
+        # Filled by grid during identification
+        self.circle_params = None
+        self.x_min_per_contour, self.y_min_per_contour = xy_min.T.copy()
+        self.x_max_per_contour, self.y_max_per_contour = xy_max.T.copy()
+        self.contour_index = array(
+            self.nb_pt_per_contour.cumsum() - self.nb_pt_per_contour, dtype="u4"
+        )
+        level_of_line = repeat(arange(nb_level), nb_line_per_level)
+        self.nb_contour_per_level = bincount(
+            level_of_line[keep], minlength=nb_level
+        ).astype("u4")
+        self.level_index = array(
+            self.nb_contour_per_level.cumsum() - self.nb_contour_per_level, dtype="u4"
+        )
+        self.build_bucket_index(level_of_line[keep])
+        # Objects to store states of each contour
+        paths = [
+            ContourPath(xy[i : i + nb], *bbox, index)
+            for index, (i, nb, bbox) in enumerate(
+                zip(
+                    self.contour_index.tolist(),
+                    self.nb_pt_per_contour.tolist(),
+                    concatenate((xy_min, xy_max), axis=1).tolist(),
+                )
+            )
+        ]
+        self.collections = list()
+        for i_level, (i0, nb) in enumerate(
+            zip(self.level_index.tolist(), self.nb_contour_per_level.tolist())
+        ):
+            self.collections.append(ContourLevel(self, i_level, paths[i0 : i0 + nb]))
 
-        self.x_min_per_contour = empty(nb_contour, dtype=coord_dtype)
-        self.x_max_per_contour = empty(nb_contour, dtype=coord_dtype)
-        self.y_min_per_contour = empty(nb_contour, dtype=coord_dtype)
-        self.y_max_per_contour = empty(nb_contour, dtype=coord_dtype)
+    def build_bucket_index(self, level_of_contour):
+        """Build an index of contours bbox on a uniform grid of buckets, a contour is
+        stored in each bucket covered by its bbox, buckets are identified by a key
+        computed with level and bucket position
 
-        # Filled array
-        i_pt = 0
-        i_c = 0
-        i_l = 0
-        for collection in self.contours.collections:
-            self.level_index[i_l] = i_c
-            for contour in collection.get_paths():
-                nb_pt = contour.vertices.shape[0]
-                # Copy pt
-                self.x_value[i_pt : i_pt + nb_pt] = contour.vertices[:, 0]
-                self.y_value[i_pt : i_pt + nb_pt] = contour.vertices[:, 1]
-
-                # Set bbox
-                self.x_min_per_contour[i_c], self.y_min_per_contour[i_c] = (
-                    contour.xmin,
-                    contour.ymin,
-                )
-                self.x_max_per_contour[i_c], self.y_max_per_contour[i_c] = (
-                    contour.xmax,
-                    contour.ymax,
-                )
+        :param array level_of_contour: level index of each contour
+        """
+        x_min, x_max = self.x_min_per_contour, self.x_max_per_contour
+        y_min, y_max = self.y_min_per_contour, self.y_max_per_contour
+        if x_min.shape[0] == 0:
+            x0, y0, size, nb_x, nb_y, x_end = 0, 0, 1, 1, 1, 0
+        else:
+            # Bucket size is twice the median size of contours
+            size = 2 * median(maximum(x_max - x_min, y_max - y_min))
+            x0, y0, x_end = x_min.min(), y_min.min(), x_max.max()
+            nb_x = int((x_end - x0) // size) + 1
+            nb_y = int((y_max.max() - y0) // size) + 1
+        # origin, size, shape and x extent
+        self.bucket_grid = array((x0, y0, size, nb_x, nb_y, x_end), dtype="f8")
+        keys, contours = bucket_keys_(
+            x_min,
+            y_min,
+            x_max,
+            y_max,
+            level_of_contour,
+            x0,
+            y0,
+            size,
+            nb_x,
+            nb_y,
+            self.BUCKET_MAX,
+        )
+        i = keys.argsort(kind="stable")
+        self.bucket_keys, self.bucket_contours = keys[i], contours[i]
+        self._bucket_args = (
+            self.level_index,
+            self.nb_contour_per_level,
+            self.nb_pt_per_contour,
+            self.contour_index,
+            self.x_value,
+            self.y_value,
+            self.x_min_per_contour,
+            self.y_min_per_contour,
+            self.x_max_per_contour,
+            self.y_max_per_contour,
+            self.bucket_grid,
+            self.bucket_keys,
+            self.bucket_contours,
+        )
 
-                # Count pt
-                self.nb_pt_per_contour[i_c] = nb_pt
-                i_pt += nb_pt
-                i_c += 1
-            i_l += 1
+    @staticmethod
+    def compute_lines(x, y, z, levels):
+        """Compute all iso lines, open and closed, with a marching squares algorithm
 
-        self.contour_index = array(
-            self.nb_pt_per_contour.cumsum() - self.nb_pt_per_contour, dtype="u4"
+        :param array x: coordinates along first axis of z, or coordinates of each pixel
+        :param array y: coordinates along second axis of z, or coordinates of each pixel
+        :param array z: values, masked values are not used
+        :param array levels: levels of iso lines, in increasing order
+        :return: coordinates of all lines, first vertex index and number of vertices
+            of each line and number of lines in each level
+        :rtype: array, array, array
+        """
+        # Lines are computed with y on first axis
+        unregular = z.shape == x.shape
+        z = z if unregular else z.T
+        z = ma.masked_invalid(ma.asarray(z, dtype=compute_dtype(z)), copy=False)
+        data = ascontiguousarray(z.data)
+        nodes, lines, nb_line_per_level = contour_lines_(
+            data, ascontiguousarray(ma.getmaskarray(z)), levels
         )
-        self.level_index[0] = 0
-        self.nb_contour_per_level[:-1] = self.level_index[1:] - self.level_index[:-1]
-        self.nb_contour_per_level[-1] = nb_contour - self.level_index[-1]
+        vertices, lines = lines_vertices(
+            x, y, data, nodes, lines, repeat(levels, nb_line_per_level), unregular
+        )
+        return vertices, lines, nb_line_per_level
 
     def iter(self, start=None, stop=None, step=None):
-        return self.contours.collections[slice(start, stop, step)]
+        return self.collections[slice(start, stop, step)]
 
     @property
     def cvalues(self):
-        return self.contours.cvalues
+        return self._levels
+
+    def get_flags(self):
+        """Get used and reject flags of all contours
+
+        :return: used and reject flags, ordered like contour index
+        :rtype: (array, array)
+        """
+        nb_contour = self.nb_pt_per_contour.shape[0]
+        used, reject = zeros(nb_contour, dtype="bool"), zeros(nb_contour, dtype="u1")
+        i = 0
+        for collection in self.collections:
+            for contour in collection.get_paths():
+                used[i], reject[i] = contour.used, contour.reject
+                i += 1
+        return used, reject
+
+    def set_flags(self, used, reject):
+        """Set used and reject flags of all contours
+
+        :param array used: used flags, ordered like contour index
+        :param array reject: reject flags, ordered like contour index
+        """
+        i = 0
+        for collection in self.collections:
+            for contour in collection.get_paths():
+                contour.used, contour.reject = bool(used[i]), int(reject[i])
+                i += 1
 
     @property
     def levels(self):
-        return self.contours.levels
+        return self._levels
 
     def get_index_nearest_path_bbox_contain_pt(self, level, xpt, ypt):
         """Get index from the nearest path in the level, if the bbox of the
         path contain pt
 
-        overhead of python is huge with numba, cython little bit best??
+        Candidates are selected with the bucket index.
+
+        :param int level: level index
+        :param float xpt: x coordinate of point
+        :param float ypt: y coordinate of point
+        :return: nearest path or None
+        :rtype: ContourPath
         """
-        index = index_from_nearest_path_with_pt_in_bbox_(
-            level,
-            self.level_index,
-            self.nb_contour_per_level,
-            self.nb_pt_per_contour,
-            self.contour_index,
-            self.x_value,
-            self.y_value,
-            self.x_min_per_contour,
-            self.y_min_per_contour,
-            self.x_max_per_contour,
-            self.y_max_per_contour,
-            xpt,
-            ypt,
-        )
+        index = index_from_nearest_path_in_buckets_(level, xpt, ypt, *self._bucket_args)
         if index == -1:
             return None
         else:
-            return self.contours.collections[level]._paths[index]
+            return self.collections[level].paths[index]
+
+    def get_index_nearest_path_bbox_contain_pts(self, levels, xpt, ypt):
+        """Same as :py:meth:`get_index_nearest_path_bbox_contain_pt` for several
+        points, one point and one level by item
+
+        :param array levels: level index of each point
+        :param array xpt: x coordinates of points
+        :param array ypt: y coordinates of points
+        :return: index of nearest path in its level for each point, -1 if no path
+        :rtype: array
+        """
+        return indexs_from_nearest_path_in_buckets_(
+            asarray(levels, dtype="i8"),
+            asarray(xpt, dtype="f8"),
+            asarray(ypt, dtype="f8"),
+            *self._bucket_args,
+        )
+
+    def get_parents(self, step):
+        """Get containment tree between consecutive levels, built at first call.
+
+        Iso lines of different levels never cross, so a contour is inside the contour
+        of the previous level (previous according to step) which contain its first
+        vertex and which have the smallest bbox.
+
+        :param int step: 1 to look for parents in lower level, -1 in upper level
+        :return: index of parent of each contour, -1 if contour has no parent
+        :rtype: array
+        """
+        if step not in self._parents:
+            parents = contour_parents_(step, self._vertices, *self._bucket_args)
+            # List is faster for item access from python
+            self._parents[step] = parents, parents.tolist()
+        return self._parents[step][0]
+
+    def get_children(self, step):
+        """Get children of each contour in containment tree
+
+        :param int step: 1 to look for children in upper level, -1 in lower level
+        :return: index of children sorted by parent and index of first child of
+            each contour, children of contour i are children[first[i]:first[i + 1]]
+        :rtype: array, array
+        """
+        parents = self.get_parents(step)
+        children = parents.argsort(kind="stable")
+        children = children[parents[children] != -1]
+        first = searchsorted(parents[children], arange(parents.shape[0] + 1))
+        return children, first
+
+    def get_parent(self, i, step):
+        """Get parent of one contour in containment tree
+
+        :param int i: index of contour
+        :param int step: 1 to look for parent in lower level, -1 in upper level
+        :return: index of parent, -1 if contour has no parent
+        :rtype: int
+        """
+        self.get_parents(step)
+        return self._parents[step][1][i]
+
+    def contain(self, i_out, i_in, nb_level, step):
+        """Check with containment tree if a contour is inside another one
+
+        :param int i_out: index of outer contour
+        :param int i_in: index of inner contour
+        :param int nb_level: number of levels between contours
+        :param int step: 1 if inner contour is on upper level, -1 if on lower level
+        :return: True if inner contour is in outer contour
+        :rtype: bool
+        """
+        self.get_parents(step)
+        parents = self._parents[step][1]
+        for _ in range(nb_level):
+            i_in = parents[i_in]
+            if i_in == -1:
+                return False
+        return i_in == i_out
+
+    def iter_nearest_path_bbox_contain_pt(
+        self, xpt, ypt, start=None, step=None, chunk=16
+    ):
+        """Yield for each level selected like in :py:meth:`iter` the nearest path
+        which bbox contain pt, levels are requested by chunk. Chunk size is doubled
+        at each request, so levels computed but not used stay limited if caller
+        stop early.
+
+        :param float xpt: x coordinate of point
+        :param float ypt: y coordinate of point
+        :param int start: first level
+        :param int step: step between levels
+        :param int chunk: maximal number of levels requested together
+        :return: nearest path or None for each level
+        :rtype: ContourPath
+        """
+        collections = self.iter(start=start, step=step)
+        i, nb = 0, 1
+        while i < len(collections):
+            levels = [coll.index for coll in collections[i : i + nb]]
+            indexs = self.get_index_nearest_path_bbox_contain_pts(
+                levels, full(len(levels), xpt), full(len(levels), ypt)
+            )
+            for level, index in zip(levels, indexs.tolist()):
+                yield None if index == -1 else self.collections[level].paths[index]
+            i += nb
+            nb = min(2 * nb, chunk)
 
     def display(
         self,
@@ -617,7 +997,11 @@ class Contours(object):
             for i in range(len(bins)):
                 paths[i] = list()
             paths[i + 1] = list()
-        for j, collection in enumerate(self.contours.collections[::step]):
+        levels = self._levels
+        level_colors = get_cmap("rainbow")(
+            Normalize(vmin=levels.min(), vmax=levels.max())(levels)
+        )
+        for j, collection in enumerate(self.collections[::step]):
             if not overide_color:
                 paths = list()
             for i in collection.get_paths():
@@ -644,7 +1028,7 @@ class Contours(object):
                     paths.append(i.vertices)
             local_kwargs = kwargs.copy()
             if "color" not in kwargs:
-                local_kwargs["color"] = collection.get_color()
+                local_kwargs["color"] = level_colors[collection.index]
                 local_kwargs.pop("label", None)
             elif j != 0:
                 local_kwargs.pop("label", None)
@@ -676,8 +1060,13 @@ class Contours(object):
             # TODO : need to create an object with all collections
             return mappable
         else:
-            if hasattr(self.contours, "_mins"):
-                ax.update_datalim([self.contours._mins, self.contours._maxs])
+            if self.nb_pt_per_contour.shape[0]:
+                ax.update_datalim(
+                    [
+                        (self.x_min_per_contour.min(), self.y_min_per_contour.min()),
+                        (self.x_max_per_contour.max(), self.y_max_per_contour.max()),
+                    ]
+                )
             ax.autoscale_view()
 
     def label_contour_unused_which_contain_eddies(self, eddies):
@@ -692,9 +1081,9 @@ class Contours(object):
             cor = -1
 
         # On each level
-        for j, collection in enumerate(self.contours.collections[sl]):
+        for j, collection in enumerate(self.collections[sl]):
             # get next height
-            contour_height = self.contours.cvalues[j + cor]
+            contour_height = self.cvalues[j + cor]
             # On each contour
             for i in collection.get_paths():
                 i.contain_eddies = False
@@ -717,6 +1106,258 @@ class Contours(object):
                     i.contain_eddies = True
 
 
+class LevelSets(object):
+    """
+    Connected regions of pixels above and below each level, found without iso lines.
+
+    Regions are labelled with a union-find where pixels enter level after level, so a
+    region grows from one level to the next one and is linked to the region which
+    contains it. Pixels are joined like in marching squares of :py:class:`Contours`,
+    so a region is bounded by iso lines of its level. Only regions bounded by a closed
+    iso line are kept, they are ordered by level and pixels of a region are a slice
+    of :py:attr:`pixels`. Iso lines are computed only on demand.
+    """
+
+    __slots__ = (
+        "x",
+        "y",
+        "z",
+        "kinds",
+        "wrap_x",
+        "unregular",
+        "nb_column",
+        "_levels",
+        "level",
+        "above",
+        "nb_pixel",
+        "nb_hole",
+        "parent",
+        "first_pixel",
+        "lowest_pixel",
+        "pixels",
+        "leaf",
+        "nb_contour_per_level",
+        "used",
+        "reject",
+    )
+
+    def __init__(self, x, y, z, levels, wrap_x=False):
+        """
+        :param array x: coordinates along first axis of z, or coordinates of each pixel
+        :param array y: coordinates along second axis of z, or coordinates of each pixel
+        :param array z: values, masked values are not used
+        :param array levels: levels in increasing order
+        :param bool wrap_x: if True, first and last columns are neighbours
+        """
+        logger.info("Start labelling regions on %d levels", len(levels))
+        self._levels = array(levels, dtype="f8")
+        nb_level = self._levels.shape[0]
+        # Regions are computed with y on first axis
+        self.unregular = z.shape == x.shape
+        z = z if self.unregular else z.T
+        z = ma.masked_invalid(ma.asarray(z, dtype=compute_dtype(z)), copy=False)
+        data = ascontiguousarray(z.data)
+        mask = ascontiguousarray(ma.getmaskarray(z))
+        self.nb_column = data.shape[1]
+        self.wrap_x = wrap_x
+        if wrap_x:
+            x = concatenate((x, x[:1] + 360))
+            data = concatenate((data, data[:, :1]), axis=1)
+            kinds = cell_kinds_(concatenate((mask, mask[:, :1]), axis=1))
+        else:
+            kinds = cell_kinds_(mask)
+        self.x, self.y, self.z, self.kinds = x, y, data, kinds
+        # Same sum than in marching squares to decide how a saddle is cut
+        middle = 0.25 * (data[:-1, :-1] + data[:-1, 1:] + data[1:, 1:] + data[1:, :-1])
+        data = data[:, : self.nb_column]
+        trees = list()
+        for above in (True, False):
+            # Index of level where a pixel enters in regions, pixels must be strictly
+            # above or below level
+            if above:
+                time = nb_level - searchsorted(self._levels, data)
+                t_middle = nb_level - searchsorted(self._levels, middle)
+            else:
+                time = searchsorted(self._levels, data, side="right")
+                t_middle = searchsorted(self._levels, middle, side="right")
+            time[mask] = nb_level
+            trees.append(
+                level_set_tree_(
+                    ascontiguousarray(time), mask, kinds, t_middle, nb_level, wrap_x
+                )
+            )
+
+        level, above, nb_pixel, nb_hole, parent = list(), list(), list(), list(), list()
+        first_pixel, lowest_pixel, pixels, leaf = list(), list(), list(), list()
+        i_region, i_pixel = 0, 0
+        for sign, (regions, start, lowest, pixels_, leaf_) in zip((True, False), trees):
+            # A region which touches bounds of domain is not bounded by a closed line
+            closed = regions[:, 3] == 0
+            nb = closed.sum()
+            # Last item is used to keep -1
+            index = full(regions.shape[0] + 1, -1)
+            index[:-1][closed] = arange(nb) + i_region
+            t = regions[closed, 0]
+            level.append(nb_level - 1 - t if sign else t)
+            above.append(full(nb, sign))
+            nb_pixel.append(regions[closed, 1])
+            nb_hole.append(1 - regions[closed, 2])
+            parent.append(index[regions[closed, 4]])
+            first_pixel.append(start[closed] + i_pixel)
+            lowest_pixel.append(lowest[closed])
+            pixels.append(pixels_)
+            leaf.append(index[leaf_])
+            i_region += nb
+            i_pixel += pixels_.shape[0]
+        level = concatenate(level)
+        i = level.argsort(kind="stable")
+        rank = full(i.shape[0] + 1, -1)
+        rank[i] = arange(i.shape[0])
+        self.level = level[i]
+        self.above = concatenate(above)[i]
+        self.nb_pixel = concatenate(nb_pixel)[i]
+        self.nb_hole = concatenate(nb_hole)[i]
+        self.parent = rank[concatenate(parent)[i]]
+        self.first_pixel = concatenate(first_pixel)[i]
+        self.lowest_pixel = concatenate(lowest_pixel)[i]
+        self.pixels = concatenate(pixels)
+        self.leaf = rank[stack(leaf)]
+        self.nb_contour_per_level = bincount(self.level, minlength=nb_level).astype(
+            "u4"
+        )
+        self.used = zeros(i.shape[0], dtype="bool")
+        self.reject = zeros(i.shape[0], dtype="u1")
+        logger.info("%d regions bounded by a closed line", i.shape[0])
+
+    @property
+    def levels(self):
+        return self._levels
+
+    @property
+    def cvalues(self):
+        return self._levels
+
+    def get_flags(self):
+        """Get used and reject flags of all regions
+
+        :return: used and reject flags, ordered like region index
+        :rtype: (array, array)
+        """
+        return self.used.copy(), self.reject.copy()
+
+    def set_flags(self, used, reject):
+        """Set used and reject flags of all regions
+
+        :param array used: used flags, ordered like region index
+        :param array reject: reject flags, ordered like region index
+        """
+        self.used[:] = used
+        self.reject[:] = reject
+
+    def pixel_index(self, i_x, i_y):
+        """Index of a pixel in regions"""
+        if self.unregular:
+            return i_x * self.nb_column + i_y
+        return i_y * self.nb_column + i_x
+
+    def region_pixels(self, i):
+        """Get pixels of a region
+
+        :param int i: region index
+        :return: indices of pixels in grid
+        :rtype: array[int],array[int]
+        """
+        i0 = self.first_pixel[i]
+        pixels = self.pixels[i0 : i0 + self.nb_pixel[i]]
+        if self.unregular:
+            return pixels // self.nb_column, pixels % self.nb_column
+        return pixels % self.nb_column, pixels // self.nb_column
+
+    def inner_regions(self, i, i_x, i_y):
+        """Get regions of next levels which are in a region and contain a pixel
+
+        :param int i: region index
+        :param int i_x: x index of pixel
+        :param int i_y: y index of pixel
+        :return: regions index, from outer to inner region
+        :rtype: list
+        """
+        inner = self.leaf[0 if self.above[i] else 1, self.pixel_index(i_x, i_y)]
+        regions = list()
+        while inner != i:
+            if inner == -1:
+                return list()
+            regions.append(inner)
+            inner = self.parent[inner]
+        return regions[::-1]
+
+    def lines(self, regions):
+        """Compute closed iso lines which bound regions
+
+        :param array regions: regions index
+        :return: coordinates of all lines, first vertex index and number of vertices
+            of each line
+        :rtype: array, array
+        """
+        regions = asarray(regions, dtype="i8")
+        levels = self._levels[self.level[regions]]
+        nodes, lines = region_lines_(
+            self.z, self.kinds, levels, self.lowest_pixel[regions], self.wrap_x
+        )
+        vertices, lines = lines_vertices(
+            self.x,
+            self.y,
+            self.z,
+            nodes[:, :2],
+            lines,
+            levels,
+            self.unregular,
+            nodes[:, 2] if self.wrap_x else None,
+        )
+        i_first, nb_pt = lines[:, 0], lines[:, 1]
+        vertices[i_first + nb_pt - 1] = vertices[i_first]
+        return vertices, lines
+
+    def contours(self, regions):
+        """Get closed iso lines which bound regions
+
+        :param list regions: regions index
+        :rtype: list(ContourPath)
+        """
+        if len(regions) == 0:
+            return list()
+        return self.paths(regions, *self.lines(regions))
+
+    @staticmethod
+    def paths(regions, vertices, lines):
+        """Get closed iso lines from lines computed by :py:meth:`lines`
+
+        :param list regions: regions index
+        :param array vertices: coordinates of all lines
+        :param array lines: first vertex index and number of vertices of each line
+        :rtype: list(ContourPath)
+        """
+        if len(regions) == 0:
+            return list()
+        xy_min = minimum.reduceat(vertices, lines[:, 0])
+        xy_max = maximum.reduceat(vertices, lines[:, 0])
+        return [
+            ContourPath(vertices[i : i + nb], x0, y0, x1, y1, index)
+            for index, (i, nb), (x0, y0), (x1, y1) in zip(
+                regions, lines.tolist(), xy_min.tolist(), xy_max.tolist()
+            )
+        ]
+
+
+def compute_dtype(z):
+    """Type used to compute iso lines and regions of z, float32 values are kept in float32
+
+    :param array z: values
+    :rtype: numpy.dtype
+    """
+    return dtype(float32) if z.dtype == float32 else dtype(float64)
+
+
 @njit(cache=True, fastmath=True)
 def index_from_nearest_path_with_pt_in_bbox_(
     level_index,
@@ -785,3 +1426,918 @@ def index_from_nearest_path_with_pt_in_bbox_(
         return int_(-1)
     # We return index of contour, for the specific level
     return int_(i_ref - i_start_c)
+
+
+@njit(cache=True)
+def bucket_keys_(
+    x_min, y_min, x_max, y_max, level, x0, y0, size, nb_x, nb_y, bucket_max
+):
+    """Get keys of buckets covered by each contour bbox, contours which cover
+    more than bucket_max buckets are stored in an extra bucket by level
+
+    :return: keys and contour index of each item
+    :rtype: array, array
+    """
+    nb_bucket = nb_x * nb_y + 1
+    nb_contour = x_min.shape[0]
+    nb_item = 0
+    for i in range(nb_contour):
+        nb = (int((x_max[i] - x0) // size) - int((x_min[i] - x0) // size) + 1) * (
+            int((y_max[i] - y0) // size) - int((y_min[i] - y0) // size) + 1
+        )
+        nb_item += 1 if nb > bucket_max else nb
+    keys = empty(nb_item, dtype=numba_types.int64)
+    contours = empty(nb_item, dtype=numba_types.uint32)
+    j = 0
+    for i in range(nb_contour):
+        i_x0, i_x1 = int((x_min[i] - x0) // size), int((x_max[i] - x0) // size)
+        i_y0, i_y1 = int((y_min[i] - y0) // size), int((y_max[i] - y0) // size)
+        if (i_x1 - i_x0 + 1) * (i_y1 - i_y0 + 1) > bucket_max:
+            keys[j] = level[i] * nb_bucket + nb_bucket - 1
+            contours[j] = i
+            j += 1
+            continue
+        for i_y in range(i_y0, i_y1 + 1):
+            for i_x in range(i_x0, i_x1 + 1):
+                keys[j] = level[i] * nb_bucket + i_y * nb_x + i_x
+                contours[j] = i
+                j += 1
+    return keys, contours
+
+
+@njit(cache=True)
+def bucket_candidates_(level, xpt, ypt, grid, keys, contours):
+    """Get contours stored in buckets which could contain the point, sorted"""
+    x0, y0, size, x_end = grid[0], grid[1], grid[2], grid[5]
+    nb_x, nb_y = int(grid[3]), int(grid[4])
+    nb_bucket = nb_x * nb_y + 1
+    first_key = level * nb_bucket
+    # Big contours
+    bucket_keys = [first_key + nb_bucket - 1]
+    i_y = int((ypt - y0) // size)
+    if 0 <= i_y < nb_y:
+        # Point could match with contours shift of 360
+        x = (xpt - x0) % 360 + x0
+        while x <= x_end:
+            bucket_keys.append(first_key + i_y * nb_x + int((x - x0) // size))
+            x += 360
+    bounds = list()
+    nb = 0
+    for key in bucket_keys:
+        i0, i1 = searchsorted(keys, key), searchsorted(keys, key, side="right")
+        bounds.append((i0, i1))
+        nb += i1 - i0
+    candidates = empty(nb, dtype=numba_types.int64)
+    j = 0
+    for i0, i1 in bounds:
+        for i in range(i0, i1):
+            candidates[j] = contours[i]
+            j += 1
+    candidates.sort()
+    return candidates
+
+
+@njit(cache=True)
+def contour_parents_(
+    step,
+    vertices,
+    l_i,
+    nb_c_per_l,
+    nb_pt_per_c,
+    indices_of_first_pts,
+    x_value,
+    y_value,
+    x_min_per_c,
+    y_min_per_c,
+    x_max_per_c,
+    y_max_per_c,
+    grid,
+    keys,
+    contours,
+):
+    """Find for each contour the contour of level - step which contain it,
+    candidates are found with bucket index
+    """
+    nb_level = nb_c_per_l.shape[0]
+    parents = empty(x_min_per_c.shape[0], dtype=numba_types.int32)
+    parents[:] = -1
+    for level in range(nb_level):
+        level_out = level - step
+        if level_out < 0 or level_out >= nb_level or nb_c_per_l[level_out] == 0:
+            continue
+        for i in range(l_i[level], l_i[level] + nb_c_per_l[level]):
+            i_pt = indices_of_first_pts[i]
+            x, y = x_value[i_pt], y_value[i_pt]
+            area_ref = inf
+            for j in bucket_candidates_(level_out, x, y, grid, keys, contours):
+                if y_min_per_c[j] > y or y_max_per_c[j] < y:
+                    continue
+                x_min = x_min_per_c[j]
+                if x_max_per_c[j] < (x - x_min) % 360 + x_min:
+                    continue
+                # Nested contours have nested bbox
+                area = (x_max_per_c[j] - x_min) * (y_max_per_c[j] - y_min_per_c[j])
+                if area >= area_ref:
+                    continue
+                i0 = indices_of_first_pts[j]
+                xy_out = vertices[i0 : i0 + nb_pt_per_c[j]]
+                # Same longitude normalization than poly_contain_poly
+                x_ = x
+                x_ref = xy_out[0, 0]
+                if abs(x - x_ref) > 180:
+                    x_ = (x - x_ref + 180) % 360 + x_ref - 180
+                if winding_number_poly(x_, y, xy_out) != 0:
+                    area_ref = area
+                    parents[i] = j
+    return parents
+
+
+@njit(cache=True, fastmath=True)
+def index_from_nearest_path_in_buckets_(
+    level_index,
+    xpt,
+    ypt,
+    l_i,
+    nb_c_per_l,
+    nb_pt_per_c,
+    indices_of_first_pts,
+    x_value,
+    y_value,
+    x_min_per_c,
+    y_min_per_c,
+    x_max_per_c,
+    y_max_per_c,
+    grid,
+    keys,
+    contours,
+):
+    """Get index from nearest path in edge bbox contain pt, same result than
+    :py:func:`index_from_nearest_path_with_pt_in_bbox_` but only contours found
+    in buckets are tested
+    """
+    if nb_c_per_l[level_index] == 0:
+        return -1
+    i_start_c = l_i[level_index]
+    find_contour = 0
+    i_ref = i_start_c
+    i_start_pt = indices_of_first_pts[i_start_c]
+    dist_ref = (x_value[i_start_pt] - xpt) ** 2 + (y_value[i_start_pt] - ypt) ** 2
+    i_previous = -1
+    # Contours are checked in the same order than a full scan of the level
+    for i_elt_c in bucket_candidates_(level_index, xpt, ypt, grid, keys, contours):
+        if i_elt_c == i_previous:
+            continue
+        i_previous = i_elt_c
+        if y_min_per_c[i_elt_c] > ypt:
+            continue
+        if y_max_per_c[i_elt_c] < ypt:
+            continue
+        x_min = x_min_per_c[i_elt_c]
+        xpt_ = (xpt - x_min) % 360 + x_min
+        if x_min > xpt_:
+            continue
+        if x_max_per_c[i_elt_c] < xpt_:
+            continue
+        i_start_pt = indices_of_first_pts[i_elt_c]
+        i_end_pt = i_start_pt + nb_pt_per_c[i_elt_c]
+        find_contour = 1
+        for i_elt_pt in range(i_start_pt, i_end_pt):
+            d_x = x_value[i_elt_pt] - xpt_
+            if abs(d_x) > 180:
+                d_x = (d_x + 180) % 360 - 180
+            dist = d_x ** 2 + (y_value[i_elt_pt] - ypt) ** 2
+            if dist < dist_ref:
+                dist_ref = dist
+                i_ref = i_elt_c
+    if find_contour == 0:
+        return int_(-1)
+    return int_(i_ref - i_start_c)
+
+
+@njit(cache=True)
+def indexs_from_nearest_path_in_buckets_(
+    levels,
+    xpt,
+    ypt,
+    l_i,
+    nb_c_per_l,
+    nb_pt_per_c,
+    indices_of_first_pts,
+    x_value,
+    y_value,
+    x_min_per_c,
+    y_min_per_c,
+    x_max_per_c,
+    y_max_per_c,
+    grid,
+    keys,
+    contours,
+):
+    """Apply :py:func:`index_from_nearest_path_in_buckets_` on several points"""
+    indexs = empty(levels.shape[0], dtype=numba_types.int64)
+    for i in range(levels.shape[0]):
+        indexs[i] = index_from_nearest_path_in_buckets_(
+            levels[i],
+            xpt[i],
+            ypt[i],
+            l_i,
+            nb_c_per_l,
+            nb_pt_per_c,
+            indices_of_first_pts,
+            x_value,
+            y_value,
+            x_min_per_c,
+            y_min_per_c,
+            x_max_per_c,
+            y_max_per_c,
+            grid,
+            keys,
+            contours,
+        )
+    return indexs
+
+
+def lines_vertices(x, y, data, nodes, lines, level_of_line, unregular, shift=None):
+    """Interpolate vertices of lines on crossed edges
+
+    :param array x: coordinates along second axis of data, or coordinates of each pixel
+    :param array y: coordinates along first axis of data, or coordinates of each pixel
+    :param array data: values with y on first axis
+    :param array nodes: for each vertex, index of nodes used to interpolate vertex
+    :param array lines: first vertex index and number of vertices of each line
+    :param array level_of_line: level of each line
+    :param bool unregular: True if coordinates are given for each pixel
+    :param array,None shift: number of turns to add on x of each vertex
+    :return: coordinates of all lines, first vertex index and number of vertices
+        of each line
+    :rtype: array, array
+    """
+    i_first, nb_pt = lines[:, 0], lines[:, 1]
+    level = repeat(level_of_line, nb_pt)
+    p1, p2 = nodes[:, 0], nodes[:, 1]
+    z1, z2 = data.reshape(-1)[p1], data.reshape(-1)[p2]
+    f = (z1 - level) / (z1 - z2)
+    if unregular:
+        x1, x2 = x.reshape(-1)[p1], x.reshape(-1)[p2]
+        y1, y2 = y.reshape(-1)[p1], y.reshape(-1)[p2]
+    else:
+        nb_x = data.shape[1]
+        x1, x2 = x[p1 % nb_x], x[p2 % nb_x]
+        y1, y2 = y[p1 // nb_x], y[p2 // nb_x]
+    vertices = empty((nodes.shape[0], 2), dtype="f8")
+    vertices[:, 0] = x1 * (1 - f) + x2 * f
+    vertices[:, 1] = y1 * (1 - f) + y2 * f
+    if shift is not None:
+        vertices[:, 0] += shift * 360
+    # When a node is on level, successive edges give same vertex, we keep only one
+    duplicate = zeros(vertices.shape[0], dtype="bool")
+    duplicate[1:] = (vertices[1:] == vertices[:-1]).all(axis=1)
+    duplicate[i_first] = False
+    if duplicate.any():
+        nb_pt = nb_pt - add.reduceat(duplicate, i_first)
+        lines = stack((nb_pt.cumsum() - nb_pt, nb_pt), axis=1)
+        vertices = vertices[~duplicate]
+    return vertices, lines
+
+
+def gather_lines(vertices, i_first, nb_pt):
+    """Concatenate vertices of a selection of lines
+
+    :param array vertices: coordinates of all lines
+    :param array i_first: index of first vertex of each line to select
+    :param array nb_pt: number of vertices of each line to select
+    :return: coordinates of selected lines
+    :rtype: array
+    """
+    nb_pt = nb_pt.astype("i8")
+    shift = i_first.astype("i8") - (nb_pt.cumsum() - nb_pt)
+    return vertices[arange(nb_pt.sum()) + repeat(shift, nb_pt)]
+
+
+@njit(cache=True)
+def corner_(r, c, k):
+    """Node of a corner of a cell, corners are numbered counterclockwise from south west"""
+    if k == 0:
+        return r, c
+    elif k == 1:
+        return r, c + 1
+    elif k == 2:
+        return r + 1, c + 1
+    return r + 1, c
+
+
+@njit(cache=True)
+def edge_corners_(kind, k):
+    """Corners of an edge of a cell in counterclockwise order,
+    edge 4 is the diagonal of a triangle cell"""
+    if k == 4:
+        return (kind + 3) % 4, (kind + 1) % 4
+    return k, (k + 1) % 4
+
+
+@njit(cache=True)
+def has_edge_(kind, k):
+    """Check if a cell of this kind get this edge"""
+    if kind == 4:
+        return k < 4
+    return k == 4 or (k != kind and k != (kind + 3) % 4)
+
+
+@njit(cache=True)
+def edge_id_(r, c, k, nb_y, nb_x):
+    """Unique id of an edge of a cell, ids are ordered like:
+    horizontal edges, vertical edges, diagonals"""
+    n = nb_y * nb_x
+    if k == 0:
+        return r * nb_x + c
+    elif k == 1:
+        return n + r * nb_x + c + 1
+    elif k == 2:
+        return (r + 1) * nb_x + c
+    elif k == 3:
+        return n + r * nb_x + c
+    return 2 * n + r * nb_x + c
+
+
+@njit(cache=True)
+def cell_kinds_(mask):
+    """Kind of each cell:
+
+    - -1 : cell with more than one masked corner, it's not used
+    - 0 to 3 : triangle cell, value is the index of the masked corner
+    - 4 : quad cell
+    """
+    nb_y, nb_x = mask.shape
+    kinds = empty((nb_y - 1, nb_x - 1), dtype=numba_types.int8)
+    for r in range(nb_y - 1):
+        for c in range(nb_x - 1):
+            nb, kind = 0, 4
+            for k in range(4):
+                r_, c_ = corner_(r, c, k)
+                if mask[r_, c_]:
+                    nb += 1
+                    kind = k
+            kinds[r, c] = kind if nb <= 1 else -1
+    return kinds
+
+
+@njit(cache=True)
+def neighbour_(kinds, r, c, k):
+    """Cell on the other side of an edge and index of the edge in this cell,
+    -1 if edge is a boundary"""
+    nb_y, nb_x = kinds.shape
+    if k == 0:
+        r, c = r - 1, c
+    elif k == 1:
+        r, c = r, c + 1
+    elif k == 2:
+        r, c = r + 1, c
+    elif k == 3:
+        r, c = r, c - 1
+    else:
+        return -1, -1, -1
+    if r < 0 or r >= nb_y or c < 0 or c >= nb_x or kinds[r, c] == -1:
+        return -1, -1, -1
+    return r, c, (k + 2) % 4
+
+
+@njit(cache=True)
+def exit_edge_(z, kinds, r, c, k_in, level):
+    """Edge where line go out of a cell, line keep values above level on its left"""
+    kind = kinds[r, c]
+    k_out, nb = -1, 0
+    for k in range(5):
+        if k == k_in or not has_edge_(kind, k):
+            continue
+        k0, k1 = edge_corners_(kind, k)
+        r0, c0 = corner_(r, c, k0)
+        r1, c1 = corner_(r, c, k1)
+        if z[r0, c0] <= level and z[r1, c1] > level:
+            nb += 1
+            k_out = k
+    if nb > 1:
+        # Saddle, above corners are joined if middle of cell is above level
+        middle = 0.25 * (z[r, c] + z[r, c + 1] + z[r + 1, c + 1] + z[r + 1, c])
+        k_out = (k_in + 1) % 4 if middle > level else (k_in + 3) % 4
+    return k_out
+
+
+@njit(cache=True)
+def grow_(buffer):
+    new = empty((buffer.shape[0] * 2, buffer.shape[1]), dtype=buffer.dtype)
+    new[: buffer.shape[0]] = buffer
+    return new
+
+
+@njit(cache=True)
+def level_buckets_(v_min, v_max, levels):
+    """Sort items in buckets of levels between v_min (included) and v_max (excluded),
+    items keep their order in each bucket"""
+    nb_level = levels.shape[0]
+    i_min = searchsorted(levels, v_min)
+    i_max = searchsorted(levels, v_max)
+    offset = zeros(nb_level + 1, dtype=numba_types.int64)
+    for i in range(v_min.shape[0]):
+        for j in range(i_min[i], i_max[i]):
+            offset[j + 1] += 1
+    for j in range(nb_level):
+        offset[j + 1] += offset[j]
+    position = offset[:-1].copy()
+    items = empty(offset[-1], dtype=numba_types.int64)
+    for i in range(v_min.shape[0]):
+        for j in range(i_min[i], i_max[i]):
+            items[position[j]] = i
+            position[j] += 1
+    return offset, items
+
+
+@njit(cache=True)
+def follow_line_(z, kinds, visited, i_level, level, r, c, k_in, id_stop, nodes, i_pt):
+    """Follow a line from a cell until a boundary or until id_stop edge,
+    for each crossed edge nodes above and below level are stored"""
+    nb_y, nb_x = z.shape
+    while True:
+        k_out = exit_edge_(z, kinds, r, c, k_in, level)
+        k0, k1 = edge_corners_(kinds[r, c], k_out)
+        r0, c0 = corner_(r, c, k0)
+        r1, c1 = corner_(r, c, k1)
+        if i_pt == nodes.shape[0]:
+            nodes = grow_(nodes)
+        nodes[i_pt, 0] = r1 * nb_x + c1
+        nodes[i_pt, 1] = r0 * nb_x + c0
+        i_pt += 1
+        id_ = edge_id_(r, c, k_out, nb_y, nb_x)
+        if id_ == id_stop or visited[id_] == i_level:
+            break
+        visited[id_] = i_level
+        r, c, k_in = neighbour_(kinds, r, c, k_out)
+        if r == -1:
+            break
+    return nodes, i_pt
+
+
+@njit(cache=True)
+def contour_lines_(z, mask, levels):
+    """Compute iso lines with a marching squares algorithm. For each level, open lines
+    from boundaries are given first and after closed lines, in order of their first cell,
+    values above level are on the left of lines. A cell with one masked corner is used
+    as a triangle. When a level passes exactly through a node, vertices of successive
+    edges are the same and only one is kept by :py:func:`lines_vertices`.
+
+    :param array z: values with y on first axis
+    :param array mask: masked values
+    :param array levels: levels in increasing order
+    :return: for each vertex index of nodes used to interpolate vertex, first one
+        is used as reference, first vertex index and number of vertices of each line,
+        number of lines for each level
+    :rtype: array, array, array
+    """
+    nb_y, nb_x = z.shape
+    nb_level = levels.shape[0]
+    kinds = cell_kinds_(mask)
+    # Boundary edges, where open lines start
+    b_cells, b_min, b_max = list(), list(), list()
+    for r in range(nb_y - 1):
+        for c in range(nb_x - 1):
+            kind = kinds[r, c]
+            if kind == -1:
+                continue
+            # Edges in order: south, west, east, north and diagonal
+            for k in (0, 3, 1, 2, 4):
+                if not has_edge_(kind, k) or neighbour_(kinds, r, c, k)[0] != -1:
+                    continue
+                k0, k1 = edge_corners_(kind, k)
+                r0, c0 = corner_(r, c, k0)
+                r1, c1 = corner_(r, c, k1)
+                b_cells.append((r, c, k))
+                b_min.append(min(z[r0, c0], z[r1, c1]))
+                b_max.append(max(z[r0, c0], z[r1, c1]))
+    b_offset, b_items = level_buckets_(array(b_min), array(b_max), levels)
+    # Vertical edges inside domain, where closed lines start
+    v_edges, v_min, v_max = list(), list(), list()
+    for r in range(nb_y - 1):
+        for c in range(1, nb_x - 1):
+            if kinds[r, c - 1] == -1 or kinds[r, c] == -1:
+                continue
+            if mask[r, c] or mask[r + 1, c]:
+                continue
+            v_edges.append((r, c))
+            v_min.append(min(z[r, c], z[r + 1, c]))
+            v_max.append(max(z[r, c], z[r + 1, c]))
+    v_offset, v_items = level_buckets_(array(v_min), array(v_max), levels)
+
+    visited = full(3 * nb_y * nb_x, -1, dtype=numba_types.int32)
+    nodes = empty((1024, 2), dtype=numba_types.int64)
+    lines = empty((64, 2), dtype=numba_types.int64)
+    nb_line_per_level = zeros(nb_level, dtype=numba_types.int64)
+    i_pt, i_line = 0, 0
+    for i_level in range(nb_level):
+        level = levels[i_level]
+        # Open lines, which start on a boundary where values above level are on the left
+        for i in b_items[b_offset[i_level] : b_offset[i_level + 1]]:
+            r, c, k = b_cells[i]
+            k0, k1 = edge_corners_(kinds[r, c], k)
+            r0, c0 = corner_(r, c, k0)
+            if z[r0, c0] <= level:
+                continue
+            id_ = edge_id_(r, c, k, nb_y, nb_x)
+            if visited[id_] == i_level:
+                continue
+            visited[id_] = i_level
+            r1, c1 = corner_(r, c, k1)
+            if i_pt == nodes.shape[0]:
+                nodes = grow_(nodes)
+            nodes[i_pt, 0] = r1 * nb_x + c1
+            nodes[i_pt, 1] = r0 * nb_x + c0
+            i_start = i_pt
+            nodes, i_pt = follow_line_(
+                z, kinds, visited, i_level, level, r, c, k, -1, nodes, i_pt + 1
+            )
+            if i_line == lines.shape[0]:
+                lines = grow_(lines)
+            lines[i_line] = i_start, i_pt - i_start
+            i_line += 1
+            nb_line_per_level[i_level] += 1
+        # Closed lines, which start on first vertical edge crossed
+        for i in v_items[v_offset[i_level] : v_offset[i_level + 1]]:
+            r, c = v_edges[i]
+            id_ = edge_id_(r, c, 3, nb_y, nb_x)
+            if visited[id_] == i_level:
+                continue
+            visited[id_] = i_level
+            if i_pt == nodes.shape[0]:
+                nodes = grow_(nodes)
+            nodes[i_pt, 0] = (r + 1) * nb_x + c
+            nodes[i_pt, 1] = r * nb_x + c
+            i_start = i_pt
+            if z[r + 1, c] > level:
+                c_, k = c, 3
+            else:
+                c_, k = c - 1, 1
+            nodes, i_pt = follow_line_(
+                z, kinds, visited, i_level, level, r, c_, k, id_, nodes, i_pt + 1
+            )
+            if i_line == lines.shape[0]:
+                lines = grow_(lines)
+            lines[i_line] = i_start, i_pt - i_start
+            i_line += 1
+            nb_line_per_level[i_level] += 1
+    return nodes[:i_pt], lines[:i_line], nb_line_per_level
+
+
+@njit(cache=True)
+def find_root_(parents, i):
+    """Root of the set of an item, path is compressed on the way"""
+    while parents[i] != i:
+        parents[i] = parents[parents[i]]
+        i = parents[i]
+    return i
+
+
+@njit(cache=True)
+def union_roots_(parents, size, chi, cross, i, j):
+    """Merge sets of two items, counters of sets are summed in root of merged set"""
+    i, j = find_root_(parents, i), find_root_(parents, j)
+    if i == j:
+        return i
+    if size[i] < size[j]:
+        i, j = j, i
+    parents[j] = i
+    size[i] += size[j]
+    chi[i] += chi[j]
+    cross[i] += cross[j]
+    return i
+
+
+@njit(cache=True)
+def join_edge_(parents, size, chi, cross, p, q, t, t_q, bound):
+    """Add an edge between pixel p, which enters at time t, and pixel q.
+
+    Edge is added when the last of both pixels enters, an edge which is a bound of
+    domain is counted when the first of both pixels enters
+    """
+    if t_q < t or (t_q == t and q < p):
+        root = union_roots_(parents, size, chi, cross, p, q)
+        chi[root] -= 1
+        if bound and t_q == t:
+            cross[root] += 1
+    elif bound and t_q > t:
+        cross[find_root_(parents, p)] += 1
+
+
+@njit(cache=True)
+def kind_of_cell_(kinds, r, c, wrap):
+    """Kind of a cell, -1 if cell is out of grid"""
+    nb_r, nb_c = kinds.shape
+    if r < 0 or r >= nb_r:
+        return -1
+    if wrap:
+        c %= nb_c
+    elif c < 0 or c >= nb_c:
+        return -1
+    return kinds[r, c]
+
+
+@njit(cache=True)
+def level_set_tree_(time, mask, kinds, t_middle, nb_time, wrap):
+    """
+    Label connected regions of pixels at each level with a union-find, regions grow
+    from one level to the next one. Pixels are joined like in marching squares of
+    :py:func:`contour_lines_`, so a region is bounded by iso lines of its level.
+
+    For each region we count pixels, euler characteristic (1 for a region without hole)
+    and edges on bounds of domain touched by region (0 for a region bounded by a closed
+    iso line).
+
+    :param array time: index of level where each pixel enters in regions, nb_time if never
+    :param array mask: masked pixels
+    :param array kinds: kind of cells, look at :py:func:`cell_kinds_`
+    :param array t_middle: index of level where middle of each cell enters in regions,
+        used to join corners of saddle cells
+    :param int nb_time: number of levels
+    :param bool wrap: if True, last column of pixels is a neighbour of first one
+    :return: for each region: index of level, number of pixels, euler characteristic,
+        number of touched bounds, parent region at next level (-1 at last level), first
+        index in pixels order and lowest pixel index; pixels ordered to have pixels of a
+        region in a contiguous slice and first region of each pixel (-1 if never in a region)
+    :rtype: array, array, array, array
+    """
+    nb_y, nb_x = time.shape
+    nb_pixel = nb_y * nb_x
+    t_pix = time.reshape(-1)
+    masked = mask.reshape(-1)
+    nb_r, nb_c = kinds.shape
+    # Pixels which are a corner of a used cell
+    in_domain = zeros(nb_pixel, dtype=numba_types.bool_)
+    for r in range(nb_r):
+        for c in range(nb_c):
+            kind = kinds[r, c]
+            if kind == -1:
+                continue
+            for k in range(4):
+                if k != kind:
+                    r_, c_ = corner_(r, c, k)
+                    in_domain[r_ * nb_x + c_ % nb_x] = True
+    # Above corners of a saddle cell are joined when middle of cell is above level
+    s_time, s_p0, s_p1 = list(), list(), list()
+    for r in range(nb_r):
+        for c in range(nb_c):
+            if kinds[r, c] != 4:
+                continue
+            p0, p1 = r * nb_x + c, r * nb_x + (c + 1) % nb_x
+            p2, p3 = p1 + nb_x, p0 + nb_x
+            t0, t1, t2, t3 = t_pix[p0], t_pix[p1], t_pix[p2], t_pix[p3]
+            t_s = max(t0, t2, t_middle[r, c])
+            if t_s < min(t1, t3) and t_s < nb_time:
+                s_time.append(t_s)
+                s_p0.append(p0)
+                s_p1.append(p2)
+            t_s = max(t1, t3, t_middle[r, c])
+            if t_s < min(t0, t2) and t_s < nb_time:
+                s_time.append(t_s)
+                s_p0.append(p1)
+                s_p1.append(p3)
+    s_offset = zeros(nb_time + 1, dtype=numba_types.int64)
+    for t in s_time:
+        s_offset[t + 1] += 1
+    p_offset = zeros(nb_time + 1, dtype=numba_types.int64)
+    for p in range(nb_pixel):
+        if t_pix[p] < nb_time:
+            p_offset[t_pix[p] + 1] += 1
+    for t in range(nb_time):
+        s_offset[t + 1] += s_offset[t]
+        p_offset[t + 1] += p_offset[t]
+    s_items = empty(s_offset[-1], dtype=numba_types.int64)
+    position = s_offset[:-1].copy()
+    for i in range(len(s_time)):
+        s_items[position[s_time[i]]] = i
+        position[s_time[i]] += 1
+    p_items = empty(p_offset[-1], dtype=numba_types.int64)
+    position = p_offset[:-1].copy()
+    for p in range(nb_pixel):
+        if t_pix[p] < nb_time:
+            p_items[position[t_pix[p]]] = p
+            position[t_pix[p]] += 1
+
+    parents = empty(nb_pixel, dtype=numba_types.int64)
+    size = zeros(nb_pixel, dtype=numba_types.int64)
+    chi = zeros(nb_pixel, dtype=numba_types.int64)
+    cross = zeros(nb_pixel, dtype=numba_types.int64)
+    stamp = full(nb_pixel, -1, dtype=numba_types.int64)
+    region_of_root = empty(nb_pixel, dtype=numba_types.int64)
+    leaf = full(nb_pixel, -1, dtype=numba_types.int64)
+    # Roots and regions of previous level
+    roots, roots_region = empty(nb_pixel, numba_types.int64), empty(
+        nb_pixel, numba_types.int64
+    )
+    new_roots, new_roots_region = empty(nb_pixel, numba_types.int64), empty(
+        nb_pixel, numba_types.int64
+    )
+    nb_root = 0
+    # time, number of pixels, euler characteristic, touched bounds, parent
+    regions = empty((1024, 5), dtype=numba_types.int64)
+    nb_region = 0
+    for t in range(nb_time):
+        for i in range(p_offset[t], p_offset[t + 1]):
+            p = p_items[i]
+            parents[p], size[p], chi[p] = p, 1, 1
+            cross[p] = 0 if in_domain[p] else 1
+        for i in range(p_offset[t], p_offset[t + 1]):
+            p = p_items[i]
+            r, c = p // nb_x, p % nb_x
+            # Edges with 4 neighbours, an edge is used if one of its 2 cells is used
+            for d in range(4):
+                if d == 0:
+                    r_q, c_q, r0, c0, r1, c1 = r, c + 1, r - 1, c, r, c
+                elif d == 1:
+                    r_q, c_q, r0, c0, r1, c1 = r + 1, c, r, c - 1, r, c
+                elif d == 2:
+                    r_q, c_q, r0, c0, r1, c1 = r, c - 1, r - 1, c - 1, r, c - 1
+                else:
+                    r_q, c_q, r0, c0, r1, c1 = r - 1, c, r - 1, c - 1, r - 1, c
+                if r_q < 0 or r_q >= nb_y:
+                    continue
+                if wrap:
+                    c_q %= nb_x
+                elif c_q < 0 or c_q >= nb_x:
+                    continue
+                q = r_q * nb_x + c_q
+                if masked[q]:
+                    continue
+                nb_used = (kind_of_cell_(kinds, r0, c0, wrap) != -1) + (
+                    kind_of_cell_(kinds, r1, c1, wrap) != -1
+                )
+                if nb_used == 0:
+                    continue
+                join_edge_(parents, size, chi, cross, p, q, t, t_pix[q], nb_used == 1)
+            # Cells where p is corner k
+            for k in range(4):
+                if k == 0:
+                    r0, c0 = r, c
+                elif k == 1:
+                    r0, c0 = r, c - 1
+                elif k == 2:
+                    r0, c0 = r - 1, c - 1
+                else:
+                    r0, c0 = r - 1, c
+                kind = kind_of_cell_(kinds, r0, c0, wrap)
+                if kind == -1:
+                    continue
+                c0 %= nb_c
+                # Cell is a face of region when its last corner enters
+                last = True
+                for j in range(4):
+                    if j == kind or j == k:
+                        continue
+                    r_, c_ = corner_(r0, c0, j)
+                    o = r_ * nb_x + c_ % nb_x
+                    if t_pix[o] > t or (t_pix[o] == t and o > p):
+                        last = False
+                if last:
+                    chi[find_root_(parents, p)] += 1
+                if kind < 4:
+                    # Diagonal of a triangle cell is a bound of domain
+                    if k == (kind + 1) % 4 or k == (kind + 3) % 4:
+                        r_, c_ = corner_(r0, c0, (2 * kind + 4 - k) % 4)
+                        o = r_ * nb_x + c_ % nb_x
+                        join_edge_(parents, size, chi, cross, p, o, t, t_pix[o], True)
+                else:
+                    # Diagonal of a saddle is removed when the other diagonal enters
+                    r_, c_ = corner_(r0, c0, (k + 2) % 4)
+                    o = r_ * nb_x + c_ % nb_x
+                    if t_pix[o] > t or (t_pix[o] == t and o > p):
+                        r_, c_ = corner_(r0, c0, (k + 1) % 4)
+                        t_s = t_pix[r_ * nb_x + c_ % nb_x]
+                        r_, c_ = corner_(r0, c0, (k + 3) % 4)
+                        t_s = max(t_s, t_pix[r_ * nb_x + c_ % nb_x], t_middle[r0, c0])
+                        if t_s < t:
+                            chi[find_root_(parents, p)] += 1
+        for i in s_items[s_offset[t] : s_offset[t + 1]]:
+            root = union_roots_(parents, size, chi, cross, s_p0[i], s_p1[i])
+            chi[root] -= 1
+        # One region by set, linked to regions of previous level
+        nb_new_root = 0
+        for i in range(nb_root + p_offset[t + 1] - p_offset[t]):
+            if i < nb_root:
+                root = find_root_(parents, roots[i])
+            else:
+                root = find_root_(parents, p_items[p_offset[t] + i - nb_root])
+            if stamp[root] != t:
+                stamp[root] = t
+                if nb_region == regions.shape[0]:
+                    regions = grow_(regions)
+                regions[nb_region] = t, size[root], chi[root], cross[root], -1
+                region_of_root[root] = nb_region
+                new_roots[nb_new_root] = root
+                new_roots_region[nb_new_root] = nb_region
+                nb_new_root += 1
+                nb_region += 1
+            if i < nb_root:
+                regions[roots_region[i], 4] = region_of_root[root]
+            else:
+                leaf[p_items[p_offset[t] + i - nb_root]] = region_of_root[root]
+        roots, new_roots = new_roots, roots
+        roots_region, new_roots_region = new_roots_region, roots_region
+        nb_root = nb_new_root
+    regions = regions[:nb_region]
+
+    # Pixels of a region are stored after pixels of its parent which are not in a child
+    own = zeros(nb_region, dtype=numba_types.int64)
+    lowest = full(nb_region, nb_pixel, dtype=numba_types.int64)
+    for p in range(nb_pixel):
+        i = leaf[p]
+        if i != -1:
+            own[i] += 1
+            lowest[i] = min(lowest[i], p)
+    start = empty(nb_region, dtype=numba_types.int64)
+    cursor = empty(nb_region, dtype=numba_types.int64)
+    i_cursor = 0
+    for i in range(nb_region - 1, -1, -1):
+        parent = regions[i, 4]
+        if parent == -1:
+            start[i] = i_cursor
+            i_cursor += regions[i, 1]
+        else:
+            start[i] = cursor[parent]
+            cursor[parent] += regions[i, 1]
+        cursor[i] = start[i] + own[i]
+    for i in range(nb_region):
+        parent = regions[i, 4]
+        if parent != -1:
+            lowest[parent] = min(lowest[parent], lowest[i])
+    cursor[:] = start
+    pixels = empty(i_cursor, dtype=numba_types.int64)
+    for p in range(nb_pixel):
+        i = leaf[p]
+        if i != -1:
+            pixels[cursor[i]] = p
+            cursor[i] += 1
+    return regions, start, lowest, pixels, leaf
+
+
+@njit(cache=True)
+def region_lines_(z, kinds, levels, lowest_pixels, wrap):
+    """
+    Follow iso lines around regions bounded by a closed line. Like in
+    :py:func:`contour_lines_`, a line starts on its first vertical edge, here the edge
+    below the lowest pixel of the region, and keeps values above level on its left.
+
+    :param array z: values with y on first axis, first column is repeated at the end
+        if grid is wrapped
+    :param array kinds: kind of cells, look at :py:func:`cell_kinds_`
+    :param array levels: level of each region
+    :param array lowest_pixels: lowest pixel index of each region
+    :param bool wrap: if True, lines could cross east and west bounds
+    :return: for each vertex index of nodes used to interpolate vertex and number of
+        turns to add on x, first vertex index and number of vertices of each line
+    :rtype: array, array
+    """
+    nb_y, nb_x = z.shape
+    nb_c = kinds.shape[1]
+    nb_x_pixel = nb_c if wrap else nb_x
+    nodes = empty((1024, 3), dtype=numba_types.int64)
+    lines = empty((lowest_pixels.shape[0], 2), dtype=numba_types.int64)
+    i_pt = 0
+    for i in range(lowest_pixels.shape[0]):
+        level = levels[i]
+        r, c = lowest_pixels[i] // nb_x_pixel - 1, lowest_pixels[i] % nb_x_pixel
+        if i_pt == nodes.shape[0]:
+            nodes = grow_(nodes)
+        nodes[i_pt] = (r + 1) * nb_x + c, r * nb_x + c, 0
+        lines[i, 0] = i_pt
+        i_pt += 1
+        id_stop = edge_id_(r, c, 3, nb_y, nb_x)
+        # Same edge seen from last column
+        id_wrap = id_stop + nb_c if wrap and c == 0 else id_stop
+        shift = 0
+        if z[r + 1, c] > level:
+            k_in = 3
+        elif c == 0:
+            c, k_in, shift = nb_c - 1, 1, -1
+        else:
+            c, k_in = c - 1, 1
+        while True:
+            k_out = exit_edge_(z, kinds, r, c, k_in, level)
+            k0, k1 = edge_corners_(kinds[r, c], k_out)
+            r0, c0 = corner_(r, c, k0)
+            r1, c1 = corner_(r, c, k1)
+            if i_pt == nodes.shape[0]:
+                nodes = grow_(nodes)
+            nodes[i_pt] = r1 * nb_x + c1, r0 * nb_x + c0, shift
+            i_pt += 1
+            id_ = edge_id_(r, c, k_out, nb_y, nb_x)
+            if id_ == id_stop or id_ == id_wrap:
+                break
+            r_, c_, k_in = neighbour_(kinds, r, c, k_out)
+            if r_ == -1:
+                if wrap and k_out == 1 and c == nb_c - 1:
+                    r_, c_, k_in = r, 0, 3
+                    shift += 1
+                elif wrap and k_out == 3 and c == 0:
+                    r_, c_, k_in = r, nb_c - 1, 1
+                    shift -= 1
+                else:
+                    break
+            r, c = r_, c_
+        lines[i, 1] = i_pt - lines[i, 0]
+    return nodes[:i_pt], lines
@@ -2348,6 +2348,70 @@ def grid_stat(x_c, y_c, grid, x, y, result, circular=False, method="mean"):
             result[elt] = v_max
 
 
+class ObservationsBuffer(object):
+    """
+    Growable storage to build observations one by one.
+
+    Each variable is stored in its own array, capacity of all arrays is doubled when
+    they are full. Buffer is frozen in one :py:class:`EddiesObservations` at the end.
+    """
+
+    __slots__ = ("model", "columns", "size", "capacity")
+
+    def __init__(self, capacity=128, **kwargs):
+        """
+        :param int capacity: Number of observations allocated at start
+        :param dict kwargs: look at :py:class:`EddiesObservations`
+        """
+        self.model = EddiesObservations(**kwargs)
+        self.size = 0
+        self.capacity = max(capacity, 1)
+        self.columns = dict()
+        for name, data_type, *shape in self.model.dtype:
+            shape = (self.capacity, *shape[0]) if shape else self.capacity
+            self.columns[name] = zeros(shape, dtype=data_type)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def add(self):
+        """Reserve a new observation
+
+        :return: index of the new observation, use it to fill columns
+        :rtype: int
+        """
+        if self.size == self.capacity:
+            self.grow(2 * self.capacity)
+        self.size += 1
+        return self.size - 1
+
+    def grow(self, capacity):
+        """Reallocate all columns with a new capacity
+
+        :param int capacity: Number of observations which could be stored
+        """
+        for name, column in self.columns.items():
+            new_column = zeros((capacity, *column.shape[1:]), dtype=column.dtype)
+            new_column[: self.size] = column[: self.size]
+            self.columns[name] = new_column
+        self.capacity = capacity
+
+    def freeze(self):
+        """Copy observations stored in one object
+
+        :return: observations filled
+        :rtype: EddiesObservations
+        """
+        eddies = self.model.new_like(self.model, self.size)
+        for name, column in self.columns.items():
+            eddies.obs[name] = column[: self.size]
+        eddies.sign_type = self.model.sign_type
+        return eddies
+
+
 class VirtualEddiesObservations(EddiesObservations):
     """Class to work with virtual obs"""
 
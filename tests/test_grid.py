@@ -1,9 +1,66 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import chain
+from logging import getLogger
+from logging.handlers import BufferingHandler
+from multiprocessing import current_process, get_context
+from pickle import dumps, loads
+
+from matplotlib.figure import Figure
 from matplotlib.path import Path
-from numpy import array, ma
-from pytest import approx
+from netCDF4 import Dataset
+from numpy import (
+    allclose,
+    arange,
+    array,
+    array_equal,
+    ceil,
+    concatenate,
+    cos,
+    deg2rad,
+    diff,
+    full,
+    interp,
+    isnan,
+    linspace,
+    ma,
+    meshgrid,
+    nan,
+    pi,
+    r_,
+    random,
+    repeat,
+    sin,
+    where,
+    zeros,
+)
+from pytest import approx, raises
+from scipy.signal import welch
 
 from py_eddy_tracker.data import get_path
-from py_eddy_tracker.dataset.grid import RegularGridDataset
+from py_eddy_tracker.dataset.grid import (
+    KERNEL_BANK,
+    ChunkCache,
+    GridCollection,
+    RegularGridDataset,
+    UnRegularGridDataset,
+    convolve_rows_,
+    convolve_rows_fft,
+    fit_circle_paths,
+    mean_in_cells,
+    numba_threads_started,
+    process_pool_context,
+)
+from py_eddy_tracker.eddy_feature import (
+    Amplitude,
+    Contours,
+    LevelSets,
+    index_from_nearest_path_with_pt_in_bbox_,
+    local_extrema_,
+    update_local_extrema_,
+)
+from py_eddy_tracker.generic import distance
+from py_eddy_tracker.poly import create_vertice, poly_contain_poly
 
 G = RegularGridDataset(get_path("mask_1_60.nc"), "lon", "lat")
 X = 0.025
@@ -75,3 +132,656 @@ def test_interp():
     # Interp bilinear
     assert g.interp("z", x0, y0) == 1.5
     assert g.interp("z", x1, y1) == 2
+
+
+def merge_duplicates(vertices):
+    return vertices[r_[True, (diff(vertices, axis=0) != 0).any(axis=1)]]
+
+
+def test_iso_lines():
+    # Iso lines must be the same as matplotlib ones, matplotlib versions don't agree
+    # on vertices of a level which passes through a node, so they are kept once
+    g = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
+    )
+    x, y, z = g.x_c, g.y_c, g.grid("adt")
+    levels = arange(-0.3, 0.3, 0.02)
+    vertices, lines, nb_line_per_level = Contours.compute_lines(x, y, z, levels)
+    segs = Figure().add_subplot(111).contour(x, y, z.T, levels).allsegs
+    assert [len(seg) for seg in segs] == nb_line_per_level.tolist()
+    for seg, (i, nb) in zip(chain(*segs), lines):
+        assert array_equal(merge_duplicates(seg), vertices[i : i + nb])
+    # Level through nodes, each node on level gives one vertex
+    x, y = arange(6.0), arange(5.0)
+    z = ma.array(x.reshape(-1, 1) + y, mask=zeros((6, 5), dtype="bool"))
+    vertices, lines, nb_line_per_level = Contours.compute_lines(x, y, z, array([3.0]))
+    assert nb_line_per_level.tolist() == [1]
+    i, nb = lines[0]
+    line = vertices[i : i + nb]
+    assert (line.sum(axis=1) == 3).all()
+    assert sorted(line[:, 0].tolist()) == [0, 1, 2, 3]
+    # Only closed contours are kept
+    c = Contours(x, y, z, levels)
+    assert c.nb_contour_per_level.sum() == len(c.nb_pt_per_contour)
+    for coll in c.iter():
+        for contour in coll.get_paths():
+            assert (contour.vertices[0] == contour.vertices[-1]).all()
+
+
+def test_nearest_path_index():
+    # Bucket index must give same paths than a scan of all bbox
+    g = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
+    )
+    c = Contours(g.x_c, g.y_c, g.grid("adt"), arange(-0.3, 0.3, 0.01))
+    x, y = meshgrid(linspace(-6, 37, 87), linspace(30, 46, 33))
+    x, y = x.reshape(-1), y.reshape(-1)
+    args = (
+        c.level_index,
+        c.nb_contour_per_level,
+        c.nb_pt_per_contour,
+        c.contour_index,
+        c.x_value,
+        c.y_value,
+        c.x_min_per_contour,
+        c.y_min_per_contour,
+        c.x_max_per_contour,
+        c.y_max_per_contour,
+    )
+    for level in range(len(c.levels)):
+        indexs = c.get_index_nearest_path_bbox_contain_pts(full(x.shape, level), x, y)
+        for x_, y_, i in zip(x, y, indexs):
+            assert index_from_nearest_path_with_pt_in_bbox_(level, *args, x_, y_) == i
+
+
+def test_contour_tree():
+    # Parent must be the smallest contour of previous level which contain contour
+    g = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
+    )
+    c = Contours(g.x_c, g.y_c, g.grid("adt"), arange(-0.3, 0.3, 0.01))
+    paths = [path for coll in c.iter() for path in coll.get_paths()]
+    level = repeat(arange(len(c.levels)), c.nb_contour_per_level)
+    for step in (1, -1):
+        parents = c.get_parents(step)
+        for i, path in enumerate(paths):
+            containers = [
+                j
+                for j in where(level == level[i] - step)[0]
+                if poly_contain_poly(paths[j].vertices, path.vertices)
+            ]
+            if len(containers) == 0:
+                assert parents[i] == -1
+            else:
+                assert parents[i] in containers
+                # Parent is inside all other containers
+                for j in containers:
+                    if j != parents[i]:
+                        parent = paths[parents[i]].vertices
+                        assert poly_contain_poly(paths[j].vertices, parent)
+        children, first = c.get_children(step)
+        for i in range(len(paths)):
+            assert (parents[children[first[i] : first[i + 1]]] == i).all()
+
+
+def test_contours_circle_params():
+    # Batched fit must give same values than a fit by contour
+    g = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
+    )
+    g.contours = Contours(g.x_c, g.y_c, g.grid("adt"), arange(-0.3, 0.3, 0.01))
+    params = g.contours_circle_params()
+    paths = [path for coll in g.contours.iter() for path in coll.get_paths()]
+    assert params.shape == (len(paths), 4)
+    for path, param in zip(paths, params):
+        assert array_equal(path.fit_circle(), param, equal_nan=True)
+    # Fit doesn't depend on position of contour in flat arrays
+    c = g.contours
+    i = arange(len(paths))[::-1]
+    nb_pt = c.nb_pt_per_contour[i]
+    vertices = concatenate([paths[j].vertices for j in i])
+    params_ = fit_circle_paths(
+        vertices[:, 0], vertices[:, 1], nb_pt.cumsum() - nb_pt, nb_pt
+    )
+    assert array_equal(params_, params[i], equal_nan=True)
+
+
+def test_level_sets():
+    # Regions must be bounded by iso lines found by Contours
+    g = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
+    )
+    z = g.grid("adt")
+    levels = arange(-0.3, 0.3, 0.01)
+    c = Contours(g.x_c, g.y_c, z, levels)
+    regions = LevelSets(g.x_c, g.y_c, z, levels)
+    nb_region = regions.level.shape[0]
+    assert regions.nb_contour_per_level.sum() == nb_region
+    for i in range(nb_region):
+        i_x, i_y = regions.region_pixels(i)
+        assert i_x.shape[0] == regions.nb_pixel[i]
+        level = levels[regions.level[i]]
+        values = z[i_x, i_y]
+        assert not values.mask.any()
+        assert (values > level).all() if regions.above[i] else (values < level).all()
+        # Parent region contains all pixels of region
+        parent = regions.parent[i]
+        if parent != -1:
+            assert regions.level[parent] == regions.level[i] + (
+                -1 if regions.above[i] else 1
+            )
+            j_x, j_y = regions.region_pixels(parent)
+            assert set(zip(i_x, i_y)) <= set(zip(j_x, j_y))
+    paths = dict()
+    for i_level, coll in enumerate(c.iter()):
+        for path in coll.get_paths():
+            paths[(i_level, *path.vertices[0])] = path.vertices
+    hole_free = where(regions.nb_hole == 0)[0]
+    for i, contour in zip(hole_free, regions.contours(hole_free)):
+        # Line around a pixel which is almost on level is popped by Contours
+        if contour.xmax - contour.xmin < 1e-9:
+            continue
+        vertices = paths[(regions.level[i], *contour.vertices[0])]
+        assert array_equal(vertices, contour.vertices)
+        # Pixels in iso line are in region, region could have also pixels on iso line
+        pixels = set(zip(*regions.region_pixels(i)))
+        assert set(zip(*g.get_pixels_in(contour.vertices))) <= pixels
+
+
+def test_amplitude_extrema():
+    # Amplitude with extrema of whole grid must be the same than with a search by contour
+    g = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
+    )
+    data, step = g.identification_grid("adt", 0.002)
+    c = Contours(g.x_c, g.y_c, data, arange(-0.3, 0.3, 0.01))
+    extrema = [local_extrema_(data.data, data.mask, sign) for sign in (-1, 1)]
+    # Reserved pixels change extrema around them
+    i_x, i_y = arange(40, 60), arange(40, 60)
+    data.mask[i_x, i_y] = True
+    for sign, extrema_ in zip((-1, 1), extrema):
+        update_local_extrema_(data.data, data.mask, extrema_, i_x, i_y, sign)
+        assert array_equal(extrema_, local_extrema_(data.data, data.mask, sign))
+    nb = 0
+    for i_level, coll in enumerate(c.iter()):
+        for contour in coll.get_paths():
+            contour.pixels_in(g)
+            if contour.nb_pixel < 4:
+                continue
+            for anticyclonic, extrema_ in zip((True, False), extrema):
+                args = contour, c.cvalues[i_level], data, step
+                amps = Amplitude(*args), Amplitude(*args, extrema=extrema_)
+                if anticyclonic:
+                    results = [
+                        amp.all_pixels_above_h0(c.levels[i_level]) for amp in amps
+                    ]
+                else:
+                    results = [
+                        amp.all_pixels_below_h0(c.levels[i_level]) for amp in amps
+                    ]
+                assert results[0] == results[1]
+                assert amps[0].amplitude == amps[1].amplitude
+                nb += results[0] is not False
+    assert nb > 100
+
+
+def test_grid_handle():
+    filename = get_path("dt_med_allsat_phy_l4_20160515_20190101.nc")
+    ref = RegularGridDataset(filename, "longitude", "latitude")
+    with RegularGridDataset(filename, "longitude", "latitude") as g:
+        assert g.is_opened
+        tile = g.grid_tiles("adt", slice(10, 60), slice(0, 30))
+        assert array_equal(tile, ref.grid("adt")[10:60, :30])
+        # Tile given is a copy of chunk stored
+        tile[:] = 0
+        tile = g.grid_tiles("adt", slice(10, 60), slice(0, 30))
+        assert array_equal(tile, ref.grid("adt")[10:60, :30])
+        assert g.chunk_cache.hits == 1 and g.chunk_cache.misses == 1
+        assert g.units("adt") == ref.units("adt")
+        assert array_equal(g.grid("sla"), ref.grid("sla"))
+        # Handle is not sent with grid
+        g_ = loads(dumps(g))
+        assert not g_.is_opened and len(g_.chunk_cache) == 0
+        assert array_equal(g_.x_c, g.x_c)
+    assert not g.is_opened and len(g.chunk_cache) == 0
+
+
+def test_chunk_cache():
+    cache = ChunkCache(2000)
+    for i in range(3):
+        cache.add(cache.key("adt", slice(i, None), arange(2)), arange(100) + i)
+    # Only the last 2 arrays are kept
+    assert len(cache) == 2 and cache.nbytes == 1600
+    assert cache.get(cache.key("adt", slice(0, None), arange(2))) is None
+    assert cache.get(cache.key("adt", slice(1, None), arange(2)))[0] == 1
+    # Most recently used is kept
+    cache.add(cache.key("sla"), arange(100))
+    assert cache.get(cache.key("adt", slice(1, None), arange(2))) is not None
+    assert cache.get(cache.key("adt", slice(2, None), arange(2))) is None
+    # Array bigger than budget is not stored
+    cache.add(cache.key("big"), arange(1000))
+    assert cache.get(cache.key("big")) is None
+
+
+def test_convolve_rows():
+    random.seed(4)
+    values = random.random((30, 20))
+    valid = random.random((30, 20)) > 0.2
+    values[~valid] = 0
+    kernels = random.random((3, 5, 7))
+    rows = array((0, 9, 19))
+    values_rows, weights_rows = full((3, 30), nan), full((3, 30), nan)
+    for wrap in (False, True):
+        convolve_rows_(values, valid, kernels, rows, wrap, values_rows, weights_rows)
+        for kernel, i_y, values_row, weights_row in zip(
+            kernels, rows, values_rows, weights_rows
+        ):
+            for i in range(30):
+                # Kernel rows up to i_y + 3 (excluded) are used
+                sum_values, sum_weights = 0, 0
+                for i_k in range(5):
+                    for j_k in range(6):
+                        i_, j_ = i + i_k - 2, i_y + j_k - 3
+                        if j_ < 0 or j_ >= 20:
+                            continue
+                        if wrap:
+                            i_ %= 30
+                        elif i_ < 0 or i_ >= 30:
+                            continue
+                        if valid[i_, j_]:
+                            sum_values += kernel[i_k, j_k] * values[i_, j_]
+                            sum_weights += kernel[i_k, j_k]
+                assert weights_row[i] == approx(sum_weights)
+                assert values_row[i] == approx(sum_values / sum_weights)
+
+
+def test_filter_workers():
+    g = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
+    )
+    steps = list()
+    ref = g.convolve_filter_with_dynamic_kernel(
+        "adt",
+        g.kernel_bessel,
+        wave_length=300,
+        progress=lambda nb_done, nb_total: steps.append((nb_done, nb_total)),
+    )
+    nb_rows = (~g.grid("adt").mask).any(axis=0).sum()
+    # Rows are filtered by chunk
+    assert steps[-1] == (nb_rows, nb_rows)
+    assert len(steps) == ceil(nb_rows / g.FILTER_CHUNK)
+    # Result doesn't depend on workers
+    for pool in ("thread", "process"):
+        filtered = g.convolve_filter_with_dynamic_kernel(
+            "adt", g.kernel_bessel, wave_length=300, nb_workers=2, pool=pool
+        )
+        assert array_equal(filtered.mask, ref.mask)
+        assert array_equal(filtered.data[~ref.mask], ref.data[~ref.mask])
+
+
+def test_kernel_bank(tmp_path):
+    g = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
+    )
+    KERNEL_BANK.clear()
+    kernel = g.kernel_bessel(40, 300, order=2)
+    assert len(KERNEL_BANK) == 1
+    # Same kernel is given without computation
+    assert g.kernel_bessel(40, 300, order=2) is kernel
+    assert g.kernel_lanczos(40, 300, order=2) is not kernel
+    assert not kernel.flags.writeable
+    # Kernel of an other grid geometry
+    other_key = KERNEL_BANK.kernel_key("bessel", 1, 1, 40, 300, 2)
+    KERNEL_BANK.get_kernel(other_key, lambda: zeros((3, 3)))
+    # Kernels saved are given by bank after load
+    filename = str(tmp_path / "kernels.npz")
+    ref = g.convolve_filter_with_dynamic_kernel(
+        "adt", g.kernel_bessel, wave_length=300, kernel_cache=filename
+    )
+    nb_kernel = len(KERNEL_BANK)
+    KERNEL_BANK.clear()
+    KERNEL_BANK.load(filename)
+    # Only kernels of grid geometry are saved
+    assert len(KERNEL_BANK) == nb_kernel - 1
+    assert KERNEL_BANK.get(other_key) is None
+    assert array_equal(g.kernel_bessel(40, 300, order=2), kernel)
+    assert KERNEL_BANK.nb_new == 0
+    filtered = g.convolve_filter_with_dynamic_kernel(
+        "adt", g.kernel_bessel, wave_length=300
+    )
+    assert KERNEL_BANK.nb_new == 0
+    assert array_equal(filtered.data[~ref.mask], ref.data[~ref.mask])
+
+
+def test_convolve_rows_fft():
+    random.seed(5)
+    values = random.random((30, 20))
+    valid = random.random((30, 20)) > 0.2
+    values[~valid] = 0
+    rows = array((0, 1, 9, 19))
+    # Last kernel is larger than grid along x
+    for shape in ((5, 7), (35, 7)):
+        kernels = random.random((4, *shape))
+        for wrap in (False, True):
+            if shape[0] > 30 and not wrap:
+                continue
+            ref = full((4, 30), nan), full((4, 30), nan)
+            convolve_rows_(values, valid, kernels, rows, wrap, *ref)
+            result = full((4, 30), nan), full((4, 30), nan)
+            convolve_rows_fft(values, valid, list(kernels), rows, wrap, *result)
+            assert allclose(result[0], ref[0], rtol=0, atol=1e-12)
+            assert allclose(result[1], ref[1], rtol=0, atol=1e-12)
+
+
+def test_filter_methods():
+    g = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
+    )
+    kw = dict(wave_length=500, order=2, extend=0.5)
+    ref = g.convolve_filter_with_dynamic_kernel(
+        "adt", g.kernel_bessel, method="direct", **kw
+    )
+    for method in ("fft", "auto"):
+        filtered = g.convolve_filter_with_dynamic_kernel(
+            "adt", g.kernel_bessel, method=method, **kw
+        )
+        assert array_equal(filtered.mask, ref.mask)
+        assert allclose(filtered, ref, rtol=0, atol=1e-12)
+
+
+def test_spectrum_lonlat():
+    g = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
+    )
+    area = dict(llcrnrlon=-5, urcrnrlon=35, llcrnrlat=32, urcrnrlat=44)
+    g.copy("adt", "adt_nan")
+    g.grid("adt_nan")[200, 100:102] = nan
+    (w_lon, pw_lon), (w_lat, pw_lat) = g.spectrum_lonlat("adt_nan", area=area)
+    # Column by column reference
+    x0, y0 = g.nearest_grd_indice(area["llcrnrlon"], area["llcrnrlat"])
+    x1, y1 = g.nearest_grd_indice(area["urcrnrlon"], area["urcrnrlat"])
+    data = ma.getdata(g.grid("adt_nan")[x0:x1, y0:y1])
+    step_y_km = g.ystep * distance(0, 0, 0, 1) / 1000
+    pws = [welch(column, 1 / step_y_km)[1] for column in data]
+    pws = array([pw for pw in pws if not isnan(pw).any()])
+    assert pws.shape[0] == data.shape[0] - 1
+    assert allclose(pw_lat, pws.mean(axis=0), rtol=1e-12, atol=0)
+    fs, pws = list(), list()
+    for i, lat in enumerate(g.y_c[y0:y1]):
+        f, pw = welch(data[:, i], 1000 / (g.xstep * distance(0, lat, 1, lat)))
+        if not isnan(pw).any():
+            fs.append(f), pws.append(pw)
+    assert len(pws) == data.shape[1] - 2
+    f_interp = linspace(0, min(f.max() for f in fs), fs[0].shape[0])
+    pw = array([interp(f_interp, f, pw) for f, pw in zip(fs, pws)]).mean(axis=0)
+    assert allclose(1 / w_lon[1:], f_interp[1:], rtol=1e-12, atol=0)
+    assert allclose(pw_lon, pw, rtol=1e-12, atol=0)
+    # Ratio with another grid of the same dataset
+    (_, ratio_lon), (_, ratio_lat) = g.spectrum_lonlat(
+        "adt_nan", area=area, ref=g, ref_grid_name="adt"
+    )
+    (_, pw_lon_ref), (_, pw_lat_ref) = g.spectrum_lonlat("adt", area=area)
+    assert allclose(ratio_lon, pw_lon / pw_lon_ref, rtol=1e-12, atol=0)
+    assert allclose(ratio_lat, pw_lat / pw_lat_ref, rtol=1e-12, atol=0)
+
+
+def test_add_uv():
+    random.seed(5)
+    x, y = arange(0, 360, 2.0), arange(-59, 60, 2.0)
+    h = ma.array(
+        random.random((x.size, y.size)), mask=random.random((x.size, y.size)) > 0.9
+    )
+    for dtype in (None, "f4"):
+        g = RegularGridDataset.with_array(
+            coordinates=("x", "y"),
+            datas=dict(h=h, x=x, y=y),
+            centered=True,
+            dtype=dtype,
+        )
+        assert g.is_circular()
+        gof = g.GRAVITY / (sin(deg2rad(y)) * 4.0 * pi / (23 * 3600 + 56 * 60 + 4.1))
+        gof = gof.astype(g.compute_dtype)
+        for stencil_halfwidth in (4, 1):
+            g.add_uv("h", stencil_halfwidth=stencil_halfwidth)
+            u, v, data = g.grid("u"), g.grid("v"), g.grid("h")
+            kw = dict(stencil_halfwidth=stencil_halfwidth)
+            u_ref = -g.compute_stencil(data, vertical=True, **kw) * gof
+            v_ref = g.compute_stencil(data, mode="wrap", **kw) * gof
+            for grid, ref in ((u, u_ref), (v, v_ref)):
+                assert grid.dtype == g.compute_dtype
+                assert array_equal(grid.mask, ref.mask)
+                assert array_equal(grid.compressed(), ref.compressed())
+            # Speed computed by add_uv is used until u or v are replaced
+            g.init_speed_coef()
+            speed = g._speed_ev
+            assert array_equal(speed.mask, u.mask + v.mask)
+            assert allclose(
+                speed.compressed(), ((u ** 2 + v ** 2) ** 0.5).compressed(), rtol=1e-6
+            )
+            g.vars["u"] = u * 2
+            g.init_speed_coef()
+            assert g._speed_ev is not speed
+
+
+def test_speed_after_filtering():
+    g = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
+    )
+    g.add_uv("adt")
+    g.init_speed_coef()
+    speed = g._speed_ev
+    # Filter modify u in place, speed kept by add_uv must be computed again
+    g.bessel_high_filter("u", 300)
+    g.init_speed_coef()
+    assert g._speed_ev is not speed
+    ref = (g.grid("u") ** 2 + g.grid("v") ** 2) ** 0.5
+    assert array_equal(g._speed_ev.compressed(), ref.compressed())
+    # Speed is kept while velocities are not modified
+    speed = g._speed_ev
+    g.init_speed_coef()
+    assert g._speed_ev is speed
+    g.vars.touch("v")
+    g.init_speed_coef()
+    assert g._speed_ev is not speed
+
+
+def test_derived_fields():
+    g = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
+    )
+    g.add_uv("adt")
+    u_x, u_y, v_x, v_y = g.velocity_gradients()
+    assert array_equal(u_y, g.compute_stencil(g.grid("u"), vertical=True))
+    assert array_equal(v_x, g.compute_stencil(g.grid("v")))
+    # Computed at first access, gradients are shared
+    assert "vorticity" not in g.vars
+    vorticity = g.grid("vorticity")
+    assert array_equal(vorticity, v_x - u_y)
+    assert g.velocity_gradients()[0] is u_x
+    ow = g.grid("ow")
+    assert allclose(
+        ow, g.grid("normal_strain") ** 2 + g.grid("shear_strain") ** 2 - vorticity ** 2
+    )
+    assert g.units("ow") == "s-2"
+    assert allclose(g.grid("eke"), (g.grid("u") ** 2 + g.grid("v") ** 2) / 2)
+    assert g.grid("vorticity") is vorticity
+    # Computed again with new velocities
+    g.add_uv("adt", stencil_halfwidth=1)
+    assert g.velocity_gradients()[0] is not u_x
+    assert g.grid("vorticity") is not vorticity
+    # Field declared with other velocities and name
+    g.add_derived("vorticity", uname="v", vname="u", varname="vort_swap")
+    v_x, v_y, u_x, u_y = g.velocity_gradients("v", "u")
+    assert array_equal(g.grid("vort_swap"), u_x - v_y)
+    # Computed again when velocities are filtered in place
+    vorticity = g.grid("vorticity")
+    g.bessel_high_filter("u", 300)
+    u_y = g.compute_stencil(g.grid("u"), vertical=True)
+    v_x = g.compute_stencil(g.grid("v"))
+    assert g.grid("vorticity") is not vorticity
+    assert array_equal(g.grid("vorticity"), v_x - u_y)
+    assert allclose(g.grid("eke"), (g.grid("u") ** 2 + g.grid("v") ** 2) / 2)
+
+
+def test_curvilinear_locator(tmp_path):
+    i, j = meshgrid(arange(40.0), arange(30.0), indexing="ij")
+    x = 5 + i * 0.25 + j * 0.05 + 0.1 * sin(j / 5)
+    y = 30 + j * 0.2 - i * 0.03 + 0.1 * cos(i / 7)
+    filename = str(tmp_path / "curvilinear.nc")
+    with Dataset(filename, "w") as h:
+        h.createDimension("x", 40), h.createDimension("y", 30)
+        for name, value in (("lon", x), ("lat", y), ("z", i)):
+            h.createVariable(name, "f8", ("x", "y"))[:] = value
+    g = UnRegularGridDataset(filename, "lon", "lat")
+    # Locator is shared by grids with the same coordinates
+    assert UnRegularGridDataset(filename, "lon", "lat").locator is g.locator
+    locator = g.locator
+    # Points built with bilinear transform in random cells
+    random.seed(6)
+    i_pt, j_pt = random.uniform(0, 39, 500), random.uniform(0, 29, 500)
+    i0, j0 = i_pt.astype(int), j_pt.astype(int)
+    s, t = i_pt - i0, j_pt - j0
+    x_pt, y_pt = (
+        (1 - s) * (1 - t) * v[i0, j0]
+        + s * (1 - t) * v[i0 + 1, j0]
+        + s * t * v[i0 + 1, j0 + 1]
+        + (1 - s) * t * v[i0, j0 + 1]
+        for v in (x, y)
+    )
+    i_cell, j_cell, s_cell, t_cell = locator.locate(x_pt, y_pt)
+    assert array_equal(i_cell, i0) and array_equal(j_cell, j0)
+    assert allclose(s_cell, s) and allclose(t_cell, t)
+    i_x, i_y = g.nearest_grd_indice(x_pt, y_pt)
+    i_x_ref, i_y_ref = locator.nearest_nodes(x_pt, y_pt)
+    assert array_equal(i_x, i_x_ref) and array_equal(i_y, i_y_ref)
+    assert g.nearest_grd_indice(x[3, 4], y[3, 4]) == (3, 4)
+    # Out of grid
+    assert (locator.locate(array((0.0, 20)), array((0.0, 0)))[0] == -1).all()
+    # Bilinear interpolation of first index, points in cells with a masked corner are not used
+    mask = zeros(i.shape, dtype="bool")
+    assert mean_in_cells(i, mask, i_cell, j_cell, s_cell, t_cell) == approx(i_pt.mean())
+    mask[i0[0] + 1, j0[0]] = True
+    m = (mask[i0, j0] + mask[i0 + 1, j0] + mask[i0, j0 + 1] + mask[i0 + 1, j0 + 1]) == 0
+    assert mean_in_cells(i, mask, i_cell, j_cell, s_cell, t_cell) == approx(
+        i_pt[m].mean()
+    )
+    # Bbox contains all nodes of cells of vertices
+    vertices = create_vertice(x_pt[:10], y_pt[:10])
+    (x0, x1), (y0, y1) = g.bbox_indice(vertices)
+    assert x0 <= i0[:10].min() and i0[:10].max() + 1 < x1
+    assert y0 <= j0[:10].min() and j0[:10].max() + 1 < y1
+
+
+def check_advect_parallel():
+    g = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"),
+        "longitude",
+        "latitude",
+    )
+    g.add_uv("adt")
+    g_ = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"),
+        "longitude",
+        "latitude",
+    )
+    g_.add_uv("adt")
+    g_.vars["u"], g_.vars["v"] = g_.grid("v"), -g_.grid("u")
+    c = GridCollection()
+    c.datasets = [(0, g), (1, g_), (2, g)]
+    # More particles than a chunk and some particles in mask
+    x, y = meshgrid(arange(0, 36, 0.25), arange(28, 46, 0.25))
+    x, y = x.reshape(-1), y.reshape(-1)
+    kw = dict(nb_step=4, time_step=3600)
+    for rk4 in (False, True):
+        particles = list()
+        for parallel in (False, True):
+            x_, y_ = x.copy(), y.copy()
+            p = g.advect(x_, y_, "u", "v", rk4=rk4, parallel=parallel, **kw)
+            for _ in range(3):
+                next(p)
+            f_x, f_y = next(
+                g.filament(x, y, "u", "v", rk4=rk4, parallel=parallel, **kw)
+            )
+            x_t, y_t = x.copy(), y.copy()
+            p = c.advect(x_t, y_t, "u", "v", 0.5, rk4=rk4, parallel=parallel, **kw)
+            for _ in range(3):
+                next(p)
+            _, f_x_t, f_y_t = next(
+                c.filament(x, y, "u", "v", 1.5, rk4=rk4, parallel=parallel, **kw)
+            )
+            particles.append((x_, y_, f_x, f_y, x_t, y_t, f_x_t, f_y_t))
+        assert 0 < isnan(particles[0][0]).sum() < x.size
+        for serial, parallel in zip(*particles):
+            assert array_equal(serial, parallel, equal_nan=True)
+    # Process pools and concurrent search don't fork once numba threads are started
+    assert numba_threads_started() and not current_process().daemon
+    kwargs = dict(pixel_limit=(5, 2000))
+    a_and_c = g.eddy_identification("adt", "u", "v", datetime(2019, 2, 23), **kwargs)
+    handler = BufferingHandler(100)
+    getLogger("pet").addHandler(handler)
+    a_and_c_ = g.eddy_identification(
+        "adt", "u", "v", datetime(2019, 2, 23), concurrent_search=True, **kwargs
+    )
+    assert a_and_c == a_and_c_
+    assert "numba threads" in "".join(r.getMessage() for r in handler.buffer)
+    context = process_pool_context()
+    assert context.get_start_method() in ("forkserver", "spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        assert executor.submit(abs, -1).result() == 1
+
+
+def test_advect_parallel():
+    # Numba threads must not be started in test process, later forks could block it at exit
+    assert not numba_threads_started()
+    assert process_pool_context() is None
+    process = get_context("spawn").Process(target=check_advect_parallel)
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+
+def test_lazy_grid_collection():
+    filename = get_path("dt_med_allsat_phy_l4_20160515_20190101.nc")
+    kw = dict(x_name="longitude", y_name="latitude", heigth="adt")
+    c = GridCollection.from_netcdf_list([filename] * 4, [0, 1, 2, 3], nb_cache=2, **kw)
+    # Nothing is read before first use
+    assert len(c) == 4 and len(c.cache) == 0
+    with raises(KeyError):
+        c[1.5]
+    d = c[1]
+    assert c[1] is d and len(c.cache) == 1
+    assert [t for t, _ in c.get_next_time_step(1.5)] == [1, 2, 3]
+    assert [t for t, _ in c.get_previous_time_step(1.5)] == [2, 1, 0]
+    assert len(c.cache) == 2 and c[1] is not d
+    # Same particles with grids loaded before, on demand and in background
+    eager = GridCollection()
+    eager.datasets = GridCollection.from_netcdf_list(
+        [filename] * 4, [0, 1, 2, 3], **kw
+    ).datasets
+    x, y = meshgrid(arange(0, 36, 0.5), arange(28, 46, 0.5))
+    x, y = x.reshape(-1), y.reshape(-1)
+    particles = list()
+    for collection, prefetch in ((eager, False), (c, False), (c, True)):
+        for backward, t_init in ((False, 0.2), (True, 2.8)):
+            x_, y_ = x.copy(), y.copy()
+            p = collection.advect(
+                x_,
+                y_,
+                "u",
+                "v",
+                t_init,
+                nb_step=6,
+                time_step=3600,
+                rk4=True,
+                backward=backward,
+                prefetch=prefetch,
+            )
+            for _ in range(8):
+                next(p)
+            particles.append((x_, y_))
+            assert len(c.cache) <= 2
+    for i in (0, 1):
+        assert 0 < isnan(particles[i][0]).sum() < x.size
+        for j in (i + 2, i + 4):
+            for serial, lazy in zip(particles[i], particles[j]):
+                assert array_equal(serial, lazy, equal_nan=True)
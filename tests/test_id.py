@@ -1,15 +1,294 @@
 from datetime import datetime
+from shutil import copyfile
 
+from netCDF4 import Dataset
+from numpy import allclose, arange, exp, lexsort, ma, meshgrid, where, zeros
+from pytest import raises
+
+from py_eddy_tracker.appli.grid import (
+    eddy_id,
+    eddy_id_batch,
+    eddy_id_cube,
+    identification,
+    identification_over_cube,
+)
 from py_eddy_tracker.data import get_path
 from py_eddy_tracker.dataset.grid import RegularGridDataset
 
-g = RegularGridDataset(
-    get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
-)
+
+def med_grid():
+    """Each test uses its own grid with geostrophic current, tests could be run alone"""
+    g = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"), "longitude", "latitude"
+    )
+    g.add_uv("adt")
+    return g
 
 
 def test_id():
-    g.add_uv("adt")
+    g = med_grid()
     a, c = g.eddy_identification("adt", "u", "v", datetime(2019, 2, 23))
     assert len(a) == 36
     assert len(c) == 36
+
+
+def test_id_batch(tmp_path):
+    src = get_path("dt_med_allsat_phy_l4_20160515_20190101.nc")
+    for date in ("20190223", "20190224"):
+        copyfile(src, tmp_path / f"dt_med_{date}_20190101.nc")
+    # A corrupted grid must not stop other identifications
+    (tmp_path / "dt_med_20190225_20190101.nc").write_bytes(b"not a netcdf")
+    # Output directory with % must not be changed by strftime
+    path_out = tmp_path / "%Y"
+    path_out.mkdir()
+    args = [
+        str(tmp_path / "dt_med_*_20190101.nc"),
+        "adt",
+        "None",
+        "None",
+        "longitude",
+        "latitude",
+        str(path_out),
+        "--cut_wavelength",
+        "0",
+        "--nb_workers",
+        "2",
+    ]
+    # Failed dates give a nonzero exit status once all dates are done
+    with raises(SystemExit) as error:
+        eddy_id_batch(args)
+    assert error.value.code == 1
+    for date in ("20190223", "20190224"):
+        for sign_type in ("Anticyclonic", "Cyclonic"):
+            assert (path_out / f"{sign_type}_{date}.nc").exists()
+    assert not (path_out / "Anticyclonic_20190225.nc").exists()
+    # Outputs already written are not computed again
+    mtime = (path_out / "Cyclonic_20190223.nc").stat().st_mtime
+    args[0] = str(tmp_path / "dt_med_2019022[34]_20190101.nc")
+    eddy_id_batch(args)
+    assert (path_out / "Cyclonic_20190223.nc").stat().st_mtime == mtime
+
+
+def test_id_concurrent():
+    g = med_grid()
+    kwargs = dict(pixel_limit=(5, 2000))
+    a, c = g.eddy_identification("adt", "u", "v", datetime(2019, 2, 23), **kwargs)
+    a_, c_ = g.eddy_identification(
+        "adt", "u", "v", datetime(2019, 2, 23), concurrent_search=True, **kwargs
+    )
+    assert a == a_
+    assert c == c_
+
+
+def test_id_tiled():
+    g = med_grid()
+    kwargs = dict(pixel_limit=(5, 2000))
+    a_and_c = g.eddy_identification("adt", "u", "v", datetime(2019, 2, 23), **kwargs)
+    a_and_c_ = g.tiled_eddy_identification(
+        "adt", "u", "v", datetime(2019, 2, 23), tiles=(3, 2), halo=40, **kwargs
+    )
+    for eddies, eddies_ in zip(a_and_c, a_and_c_):
+        i = lexsort(
+            (eddies.lon, eddies.lat, eddies.height_external_contour * eddies.sign_type)
+        )
+        eddies = eddies.index(i)
+        for name in eddies.obs.dtype.names:
+            if name in ("speed_average", "uavg_profile"):
+                # Speed interpolation depends on the grid origin for points on grid lines
+                assert allclose(eddies[name], eddies_[name], rtol=1e-2)
+            else:
+                assert (eddies[name] == eddies_[name]).all()
+
+
+def test_id_tiled_seam():
+    # Circular grid with an anticyclone centered on the seam of longitudes
+    lon, lat = arange(0, 360, 0.5), arange(20, 40, 0.5)
+    x, y = meshgrid(lon, lat, indexing="ij")
+    adt = zeros(x.shape)
+    for x0, y0, amplitude in ((0, 30, 0.3), (120, 28, -0.2), (250, 32, 0.25)):
+        d_x = (x - x0 + 180) % 360 - 180
+        adt += amplitude * exp(-(d_x ** 2 + (y - y0) ** 2) / 2.25)
+    g = RegularGridDataset.with_array(
+        ("lon", "lat"),
+        dict(lon=lon, lat=lat, adt=ma.array(adt, mask=zeros(adt.shape, dtype="bool"))),
+        variables_description=dict(adt=dict(units="m")),
+        centered=True,
+    )
+    g.add_uv("adt")
+    # Tiles which cross the seam keep their size
+    tile = g.tile(arange(-20, 100), arange(lat.size), ("adt",))
+    assert tile.x_size == 120 and not tile.is_circular()
+    assert (tile.x_c[:2] == (-10, -9.5)).all()
+    kwargs = dict(pixel_limit=(5, 2000))
+    a_and_c = g.eddy_identification("adt", "u", "v", datetime(2019, 2, 23), **kwargs)
+    a_and_c_ = g.tiled_eddy_identification(
+        "adt", "u", "v", datetime(2019, 2, 23), tiles=(4, 1), halo=20, **kwargs
+    )
+    for eddies, eddies_ in zip(a_and_c, a_and_c_):
+        assert len(eddies) == len(eddies_)
+    a, a_ = a_and_c[0], a_and_c_[0]
+    # Eddy on the seam is kept once
+    on_seam = abs((a_.lon + 180) % 360 - 180) < 1
+    assert on_seam.sum() == 1
+    i, j = where(abs((a.lon + 180) % 360 - 180) < 1)[0][0], where(on_seam)[0][0]
+    assert abs((a.lon[i] - a_.lon[j] + 180) % 360 - 180) < 0.05
+    assert abs(a.lat[i] - a_.lat[j]) < 0.05
+
+
+def test_id_sweep(tmp_path):
+    g = med_grid()
+    date = datetime(2019, 2, 23)
+    parameters = [
+        dict(shape_error=55, pixel_limit=(5, 2000)),
+        dict(shape_error=30, pixel_limit=(10, 500), sampling=30),
+    ]
+    results = g.eddy_identification_sweep("adt", "u", "v", date, parameters)
+    for kwargs, a_and_c in zip(parameters, results):
+        a_and_c_ = g.eddy_identification("adt", "u", "v", date, **kwargs)
+        assert a_and_c == a_and_c_
+    # Same settings with command line
+    (tmp_path / "sweep.yaml").write_text(
+        "loose:\n  shape_error: 55\nstrict:\n  shape_error: 30\n  pixel_limit: [10, 500]\n"
+    )
+    args = [
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"),
+        "20190223",
+        "adt",
+        "None",
+        "None",
+        "longitude",
+        "latitude",
+        str(tmp_path),
+        "--cut_wavelength",
+        "0",
+        "--sweep",
+        str(tmp_path / "sweep.yaml"),
+    ]
+    eddy_id(args)
+    for name in ("loose", "strict"):
+        for sign_type in ("Anticyclonic", "Cyclonic"):
+            assert (tmp_path / name / f"{sign_type}_20190223.nc").exists()
+
+
+def test_id_stats():
+    g = med_grid()
+    g.stats.reset()
+    a, c = g.eddy_identification("adt", "u", "v", datetime(2019, 2, 23))
+    stats = g.stats
+    assert set(stats.timings) == set(stats.STAGES)
+    for stage in ("contouring", "circle_fit", "pixels_in", "amplitude", "uavg"):
+        assert stats.timings[stage] > 0
+    assert len(stats.rejects) == 1
+    counts = stats.rejects[0]
+    assert counts.shape == (g.contours.levels.shape[0], len(stats.REJECT_CODES))
+    assert (counts.sum(axis=1) == g.contours.nb_contour_per_level).all()
+    _, reject = g.contours.get_flags()
+    assert counts[:, 4].sum() == (reject == 4).sum()
+    assert "uavg" in repr(stats)
+
+
+def test_id_raster():
+    g = med_grid()
+    # Raster engine must find almost same eddies than contour engine
+    kwargs = dict(pixel_limit=(5, 2000))
+    a, c = g.eddy_identification("adt", "u", "v", datetime(2019, 2, 23), **kwargs)
+    a_r, c_r = g.eddy_identification(
+        "adt", "u", "v", datetime(2019, 2, 23), engine="raster", **kwargs
+    )
+    for ref, eddies in ((a, a_r), (c, c_r)):
+        assert abs(len(ref) - len(eddies)) <= 2
+        centers = set(zip(ref.lon.round(6), ref.lat.round(6)))
+        same = centers & set(zip(eddies.lon.round(6), eddies.lat.round(6)))
+        assert len(same) >= 0.9 * len(ref)
+    nb_region = g.level_sets.nb_contour_per_level.sum()
+    assert g.stats.rejects[-1].sum() == nb_region
+
+
+def test_id_float32():
+    # Identification in float32 must give almost same eddies than in float64
+    g_f4 = RegularGridDataset(
+        get_path("dt_med_allsat_phy_l4_20160515_20190101.nc"),
+        "longitude",
+        "latitude",
+        dtype="f4",
+    )
+    g_f4.add_uv("adt")
+    g = med_grid()
+    assert g_f4.grid("adt").dtype == "f4" and g_f4.grid("u").dtype == "f4"
+    # Coordinates and integer fields keep their type
+    assert g_f4.x_c.dtype == "f8" and g_f4.y_c.dtype == "f8"
+    assert g_f4.grid("longitude").dtype == g.grid("longitude").dtype
+    g_f4.add_grid("flag", g_f4.grid("adt").mask.astype("i1"))
+    assert g_f4.grid("flag").dtype == "i1"
+    kwargs = dict(pixel_limit=(5, 2000))
+    a, c = g.eddy_identification("adt", "u", "v", datetime(2019, 2, 23), **kwargs)
+    a_f4, c_f4 = g_f4.eddy_identification(
+        "adt", "u", "v", datetime(2019, 2, 23), **kwargs
+    )
+    for ref, eddies in ((a, a_f4), (c, c_f4)):
+        # An eddy near a threshold could be lost or found
+        assert abs(len(ref) - len(eddies)) <= 1
+        i_ref, i_f4, _ = ref.match(eddies, intern=False, cmin=0.99)
+        assert i_ref.size >= min(len(ref), len(eddies)) - 1
+        assert allclose(ref.amplitude[i_ref], eddies.amplitude[i_f4], atol=1e-5)
+
+
+def test_id_cube(tmp_path):
+    # Cube of 2 days built with med grid
+    filename = str(tmp_path / "cube.nc")
+    with Dataset(get_path("dt_med_allsat_phy_l4_20160515_20190101.nc")) as h_in:
+        with Dataset(filename, "w") as h:
+            for name in ("time", "latitude", "longitude"):
+                h.createDimension(
+                    name, 2 if name == "time" else len(h_in.dimensions[name])
+                )
+            time = h.createVariable("time", "f8", ("time",))
+            time.units = "days since 1950-01-01"
+            time[:] = [25255, 25256]
+            for name in ("latitude", "longitude"):
+                h.createVariable(name, "f8", (name,))[:] = h_in.variables[name][:]
+            adt = h.createVariable("adt", "f8", ("time", "latitude", "longitude"))
+            adt.units = "m"
+            adt[0] = h_in.variables["adt"][0]
+            adt[1] = h_in.variables["adt"][0] * 0.9
+    kwargs = dict(cut_wavelength=0, pixel_limit=(5, 2000))
+    results = list(
+        identification_over_cube(
+            filename,
+            "longitude",
+            "latitude",
+            "time",
+            "adt",
+            nb_workers=2,
+            nb_in_flight=1,
+            **kwargs,
+        )
+    )
+    assert [date for date, _, _ in results] == [
+        datetime(2019, 2, 23),
+        datetime(2019, 2, 24),
+    ]
+    for i, (date, a, c) in enumerate(results):
+        a_, c_ = identification(
+            filename,
+            "longitude",
+            "latitude",
+            date,
+            "adt",
+            indexs=dict(time=i),
+            **kwargs,
+        )
+        assert len(a) > 0 and len(c) > 0
+        assert a == a_ and c == c_
+    # Same cube with command line, first step is already identified
+    path_out = tmp_path / "out"
+    path_out.mkdir()
+    copyfile(str(tmp_path / "cube.nc"), str(path_out / "Anticyclonic_20190223.nc"))
+    copyfile(str(tmp_path / "cube.nc"), str(path_out / "Cyclonic_20190223.nc"))
+    args = [filename, "adt", "None", "None", "longitude", "latitude", str(path_out)]
+    eddy_id_cube(args + ["--cut_wavelength", "0", "--nb_workers", "1"])
+    for sign_type in ("Anticyclonic", "Cyclonic"):
+        assert (path_out / f"{sign_type}_20190224.nc").exists()
+        assert (path_out / f"{sign_type}_20190223.nc").stat().st_size == (
+            tmp_path / "cube.nc"
+        ).stat().st_size
@@ -1,7 +1,10 @@
 import zarr
 
 from py_eddy_tracker.data import get_path
-from py_eddy_tracker.observations.observation import EddiesObservations
+from py_eddy_tracker.observations.observation import (
+    EddiesObservations,
+    ObservationsBuffer,
+)
 
 a_filename, c_filename = (
     get_path("Anticyclonic_20190223.nc"),
@@ -34,3 +37,20 @@ def test_index():
         memory_store, indexs=dict(obs=slice(500, 1000)), buffer_size=50
     )
     assert a_nc_subset == a_zarr_subset
+
+
+def test_buffer():
+    buffer = ObservationsBuffer(
+        capacity=3,
+        track_extra_variables=a.track_extra_variables,
+        track_array_variables=a.track_array_variables,
+        array_variables=a.array_variables,
+    )
+    for obs in a.obs[:10]:
+        i = buffer.add()
+        for name in a.obs.dtype.names:
+            buffer[name][i] = obs[name]
+    assert buffer.capacity == 12
+    new = buffer.freeze()
+    new.sign_type = a.sign_type
+    assert new == a.index(slice(0, 10))